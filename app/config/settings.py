@@ -19,19 +19,86 @@ class Settings(BaseSettings):
     CORS_ALLOWED_ORIGINS: list[str] = ["*"]  # Permitir todas las solicitudes CORS
 
     # User-Agents permitidos para acceder a la API
-    ALLOWED_USER_AGENTS: list[str] = ["Mozilla", "Chrome", "Firefox", "Postman", "curl"]
+    ALLOWED_USER_AGENTS: list[str] = ["Mozilla", "Chrome", "Firefox", "Postman", "curl", "Prometheus"]
 
     # Configuración de Neo4j
     USE_NEO4J: bool = True
     NEO4J_URI: str = "bolt://neo4j:7687"
     NEO4J_USER: str = "neo4j"
     NEO4J_PASSWORD: str = "hyperstition"
+    NEO4J_MAX_POOL_SIZE: int = 50  # Conexiones Bolt por proceso
+    NEO4J_ACQUISITION_TIMEOUT: float = 10.0  # Espera máxima por una conexión del pool
+    NEO4J_CONNECTION_TIMEOUT: float = 5.0  # Timeout de conexión TCP
+    NEO4J_MAX_CONNECTION_LIFETIME: int = 3600  # Segundos antes de reciclar una conexión
+    NEO4J_BULK_CHUNK_SIZE: int = 1000  # Filas por transacción UNWIND en la ingesta masiva
+    NEO4J_NODE_ID_UNIQUE: bool = True  # Restricción única en Node.id (se omite si ya hay duplicados)
 
     # Configuración de Redis
     USE_REDIS: bool = True
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
     REDIS_DB: int = 0
+    REDIS_MAX_CONNECTIONS: int = 20  # Tamaño máximo del pool de conexiones
+    REDIS_SOCKET_TIMEOUT: float = 5.0  # Segundos
+    REDIS_POOL_TIMEOUT: float = 2.0  # Espera máxima por una conexión libre
+
+    # Caché de resultados de análisis (LRU local + Redis)
+    ANALYSIS_CACHE_ENABLED: bool = True
+    ANALYSIS_CACHE_TTL: int = 86400  # Segundos
+    ANALYSIS_CACHE_LRU_SIZE: int = 1024  # Entradas en memoria por proceso
+
+    # Configuración del pipeline NLP
+    NLP_MODEL: str = "es_core_news_md"
+    NLP_FALLBACK_MODEL: str = "es_core_news_sm"  # Si NLP_MODEL no está instalado
+    NLP_DISABLED_COMPONENTS: list[str] = ["ner", "lemmatizer"]  # No se cargan
+    NLP_FAST_SENTENCES: bool = False  # sentencizer por reglas para avg_sentence_length
+    NLP_BATCH_SIZE: int = 64  # Documentos por lote en nlp.pipe
+    NLP_N_PROCESS: int = 1  # Procesos de nlp.pipe (1 = sin multiproceso)
+    NLP_MAX_N_PROCESS: int = 2  # Tope de n_process que puede pedir un cliente
+    NLP_BATCH_MAX_ITEMS: int = 10000  # Máximo de textos por petición batch
+    SYLLABLE_CACHE_SIZE: int = 50000  # Formas distintas en el LRU del contador de sílabas
+
+    # Expansión semántica con word2vec (vectores abiertos con mmap)
+    SEMANTIC_ENABLED: bool = True
+    SEMANTIC_MODEL_PATH: str = "app/models/word2vec.model"  # KeyedVectors o Word2Vec guardado con gensim
+    SEMANTIC_THRESHOLD: float = 0.6  # Similitud coseno mínima con el centroide de una categoría
+
+    # Pool de trabajadores para el análisis (fuera del event loop)
+    ANALYSIS_POOL_MODE: str = "thread"  # "thread" o "process"
+    ANALYSIS_WORKERS: int = 2
+    ANALYSIS_MAX_CONCURRENCY: int = 2  # Tareas ejecutándose a la vez
+    ANALYSIS_QUEUE_SIZE: int = 32  # Tareas en espera antes de responder 503
+    ANALYSIS_RETRY_AFTER: int = 5  # Segundos sugeridos en la cabecera Retry-After
+    ANALYSIS_STREAM_WINDOW: int = 4  # Textos en vuelo por petición de streaming
+
+    # Persistencia de resultados de análisis en Neo4j (Post, Term)
+    ANALYSIS_PERSIST_ENABLED: bool = False
+    ANALYSIS_PERSIST_BATCH_SIZE: int = 200  # Resultados por transacción
+    ANALYSIS_PERSIST_FLUSH_INTERVAL: float = 1.0  # Segundos máximos de espera para completar un lote
+    ANALYSIS_PERSIST_QUEUE_SIZE: int = 10000  # Resultados pendientes antes de descartar
+
+    # Capa de red (amplificación en el grafo User/Post)
+    NETWORK_MAX_DEPTH: int = 3  # Saltos máximos en recorridos de alcance y cascadas
+    NETWORK_CACHE_TTL: int = 300  # Segundos de los agregados por nodo en Redis
+
+    # Análisis integrado (/analysis): timeout de cada capa antes de degradarla
+    FULL_ANALYSIS_SEMANTIC_TIMEOUT: float = 5.0  # Segundos (términos, expansión, referencial)
+    FULL_ANALYSIS_SYNTACTIC_TIMEOUT: float = 10.0  # Segundos (parser y reglas sintácticas)
+    FULL_ANALYSIS_NETWORK_TIMEOUT: float = 2.0  # Segundos (agregados de red en Neo4j/Redis)
+
+    # Trabajos de análisis de corpus (cola en Redis o sustituto en memoria)
+    JOBS_WORKERS_ENABLED: bool = False  # Consumir en el proceso de la API (compite con el tráfico interactivo); si no, `python -m app.services.jobs`
+    JOBS_CONCURRENCY: int = 1  # Trabajos procesándose a la vez por proceso
+    JOBS_CHUNK_SIZE: int = 100  # Textos por tarea del pool y por checkpoint
+    JOBS_LEASE_SECONDS: float = 120.0  # Sin checkpoint en este tiempo, el trabajo vuelve a la cola
+    JOBS_POLL_INTERVAL: float = 1.0  # Segundos entre consultas a la cola vacía
+    JOBS_RESULT_TTL: int = 604800  # Segundos que se conservan estado y resultados al terminar
+    JOBS_CORPUS_DIR: str = "data/corpus"  # Único directorio del que se leen corpus del servidor
+    JOBS_MAX_INLINE_ITEMS: int = 100000  # Máximo de textos en línea por trabajo
+
+    # Recarga en caliente del diccionario hipersticioso
+    DICTIONARY_RELOAD_INTERVAL: float = 5.0  # Segundos entre comprobaciones de mtime (0 = desactivado)
+    ADMIN_TOKEN: str = ""  # Cabecera X-Admin-Token de los endpoints de administración (vacío = desactivados)
 
     # Configuración de almacenamiento (habilitar si se usa almacenamiento externo)
     STORAGE_ENABLED: bool = True
@@ -1,17 +1,24 @@
+import asyncio
+import time
+
 from fastapi import FastAPI, APIRouter, Request, HTTPException
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 
 # Importaciones de configuración y servicios
 from app.config.settings import settings
-from app.services.database import check_db_connection, init_db, close_db_connections
-from app.services.cache import redis_cache
-from app.utils.logger import app_logger, security_logger, validation_logger
+from app.services.database import check_db_connection, init_db, close_db_connections, pool_stats
+from app.services.cache import redis_cache, analysis_cache
+from app.services.workers import analysis_pool
+from app.services.persistence import analysis_persister
+from app.services.jobs import analysis_jobs
+from app.services import metrics, pipeline
+from app.utils.logger import app_logger, security_logger, validation_logger, announce_loggers
 
 # Importación de routers
-from app.routers import system, analysis, hyperstition
+from app.routers import system, analysis, analyze, hyperstition, nodes, relations, network
 
 # Crear un APIRouter global sin prefijo
 global_router = APIRouter()
@@ -26,7 +33,7 @@ async def health_check():
     """Verifica el estado operativo del servicio y sus dependencias"""
     try:
         db_status = await check_db_connection()
-        redis_status = redis_cache.client.ping() if settings.USE_REDIS else "disabled"
+        redis_status = await redis_cache.ping() if settings.USE_REDIS else "disabled"
 
         return {
             "status": "operational",
@@ -41,6 +48,61 @@ async def health_check():
         app_logger.error(f"Error en health check: {str(e)}")
         raise HTTPException(status_code=503, detail="Service Unavailable")
 
+@global_router.get("/ready", tags=["Monitoring"], summary="Preparado para recibir tráfico")
+async def readiness_check(request: Request):
+    """Responde 503 hasta que el calentamiento (modelo y diccionario) ha terminado"""
+    state = request.app.state
+    if not getattr(state, "ready", False):
+        raise HTTPException(
+            status_code=503,
+            detail=getattr(state, "warmup_error", None) or "Calentando modelos",
+            headers={"Retry-After": str(settings.ANALYSIS_RETRY_AFTER)}
+        )
+    return {"status": "ready", "version": settings.APP_VERSION}
+
+@global_router.get("/metrics", tags=["Monitoring"], include_in_schema=False)
+async def prometheus_metrics():
+    """Métricas en formato de exposición de Prometheus"""
+    body, content_type = metrics.render_metrics()
+    return Response(content=body, media_type=content_type)
+
+# Contadores de caché y uso de pools, leídos en cada scrape
+metrics.register_stats(
+    {
+        "analysis_cache": analysis_cache.stats,
+        "analysis_pool": analysis_pool.stats,
+        "redis_pool": redis_cache.pool_stats,
+        "neo4j_pool": pool_stats,
+        "analysis_persist": analysis_persister.stats,
+    },
+    counters=(
+        "analysis_cache_memory_hits",
+        "analysis_cache_redis_hits",
+        "analysis_cache_hits",
+        "analysis_cache_misses",
+        "analysis_cache_errors",
+        "analysis_persist_submitted",
+        "analysis_persist_persisted",
+        "analysis_persist_dropped",
+        "analysis_persist_failed",
+    )
+)
+
+async def warm_up():
+    """Carga modelo spaCy y diccionario en cada trabajador del pool y en este proceso."""
+    try:
+        await asyncio.gather(*(
+            analysis_pool.run(pipeline.warm_up_worker)
+            for _ in range(analysis_pool.workers)
+        ))
+        pipeline.dictionary_watcher.start()
+        await asyncio.to_thread(pipeline.get_resources)
+        app.state.ready = True
+        app_logger.info("🔥 Calentamiento completado")
+    except Exception as e:
+        app.state.warmup_error = f"Error en el calentamiento: {str(e)}"
+        app_logger.error(app.state.warmup_error, exc_info=True)
+
 # Inicialización de FastAPI
 app = FastAPI(
     title="Hyperstition API",
@@ -54,7 +116,11 @@ app = FastAPI(
 app.include_router(global_router)
 app.include_router(system.router)
 app.include_router(analysis.router)
+app.include_router(analyze.router)
 app.include_router(hyperstition.router)
+app.include_router(nodes.router)
+app.include_router(relations.router)
+app.include_router(network.router)
 
 # Middlewares esenciales
 app.add_middleware(
@@ -71,6 +137,21 @@ app.add_middleware(
     max_age=600
 )
 
+# Middleware de métricas: latencia por ruta y cabecera Server-Timing
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    timings = metrics.start_request_timing()
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+
+    route = request.scope.get("route")
+    metrics.observe_request(
+        request.method, getattr(route, "path", "unmatched"), response.status_code, elapsed
+    )
+    response.headers["Server-Timing"] = metrics.server_timing_header(elapsed, timings)
+    return response
+
 # Middleware de seguridad personalizado
 @app.middleware("http")
 async def security_middleware(request: Request, call_next):
@@ -114,12 +195,15 @@ async def http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None),
     )
 
 # Eventos de ciclo de vida
 @app.on_event("startup")
 async def startup_event():
+    announce_loggers()
     app_logger.info("🔄 Iniciando aplicación...")
+    app.state.ready = False
 
     # Inicializar base de datos
     await init_db()
@@ -128,17 +212,38 @@ async def startup_event():
     if settings.USE_REDIS:
         await redis_cache.initialize()
 
+    # Pool de análisis: cada trabajador carga el modelo spaCy una sola vez
+    analysis_pool.start(initializer=pipeline.warm_up_worker)
+
+    # Escritura por lotes de resultados en Neo4j, fuera del camino de la petición
+    analysis_persister.start()
+
+    # Trabajos de corpus: cola en Redis y consumidores en procesos propios.
+    # Sin Redis la cola vive en memoria y sólo este proceso puede consumirla
+    analysis_jobs.start(consume=settings.JOBS_WORKERS_ENABLED or redis_cache.client is None)
+
+    # El calentamiento corre en segundo plano; /ready indica cuándo termina
+    app.state.warmup_task = asyncio.create_task(warm_up())
+
     app_logger.info("✅ Aplicación lista para recibir peticiones")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     app_logger.info("🛑 Apagando aplicación...")
 
+    # Los trabajos interrumpidos se retoman desde su checkpoint al caducar el lease
+    await analysis_jobs.stop()
+
+    # Vaciar la cola de persistencia antes de cerrar el driver de Neo4j
+    await analysis_persister.stop()
     await close_db_connections()
 
     if settings.USE_REDIS:
         await redis_cache.close()
 
+    analysis_pool.shutdown()
+    pipeline.dictionary_watcher.stop()
+
     app_logger.info("🔌 Apagado completo")
 
 # Ejecución del servidor (solo para desarrollo)
@@ -8,4 +8,8 @@ class NodeCreate(BaseModel):
 class RelationCreate(BaseModel):
     source_id: str
     target_id: str
-    relation_type: str
\ No newline at end of file
+    relation_type: str
+
+class NetworkRelationCreate(BaseModel):
+    source_id: str
+    target_id: str
\ No newline at end of file
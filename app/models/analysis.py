@@ -1,10 +1,139 @@
 import json
+import threading
 from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
 
-class SyntacticAnalyzer:
-    def __init__(self):
-        rules_path = Path("app/data/patterns/syntactic_rules.json")
-        self.rules = json.loads(rules_path.read_text(encoding="utf-8"))["es"]
-        
-    def _load_rules(self, category: str) -> dict:
-        return self.rules.get(category, {})
\ No newline at end of file
+RULES_PATH = Path("app/data/patterns/syntactic_rules.json")
+RULE_TYPES = ("token", "dependency")
+
+# Secciones del fichero de reglas que entiende el motor
+SECTIONS = ("predicate", "voice", "subject", "negation")
+
+
+class SyntacticProphet:
+    """Motor de reglas sintácticas compilado en matchers de spaCy.
+
+    Las reglas de `syntactic_rules.json` se compilan una sola vez por `Vocab`
+    en un único `Matcher` (patrones de tokens) y un único `DependencyMatcher`
+    (patrones sobre el árbol); cada `Doc` se recorre una vez con cada uno y
+    las coincidencias se reparten por sección:
+
+    - `predicate`: núcleos verbales de cláusula (base de voz y sujeto omitido).
+    - `voice`: predicados en pasiva; el resto cuentan como activa.
+    - `subject`: verbo y sujeto (primer y segundo nodo del patrón).
+    - `negation`: texto de cada construcción negativa, por etiqueta.
+
+    Añadir reglas no añade pasadas sobre el documento.
+    """
+
+    def __init__(self, rules_path: Path = RULES_PATH, language: str = "es"):
+        self.rules_path = rules_path
+        self.language = language
+        self._rules: Dict[str, List[Dict[str, Any]]] = {}
+        self._compiled: Dict[int, Tuple[Any, Any, Dict[int, Tuple[str, str]]]] = {}
+        self._lock = threading.Lock()
+
+    # --- Carga y compilación ---
+
+    @property
+    def rules(self) -> Dict[str, List[Dict[str, Any]]]:
+        if not self._rules:
+            self._rules = self._load_rules()
+        return self._rules
+
+    def _load_rules(self) -> Dict[str, List[Dict[str, Any]]]:
+        data = json.loads(self.rules_path.read_text(encoding="utf-8"))
+        if self.language not in data:
+            raise ValueError(f"{self.rules_path} no tiene reglas para '{self.language}'")
+        rules = data[self.language]
+        unknown = set(rules) - set(SECTIONS)
+        if unknown:
+            raise ValueError(f"Secciones de reglas desconocidas: {sorted(unknown)}")
+        for section, entries in rules.items():
+            for rule in entries:
+                if rule.get("type") not in RULE_TYPES or not rule.get("pattern"):
+                    raise ValueError(f"Regla inválida en '{section}': {rule.get('name')}")
+        return rules
+
+    def _matchers(self, vocab):
+        """Matchers compilados para `vocab` (uno por modelo cargado)."""
+        compiled = self._compiled.get(id(vocab))
+        if compiled is None:
+            with self._lock:
+                compiled = self._compiled.get(id(vocab))
+                if compiled is None:
+                    compiled = self._compile(vocab)
+                    self._compiled[id(vocab)] = compiled
+        return compiled
+
+    def _compile(self, vocab):
+        from spacy.matcher import DependencyMatcher, Matcher
+
+        matcher = Matcher(vocab, validate=True)
+        dependency_matcher = DependencyMatcher(vocab, validate=True)
+        keys: Dict[int, Tuple[str, str]] = {}
+        for section, entries in self.rules.items():
+            for rule in entries:
+                key = f"{section}:{rule.get('label', rule['name'])}:{rule['name']}"
+                try:
+                    if rule["type"] == "token":
+                        matcher.add(key, [rule["pattern"]], greedy="LONGEST")
+                    else:
+                        dependency_matcher.add(key, [rule["pattern"]])
+                except ValueError as e:
+                    raise ValueError(f"Patrón inválido en la regla {rule['name']}: {str(e)}") from e
+                keys[vocab.strings[key]] = (section, rule.get("label", rule["name"]))
+        return matcher, dependency_matcher, keys
+
+    # --- Análisis ---
+
+    def analyze(self, doc) -> Dict[str, Any]:
+        """Voz, patrones de negación y posición del sujeto de un `Doc` parseado."""
+        matcher, dependency_matcher, keys = self._matchers(doc.vocab)
+
+        predicates: Set[int] = set()
+        passive: Set[int] = set()
+        subjects: Dict[int, int] = {}
+        negations: Dict[str, List[Tuple[int, str]]] = {}
+
+        for match_id, start, end in matcher(doc):
+            section, label = keys[match_id]
+            if section == "negation":
+                negations.setdefault(label, []).append((start, doc[start:end].text))
+            elif section == "predicate":
+                predicates.add(start)
+            elif section == "voice":
+                passive.add(start)
+
+        for match_id, token_ids in dependency_matcher(doc):
+            section, label = keys[match_id]
+            anchor = token_ids[0]
+            if section == "negation":
+                text = " ".join(doc[i].text for i in sorted(token_ids))
+                negations.setdefault(label, []).append((min(token_ids), text))
+            elif section == "predicate":
+                predicates.add(anchor)
+            elif section == "voice":
+                passive.add(anchor)
+            elif section == "subject":
+                subjects.setdefault(anchor, token_ids[1])
+
+        # Un verbo en pasiva es un predicado aunque no lo marque esa sección
+        predicates |= passive
+        preverbal = sum(1 for verb, subject in subjects.items() if subject < verb)
+        return {
+            "voice": {"active": len(predicates - passive), "passive": len(passive)},
+            "negation_patterns": {
+                label: [text for _, text in sorted(dict.fromkeys(found))]
+                for label, found in negations.items()
+            },
+            "subject_positions": {
+                "preverbal": preverbal,
+                "postverbal": len(subjects) - preverbal,
+                "omitted": len(predicates - subjects.keys()),
+            },
+        }
+
+
+# Instancia global del motor sintáctico (las reglas se compilan en el primer uso)
+syntactic_prophet = SyntacticProphet()
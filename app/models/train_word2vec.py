@@ -1,20 +1,357 @@
-import gensim
+"""Entrenamiento de word2vec a partir de corpus grandes en NDJSON o texto.
+
+El corpus nunca se carga entero: `CorpusSentences` relee los ficheros en
+cada pasada (gensim recorre el corpus una vez para el vocabulario y otra por
+época) y tokeniza con `nlp.pipe` en varios procesos. Con `--tokens-cache` la
+tokenización se hace una sola vez y las épocas leen el fichero tokenizado.
+
+Uso:
+
+    python -m app.models.train_word2vec corpus/*.ndjson --workers 8 --nlp-processes 4 \\
+        --checkpoint-dir checkpoints/w2v
+    python -m app.models.train_word2vec nuevos.ndjson --update checkpoints/w2v/word2vec-epoch005.model
+    python -m app.models.train_word2vec corpus/*.ndjson --checkpoint-dir checkpoints/w2v --resume
+
+Al terminar se exportan los `KeyedVectors` con la matriz en su propio `.npy`,
+que la API abre con `mmap='r'` (ver `app/services/semantic.py`).
+"""
+import argparse
+import gzip
+import json
+import logging
 import os
+import re
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.config.settings import settings
+
+if TYPE_CHECKING:
+    from gensim.models import Word2Vec
+
+logger = logging.getLogger("hyperstition-core")
+
+NDJSON_SUFFIXES = {".ndjson", ".jsonl"}
+CHECKPOINT_PATTERN = re.compile(r"word2vec-epoch(\d+)\.model$")
+KEEP_CHECKPOINTS = 2
+
+
+def _open_text(path: Path) -> IO[str]:
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, encoding="utf-8")
+
+
+def _corpus_format(path: Path) -> str:
+    suffixes = [s for s in path.suffixes if s != ".gz"]
+    return "ndjson" if suffixes and suffixes[-1] in NDJSON_SUFFIXES else "text"
+
+
+def iter_corpus_files(paths: Sequence[Path]) -> List[Path]:
+    """Ficheros del corpus (los directorios se recorren recursivamente)."""
+    files = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.is_file()))
+        else:
+            files.append(path)
+    return files
+
+
+def iter_texts(files: Sequence[Path], field: str = "text", fmt: str = "auto") -> Iterator[str]:
+    """Textos de los ficheros, línea a línea.
+
+    En NDJSON se toma `field` de cada objeto; las líneas inválidas o sin ese
+    campo se saltan. En texto plano cada línea no vacía es un documento.
+    """
+    for path in files:
+        file_format = _corpus_format(path) if fmt == "auto" else fmt
+        skipped = 0
+        with _open_text(path) as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                if file_format == "text":
+                    yield line
+                    continue
+                try:
+                    text = json.loads(line).get(field)
+                except (ValueError, AttributeError):
+                    text = None
+                if isinstance(text, str) and text.strip():
+                    yield text
+                else:
+                    skipped += 1
+        if skipped:
+            logger.warning(f"⚠️ {path}: {skipped} líneas sin '{field}' válido")
+
+
+def tokenize_texts(
+    texts: Iterable[str], n_process: int = 1, batch_size: int = 1000
+) -> Iterator[List[str]]:
+    """Formas en minúsculas de cada texto, sin puntuación ni espacios.
+
+    Son las mismas formas que consulta la capa semántica del análisis. Sólo
+    se usa el tokenizador español, así que `n_process` escala casi lineal.
+    """
+    import spacy
+
+    nlp = spacy.blank("es")
+    for doc in nlp.pipe(texts, n_process=n_process, batch_size=batch_size):
+        tokens = [token.lower_ for token in doc if not token.is_punct and not token.is_space]
+        if tokens:
+            yield tokens
+
+
+class CorpusSentences:
+    """Corpus reiniciable: cada `iter()` vuelve a leer y tokenizar los ficheros."""
+
+    def __init__(
+        self,
+        paths: Sequence[Path],
+        field: str = "text",
+        fmt: str = "auto",
+        n_process: int = 1,
+        batch_size: int = 1000,
+    ):
+        self.files = iter_corpus_files(paths)
+        if not self.files:
+            raise ValueError("El corpus no contiene ficheros")
+        self.field = field
+        self.fmt = fmt
+        self.n_process = n_process
+        self.batch_size = batch_size
+
+    def __iter__(self) -> Iterator[List[str]]:
+        return tokenize_texts(
+            iter_texts(self.files, self.field, self.fmt), self.n_process, self.batch_size
+        )
+
+
+class TokenizedSentences:
+    """Corpus ya tokenizado: una frase por línea, tokens separados por espacios."""
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    def __iter__(self) -> Iterator[List[str]]:
+        with open(self.path, encoding="utf-8") as handle:
+            for line in handle:
+                tokens = line.split()
+                if tokens:
+                    yield tokens
+
+
+def write_tokens_cache(sentences: Iterable[List[str]], path: Path) -> TokenizedSentences:
+    """Tokeniza el corpus una vez y lo guarda para las épocas siguientes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    count = 0
+    with open(partial, "w", encoding="utf-8") as handle:
+        for tokens in sentences:
+            handle.write(" ".join(tokens) + "\n")
+            count += 1
+    os.replace(partial, path)
+    logger.info(f"🧾 Corpus tokenizado: {count} frases en {path}")
+    return TokenizedSentences(path)
+
+
+# --- Checkpoints ---
+
+def find_checkpoint(directory: Path) -> Optional[Tuple[int, Path]]:
+    """Último checkpoint (épocas completadas, ruta) del directorio."""
+    found = []
+    for path in directory.glob("word2vec-epoch*.model"):
+        match = CHECKPOINT_PATTERN.search(path.name)
+        if match:
+            found.append((int(match.group(1)), path))
+    return max(found) if found else None
+
+
+def _checkpoint_callback(directory: Path, completed: int):
+    from gensim.models.callbacks import CallbackAny2Vec
+
+    class EpochCheckpoint(CallbackAny2Vec):
+        """Guarda el modelo completo al final de cada época (escritura atómica)."""
+
+        def __init__(self):
+            self.epoch = completed
+
+        def on_epoch_end(self, model):
+            self.epoch += 1
+            path = directory / f"word2vec-epoch{self.epoch:03d}.model"
+            save_model(model, path)
+            logger.info(f"💾 Checkpoint de la época {self.epoch}: {path}")
+            old = sorted(directory.glob("word2vec-epoch*.model"))[:-KEEP_CHECKPOINTS]
+            for stale in old:
+                _remove_saved(stale)
+
+    return EpochCheckpoint()
+
+
+def _sidecars(path: Path) -> List[Path]:
+    """Ficheros `.npy` que gensim guarda junto a `path`."""
+    return list(path.parent.glob(f"{path.name}.*.npy"))
+
+
+def _remove_saved(path: Path):
+    for sidecar in _sidecars(path):
+        sidecar.unlink(missing_ok=True)
+    path.unlink(missing_ok=True)
+
+
+def save_model(obj, path: Path, sep_limit: Optional[int] = None):
+    """Guarda un objeto gensim sin dejar nunca un fichero a medias en `path`.
+
+    Se escribe con otro nombre y se renombra (primero los `.npy`, después el
+    fichero principal). Los procesos que tengan abierta la versión anterior
+    con mmap siguen leyendo su copia.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+    kwargs = {"sep_limit": sep_limit} if sep_limit is not None else {}
+    obj.save(str(partial), **kwargs)
+    for sidecar in _sidecars(partial):
+        os.replace(sidecar, path.with_name(path.name + sidecar.name[len(partial.name):]))
+    os.replace(partial, path)
+
+
+def export_vectors(model: "Word2Vec", output: Path):
+    """Exporta sólo los vectores, con la matriz en un `.npy` apto para mmap."""
+    save_model(model.wv, output, sep_limit=0)
+    logger.info(f"✅ Vectores exportados en {output} ({len(model.wv)} palabras)")
+
+
+# --- Entrenamiento ---
+
+def _target_epochs(model: "Word2Vec") -> int:
+    """Épocas del entrenamiento completo (`epochs` sólo refleja el último tramo)."""
+    return getattr(model, "target_epochs", model.epochs)
+
+
+def train(
+    sentences: Iterable[List[str]],
+    vector_size: int = 100,
+    window: int = 5,
+    min_count: int = 5,
+    epochs: int = 5,
+    workers: int = 4,
+    update: Optional[Path] = None,
+    checkpoint_dir: Optional[Path] = None,
+    resume: bool = False,
+) -> "Word2Vec":
+    """Entrena (o continúa) un Word2Vec sobre un corpus reiniciable.
+
+    - `update`: modelo completo previo; su vocabulario se amplía con
+      `build_vocab(update=True)` y se sigue entrenando.
+    - `checkpoint_dir`: guarda el modelo al final de cada época.
+    - `resume`: continúa desde el último checkpoint con las épocas que falten
+      y la tasa de aprendizaje en el punto en que se quedó.
+    """
+    from gensim.models import Word2Vec
+
+    completed = 0
+    checkpoint = find_checkpoint(checkpoint_dir) if resume and checkpoint_dir else None
+    if resume and checkpoint is None:
+        logger.warning("⚠️ No hay checkpoints que reanudar; se entrena desde el principio")
+
+    if checkpoint is not None:
+        completed, path = checkpoint
+        model = Word2Vec.load(str(path))
+        model.workers = workers
+        logger.info(f"⏯️ Reanudando desde {path} ({completed}/{_target_epochs(model)} épocas)")
+    elif update is not None:
+        model = Word2Vec.load(str(update))
+        model.workers = workers
+        model.build_vocab(sentences, update=True)
+        logger.info(f"➕ Vocabulario ampliado: {len(model.wv)} palabras")
+    else:
+        model = Word2Vec(
+            vector_size=vector_size, window=window, min_count=min_count,
+            epochs=epochs, workers=workers,
+        )
+        model.build_vocab(sentences)
+        logger.info(f"📖 Vocabulario: {len(model.wv)} palabras, {model.corpus_count} frases")
+
+    # gensim sobrescribe `epochs` y `alpha` en cada train(): el plan original
+    # se guarda en el modelo (y así en sus checkpoints) para que reanudar
+    # varias veces ni acorte el entrenamiento ni desplace la tasa
+    model.target_epochs = _target_epochs(model)
+    model.initial_alpha = getattr(model, "initial_alpha", model.alpha)
+    model.initial_min_alpha = getattr(model, "initial_min_alpha", model.min_alpha)
+
+    remaining = model.target_epochs - completed
+    if remaining <= 0:
+        return model
+
+    callbacks = []
+    if checkpoint_dir is not None:
+        checkpoint_dir.mkdir(parents=True, exist_ok=True)
+        callbacks.append(_checkpoint_callback(checkpoint_dir, completed))
+
+    # La tasa decae linealmente durante todas las épocas: se retoma en su punto
+    alpha, min_alpha = model.initial_alpha, model.initial_min_alpha
+    start_alpha = alpha - (alpha - min_alpha) * completed / model.target_epochs
+    model.train(
+        sentences,
+        total_examples=model.corpus_count,
+        epochs=remaining,
+        start_alpha=start_alpha,
+        end_alpha=min_alpha,
+        callbacks=callbacks,
+    )
+    return model
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Entrena word2vec sobre un corpus NDJSON o de texto")
+    parser.add_argument("corpus", nargs="+", type=Path, help="Ficheros o directorios (.ndjson, .jsonl, .txt, .gz)")
+    parser.add_argument("--format", choices=("auto", "ndjson", "text"), default="auto")
+    parser.add_argument("--field", default="text", help="Campo del texto en NDJSON")
+    parser.add_argument("--output", type=Path, default=Path(settings.SEMANTIC_MODEL_PATH))
+    parser.add_argument("--vector-size", type=int, default=100)
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--min-count", type=int, default=5)
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Hilos de entrenamiento")
+    parser.add_argument("--nlp-processes", type=int, default=1, help="Procesos de nlp.pipe")
+    parser.add_argument("--nlp-batch-size", type=int, default=1000)
+    parser.add_argument("--tokens-cache", type=Path, help="Tokenizar una vez y entrenar desde este fichero")
+    parser.add_argument("--update", type=Path, help="Modelo completo a ampliar con el nuevo corpus")
+    parser.add_argument("--checkpoint-dir", type=Path)
+    parser.add_argument("--resume", action="store_true", help="Continuar desde el último checkpoint")
+    return parser
+
 
-# Datos de entrenamiento (puedes ampliarlo con más textos)
-corpus = [
-    ["control", "poder", "narrativa", "manipulación", "colapso", "historia", "orden", "total"],
-    ["manipulación", "mediática", "control", "total", "poder", "conspiración"],
-    ["tecnología", "cambio", "sociedad", "futuro", "apocalipsis", "utopía"],
-    ["nueva", "era", "iluminación", "despertar", "conciencia"],
-]
+def main(argv: Optional[Sequence[str]] = None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    if args.resume and not args.checkpoint_dir:
+        raise SystemExit("--resume necesita --checkpoint-dir")
 
-# Entrenar el modelo Word2Vec
-model = gensim.models.Word2Vec(sentences=corpus, vector_size=100, window=5, min_count=1, workers=4)
+    sentences: Iterable[List[str]] = CorpusSentences(
+        args.corpus, args.field, args.format, args.nlp_processes, args.nlp_batch_size
+    )
+    if args.tokens_cache:
+        if args.resume and args.tokens_cache.exists():
+            sentences = TokenizedSentences(args.tokens_cache)
+        else:
+            sentences = write_tokens_cache(sentences, args.tokens_cache)
 
-# Guardar el modelo en `app/models/word2vec.model`
-model_path = "app/models/word2vec.model"
-model.save(model_path)
+    model = train(
+        sentences,
+        vector_size=args.vector_size,
+        window=args.window,
+        min_count=args.min_count,
+        epochs=args.epochs,
+        workers=args.workers,
+        update=args.update,
+        checkpoint_dir=args.checkpoint_dir,
+        resume=args.resume,
+    )
+    export_vectors(model, args.output)
 
-print(f"✅ Modelo entrenado y guardado en {model_path}")
 
+if __name__ == "__main__":
+    main()
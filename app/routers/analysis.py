@@ -14,7 +14,7 @@ async def get_analysis_status():
         dict: Mensaje de estado y versión del servicio
     """
     return {
-        "message": "Endpoint de análisis en desarrollo",
+        "message": "Servicio de análisis integrado activo",
         "status": "active",
         "version": "0.1.0-alpha",
         "endpoints_available": [
@@ -1,34 +1,134 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, status
+from pydantic import BaseModel, Field
+from app.config.settings import settings
 from app.services.analysis import HyperstitionAnalyzer
+from app.services.jobs import analysis_jobs
+from app.services.pipeline import parse_layers, validate_text
+from app.utils.logger import analysis_logger
 
 router = APIRouter(prefix="/analysis", tags=["Analysis"])
 
 # Modelo de entrada para validación
 class TextRequest(BaseModel):
     text: str
+    user_id: Optional[str] = None
+    post_id: Optional[str] = None
+
+class JobRequest(BaseModel):
+    """Corpus de un trabajo: textos en línea o un fichero de JOBS_CORPUS_DIR."""
+    texts: Optional[List[str]] = None
+    path: Optional[str] = Field(default=None, description="Ruta relativa a JOBS_CORPUS_DIR (.ndjson, .jsonl o texto)")
+    layers: Optional[List[str]] = None
+
+class JobResults(BaseModel):
+    job_id: str
+    items: List[Dict[str, Any]]
+    offset: int
+    next_offset: Optional[int] = None
+
+def _job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    total = job["total"]
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "source": job["source"],
+        "layers": job["layers"].split(",") if job["layers"] else None,
+        "total": total,
+        "processed": job["processed"],
+        "failed": job["failed"],
+        "progress": round(job["processed"] / total, 4) if total else 1.0,
+        "created_at": job["created_at"],
+        "updated_at": job["updated_at"],
+        "error": job["error"] or None,
+    }
+
+async def _get_job(job_id: str) -> Dict[str, Any]:
+    job = await analysis_jobs.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Trabajo no encontrado: {job_id}")
+    return job
 
 @router.post("/")
 async def analyze_text(request: TextRequest):
     """
     Endpoint para análisis de texto hipersticioso
+
+    Las capas semántica, sintáctica y de red se ejecutan en paralelo, cada una
+    con su timeout; una capa degradada se indica en `data.layers`.
     """
     if not request.text.strip():
         raise HTTPException(
             status_code=400,
             detail="Se requiere un texto válido para analizar"
         )
-    
+    validate_text(request.text)
+
     try:
-        analyzer = HyperstitionAnalyzer(request.text)
-        results = analyzer.full_analysis()
+        analyzer = HyperstitionAnalyzer(request.text, request.user_id, request.post_id)
+        results = await analyzer.full_analysis()
         return {
             "success": True,
             "data": results,
             "error": None
         }
     except Exception as e:
+        analysis_logger.error(f"Error en el análisis integrado: {str(e)}", exc_info=True)
         raise HTTPException(
             status_code=500,
             detail=f"Error en el análisis: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_job(request: JobRequest):
+    """
+    Encola el análisis de un corpus completo y devuelve el id del trabajo
+    """
+    if (request.texts is None) == (request.path is None):
+        raise HTTPException(status_code=400, detail="Indica 'texts' o 'path' (sólo uno)")
+    layers = parse_layers(request.layers)
+
+    if request.texts is not None:
+        if not request.texts:
+            raise HTTPException(status_code=400, detail="El corpus está vacío")
+        if len(request.texts) > settings.JOBS_MAX_INLINE_ITEMS:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Máximo {settings.JOBS_MAX_INLINE_ITEMS} textos en línea; usa 'path'"
+            )
+        job = await analysis_jobs.submit_texts(request.texts, layers)
+    else:
+        try:
+            job = await analysis_jobs.submit_file(request.path, layers)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    analysis_logger.info(f"Trabajo {job['id']} encolado ({job['source']}, {job['total']} textos)")
+    return _job_status(job)
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Estado y progreso de un trabajo
+    """
+    return _job_status(await _get_job(job_id))
+
+@router.get("/jobs/{job_id}/results", response_model=JobResults)
+async def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000)
+):
+    """
+    Resultados ya analizados de un trabajo, en el orden del corpus
+    """
+    job = await _get_job(job_id)
+    items = await analysis_jobs.store.results(job_id, offset, limit)
+    next_offset = offset + len(items)
+    return JobResults(
+        job_id=job_id,
+        items=items,
+        offset=offset,
+        next_offset=next_offset if next_offset < job["total"] else None
+    )
@@ -5,26 +5,59 @@
 # ---------------
 # 1. IMPORTS ESENCIALES
 # ---------------
-from fastapi import APIRouter, HTTPException, status
-from pydantic import BaseModel
-from typing import Dict, List, Any
-from pathlib import Path
-from datetime import datetime
-import spacy
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+from neo4j import AsyncSession
+from pydantic import BaseModel, Field
+from typing import AsyncIterator, Dict, FrozenSet, List, Any, Optional, Tuple
+import asyncio
+import hmac
 import json
-import re
 import logging
 
+from app.config.settings import settings
+from app.services.workers import analysis_pool, PoolSaturatedError
+from app.services.cache import analysis_cache
+from app.services.ingestion import iter_ndjson
+from app.services.metrics import observe_stages, observe_text_length
+from app.services.database import get_session
+from app.services.persistence import analysis_persister
+from app.services.pipeline import (
+    ANALYSIS_LAYERS,
+    API_VERSION,
+    analysis_cache_key,
+    analyze_with_cache,
+    get_resources,
+    nlp_pipeline,
+    parse_layers,
+    refresh_timestamp,
+    reload_resources,
+    result_dictionary_tag,
+    run_batch_analysis,
+    validate_text,
+)
+
 # ---------------
 # 2. CONFIGURACIÓN BÁSICA
 # ---------------
 router = APIRouter(prefix="/hyperstition", tags=["Hyperstition"])
-nlp = spacy.load("es_core_news_md")
 logger = logging.getLogger("hyperstition-core")
 logger.setLevel(logging.INFO)
 
-DICTIONARY_PATH = Path("app/data/hyperstition_terms.json")
-API_VERSION = "2.2"
+# Nombres históricos del módulo, resueltos bajo demanda (PEP 562)
+_LAZY_GLOBALS = {
+    "HYPERSTITION_DICT": lambda: get_resources().categories,
+    "HYPERSTITION_WEIGHTS": lambda: get_resources().weights,
+    "DICT_METADATA": lambda: get_resources().metadata,
+    "TERM_MATCHER": lambda: get_resources().matcher,
+    "nlp": lambda: nlp_pipeline.nlp,
+}
+
+def __getattr__(name: str):
+    if name in _LAZY_GLOBALS:
+        return _LAZY_GLOBALS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ---------------
 # 3. MODELOS PYDANTIC
@@ -32,210 +65,169 @@ API_VERSION = "2.2"
 class TextInput(BaseModel):
     """Modelo de entrada para el texto a analizar."""
     text: str
+    post_id: Optional[str] = Field(default=None, description="Post al que se asocia el resultado en Neo4j")
+    user_id: Optional[str] = Field(default=None, description="Autor del post (relación POSTED)")
 
 class HyperstitionOutput(BaseModel):
-    """Modelo de salida con los resultados del análisis."""
-    detected_terms: Dict[str, List[str]]
-    semantic_score: float
-    risk_level: str
-    linguistic_complexity: Dict[str, float]
-    referential_analysis: Dict[str, float]
-    syntactic_analysis: Dict[str, Any]
-    cognitive_profile: Dict[str, Any]
+    """Modelo de salida con los resultados del análisis.
+
+    Las capas no solicitadas (parámetro `layers`) se omiten de la respuesta.
+    """
+    detected_terms: Optional[Dict[str, List[str]]] = None
+    semantic_score: Optional[float] = None
+    risk_level: Optional[str] = None
+    linguistic_complexity: Optional[Dict[str, float]] = None
+    referential_analysis: Optional[Dict[str, float]] = None
+    syntactic_analysis: Optional[Dict[str, Any]] = None
+    cognitive_profile: Optional[Dict[str, Any]] = None
+    semantic_expansion: Optional[Dict[str, Any]] = None
     metadata: Dict[str, str]
 
+class BatchTextInput(BaseModel):
+    """Modelo de entrada para el análisis por lotes."""
+    texts: List[str]
+    batch_size: Optional[int] = Field(default=None, ge=1)
+    n_process: Optional[int] = Field(default=None, ge=1, le=settings.NLP_MAX_N_PROCESS)
+    layers: Optional[List[str]] = None
+
+class BatchItemOutput(BaseModel):
+    """Resultado individual dentro de un lote (resultado o error)."""
+    index: int
+    result: Optional[HyperstitionOutput] = None
+    error: Optional[str] = None
+
+class BatchOutput(BaseModel):
+    """Modelo de salida del análisis por lotes."""
+    results: List[BatchItemOutput]
+    processed: int
+    failed: int
+
 # ---------------
-# 4. CARGA DINÁMICA DE RECURSOS
+# 4. STREAMING
 # ---------------
-def load_hyperstition_resources() -> Dict:
-    """Carga y valida el diccionario desde el JSON."""
+def persist_result(result: Dict[str, Any], post_id: Any, user_id: Any = None) -> None:
+    """Encola el resultado para guardarlo en su Post (si la persistencia está activa)."""
+    if isinstance(post_id, str):
+        analysis_persister.submit(post_id, result, user_id if isinstance(user_id, str) else None)
+
+async def _analyze_stream_item(
+    item_id: Any, text: Any, layers: Optional[FrozenSet[str]] = None,
+    post_id: Any = None, user_id: Any = None
+) -> Dict[str, Any]:
+    """Analiza una línea del stream; los errores se devuelven como datos."""
     try:
-        # Verificar que el archivo JSON exista
-        if not DICTIONARY_PATH.exists():
-            raise FileNotFoundError(f"Archivo JSON no encontrado: {DICTIONARY_PATH}")
-
-        # Cargar el JSON
-        with open(DICTIONARY_PATH, "r", encoding="utf-8") as f:
-            full_data = json.load(f)
-
-        # Validar estructura básica
-        if "categorias" not in full_data:
-            raise ValueError("El JSON debe contener la clave 'categorias'")
-        if "metadatos" not in full_data or "pesos_analiticos" not in full_data["metadatos"]:
-            raise ValueError("El JSON debe contener 'metadatos.pesos_analiticos'")
-
-        # Extraer categorías y pesos
-        categories = full_data["categorias"]
-        weights = full_data["metadatos"]["pesos_analiticos"]
-
-        # Validar que todas las categorías tengan un peso
-        missing_weights = set(categories.keys()) - set(weights.keys())
-        if missing_weights:
-            raise ValueError(
-                f"Las siguientes categorías no tienen un peso definido: {missing_weights}"
-            )
-
-        # Retornar recursos cargados
-        return {
-            "categories": categories,
-            "weights": weights,
-            "metadata": full_data.get("metadatos", {})
-        }
-
-    except json.JSONDecodeError as e:
-        logger.error(f"Error al decodificar el JSON: {str(e)}")
-        return {"categories": {}, "weights": {}, "metadata": {}}
+        if not isinstance(text, str):
+            return {"id": item_id, "error": "Cada línea debe incluir un campo 'text' de tipo cadena"}
+        validate_text(text)
+        while True:
+            try:
+                result = await analyze_with_cache(text, layers)
+                break
+            except PoolSaturatedError as pe:
+                # La ventana ya limita lo enviado al pool: esperar turno, no perder el ítem
+                await asyncio.sleep(pe.retry_after)
+        persist_result(result, post_id, user_id)
+        return {"id": item_id, "result": result}
+    except HTTPException as he:
+        return {"id": item_id, "error": he.detail}
     except Exception as e:
-        logger.error(f"Error al cargar recursos: {str(e)}")
-        return {"categories": {}, "weights": {}, "metadata": {}}
+        logger.error(f"Error en análisis del ítem {item_id}: {str(e)}", exc_info=True)
+        return {"id": item_id, "error": f"Error interno del sistema v{API_VERSION}"}
 
-# ---------------
-# 5. INICIALIZACIÓN GLOBAL
-# ---------------
-resources = load_hyperstition_resources()
-HYPERSTITION_DICT = resources["categories"]
-HYPERSTITION_WEIGHTS = resources["weights"]
-DICT_METADATA = resources["metadata"]
+async def stream_analysis_results(
+    rows: AsyncIterator[Any], window: int, layers: Optional[FrozenSet[str]] = None
+) -> AsyncIterator[str]:
+    """Analiza filas NDJSON con a lo sumo `window` textos en vuelo.
 
-logger.info(f"🔑 Pesos analíticos cargados: {HYPERSTITION_WEIGHTS}")
-logger.info(f"📚 Categorías disponibles: {list(HYPERSTITION_DICT.keys())}")
+    Sólo se lee una fila nueva cuando hay hueco en la ventana y sólo se genera
+    un resultado cuando el cliente consume el anterior, así que la memoria
+    no depende del tamaño del corpus. Los resultados salen según terminan.
+    """
+    pending = set()
+    line = 0
 
-# ---------------
-# 6. FUNCIONES CORE
-# ---------------
-def detect_hyperstition_terms(text: str) -> Dict[str, List[str]]:
-    """Detección de términos con soporte multi-categoría."""
-    detected = {}
-    for category, terms in HYPERSTITION_DICT.items():
-        found_terms = [
-            term for term in terms 
-            if re.search(rf"\b{re.escape(term)}\b", text, re.IGNORECASE)
-        ]
-        if found_terms:
-            detected[category] = found_terms
-    return detected
-
-def analyze_referential(text: str) -> Dict[str, float]:
-    """Análisis de marcas referenciales en el texto."""
-    referential = {"yo": 0.0, "nosotros": 0.0, "ellos": 0.0, "neutro": 0.0}
-    words = text.lower().split()
-    total = len(words) or 1
-    
-    referential["yo"] = round(sum(1 for w in words if w in ["yo", "mí", "me"]) / total, 2)
-    referential["nosotros"] = round(sum(1 for w in words if w in ["nosotros", "nuestro"]) / total, 2)
-    referential["ellos"] = round(sum(1 for w in words if w in ["ellos", "su", "les"]) / total, 2)
-    referential["neutro"] = round(sum(1 for w in words if w in ["según", "expertos"]) / total, 2)
-    
-    return referential
-
-def analyze_linguistic_complexity(text: str) -> Dict[str, float]:
-    """Cálculo de métricas de complejidad lingüística."""
-    doc = nlp(text)
-    words = [token.text for token in doc if not token.is_punct]
-    syllables = sum([max(1, len(re.findall(r'[aeiouáéíóú]+', word.lower()))) for word in words])
-    
-    return {
-        "avg_sentence_length": round(len(words) / len(list(doc.sents)), 2) if doc.sents else 0,
-        "avg_syllables_per_word": round(syllables / len(words), 2) if words else 0,
-        "long_word_ratio": round(len([w for w in words if len(w) > 7]) / len(words), 2) if words else 0
-    }
+    def encode(task: asyncio.Task) -> str:
+        return json.dumps(task.result(), ensure_ascii=False) + "\n"
 
-def calculate_semantic_score(detected_terms: Dict) -> float:
-    """Cálculo dinámico del score semántico."""
-    if not detected_terms:
-        return 0.0
-    
-    total_score = sum(
-        len(terms) * HYPERSTITION_WEIGHTS.get(category, 1.0)
-        for category, terms in detected_terms.items()
-    )
-    return round(total_score / len(detected_terms), 3)
+    try:
+        async for row in rows:
+            line += 1
+            if isinstance(row, Exception):
+                yield json.dumps({"id": None, "line": line, "error": str(row)}, ensure_ascii=False) + "\n"
+                continue
 
-# ---------------
-# 7. ANALIZADORES ESPECIALIZADOS
-# ---------------
-class SyntacticAnalyzer:
-    """Analizador sintáctico completo con detección de estructuras complejas."""
-    
-    def analyze(self, text: str) -> Dict[str, Any]:
-        doc = nlp(text)
-        return {
-            "sentence_types": self._detect_sentence_types(doc),
-            "dependencies": self._extract_dependencies(doc),
-            "complexity": self._calculate_complexity(doc)
-        }
-
-    def _detect_sentence_types(self, doc) -> Dict:
-        types = {"declarative": 0, "interrogative": 0, "exclamative": 0}
-        for sent in doc.sents:
-            if '?' in sent.text:
-                types["interrogative"] += 1
-            elif '!' in sent.text:
-                types["exclamative"] += 1
-            else:
-                types["declarative"] += 1
-        return types
-
-    def _extract_dependencies(self, doc) -> List[Dict]:
-        return [{
-            "governor": token.head.text,
-            "dependent": token.text,
-            "relation": token.dep_
-        } for token in doc if token.dep_ not in ["punct", "space"]]
-
-    def _calculate_complexity(self, doc) -> Dict:
-        return {
-            "subordinate_clauses": sum(1 for sent in doc.sents if "mark" in [t.dep_ for t in sent]),
-            "depth_score": round(sum(len(list(token.subtree)) for token in doc) / len(doc), 2)
-        }
-
-class CognitiveIntegrator:
-    """Integrador cognitivo con cálculo de vectores de riesgo."""
-    
-    def generate_profile(self, detected_terms: Dict) -> Dict:
-        risk_vectors = {
-            category: len(terms) * HYPERSTITION_WEIGHTS.get(category, 1.0)
-            for category, terms in detected_terms.items()
-        }
-        return {
-            "risk_vectors": risk_vectors,
-            "total_risk": round(sum(risk_vectors.values()), 2)
-        }
+            item = row if isinstance(row, dict) else {}
+            item_id = item.get("id", line)
+            pending.add(asyncio.create_task(_analyze_stream_item(
+                item_id, item.get("text"), layers, item.get("post_id"), item.get("user_id")
+            )))
+
+            if len(pending) >= window:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield encode(task)
+
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield encode(task)
+    finally:
+        # Cliente desconectado: no seguir analizando en segundo plano
+        for task in pending:
+            task.cancel()
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse cuyo generador sigue leyendo el cuerpo de la petición.
+
+    StreamingResponse escucha `receive` en paralelo para detectar desconexiones
+    y consumiría (descartando) los fragmentos del cuerpo que aún no se han
+    leído. Aquí la desconexión llega al propio generador: mientras lee el
+    cuerpo, `request.stream()` lanza `ClientDisconnect`; al escribir, el
+    servidor falla con `OSError`, que se traduce igual que en StreamingResponse
+    (sea cual sea la versión ASGI). Tras BaseHTTPMiddleware, el middleware
+    cancela la respuesta interna cuando deja de poder enviar.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
 
 # ---------------
-# 8. ENDPOINT PRINCIPAL
+# 5. ENDPOINTS
 # ---------------
-@router.post("/analyze", response_model=HyperstitionOutput)
-async def full_analysis(input: TextInput):
+def _saturated(error: PoolSaturatedError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servicio de análisis saturado, reintente más tarde",
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+LAYERS_QUERY_DESCRIPTION = (
+    "Capas a calcular separadas por comas (por defecto todas): "
+    + ", ".join(ANALYSIS_LAYERS)
+)
+
+def _layers_query(raw: Optional[str]) -> Optional[FrozenSet[str]]:
+    return parse_layers(raw.split(",")) if raw is not None else None
+
+@router.post("/analyze", response_model=HyperstitionOutput, response_model_exclude_unset=True)
+async def full_analysis(
+    input: TextInput,
+    layers: Optional[str] = Query(default=None, description=LAYERS_QUERY_DESCRIPTION)
+):
     """Endpoint principal para análisis hipersticial."""
     try:
-        # Validación básica
-        if len(input.text) < 15:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Texto insuficiente para análisis (mínimo 15 caracteres)"
-            )
-
-        # Procesamiento paralelo
-        detected_terms = detect_hyperstition_terms(input.text)
-        semantic_score = calculate_semantic_score(detected_terms)
-        risk_level = "Bajo" if semantic_score < 0.1 else "Moderado" if semantic_score < 0.3 else "Alto"
-
-        return {
-            "detected_terms": detected_terms,
-            "semantic_score": semantic_score,
-            "risk_level": risk_level,
-            "linguistic_complexity": analyze_linguistic_complexity(input.text),
-            "referential_analysis": analyze_referential(input.text),
-            "syntactic_analysis": SyntacticAnalyzer().analyze(input.text),
-            "cognitive_profile": CognitiveIntegrator().generate_profile(detected_terms),
-            "metadata": {
-                "version": API_VERSION,
-                "dictionary_version": DICT_METADATA.get("version", "N/A"),
-                "timestamp": datetime.utcnow().isoformat()
-            }
-        }
+        validate_text(input.text)
+        result = await analyze_with_cache(input.text, _layers_query(layers))
+        persist_result(result, input.post_id, input.user_id)
+        return result
 
+    except PoolSaturatedError as pe:
+        raise _saturated(pe)
     except HTTPException:
         raise
     except Exception as e:
@@ -245,11 +237,180 @@ async def full_analysis(input: TextInput):
             detail=f"Error interno del sistema v{API_VERSION}"
         )
 
-# ---------------
-# 9. VERIFICACIÓN INICIAL
-# ---------------
-if __name__ == "__main__":
-    # Prueba de carga básica
-    test_text = "El neurocapitalismo y la algocracia predictiva aceleran el colapso geopolítico."
-    print("=== PRUEBA DE DETECCIÓN ===")
-    print(detect_hyperstition_terms(test_text))
\ No newline at end of file
+async def _cached_batch(
+    texts: List[str],
+    input: BatchTextInput,
+    layers: Optional[FrozenSet[str]],
+    dictionary_tag: str
+) -> Tuple[List[Dict[str, Any]], set]:
+    """Resuelve un lote con la caché y analiza en el pool los textos que faltan.
+
+    Devuelve los ítems y los diccionarios con los que se calcularon los
+    resultados nuevos.
+    """
+    keys = [analysis_cache_key(text, layers, dictionary_tag) for text in texts]
+    cached = await analysis_cache.get_many(keys)
+
+    items: List[Dict[str, Any]] = [
+        {"index": i, "result": refresh_timestamp(result)} if result is not None else {"index": i}
+        for i, result in enumerate(cached)
+    ]
+    missing = [i for i, result in enumerate(cached) if result is None]
+    tags = set()
+
+    if missing:
+        analyzed = await analysis_pool.run(
+            run_batch_analysis,
+            [texts[i] for i in missing],
+            input.batch_size,
+            input.n_process,
+            layers
+        )
+
+        fresh = {}
+        for i, item in zip(missing, analyzed):
+            item["index"] = i
+            items[i] = item
+            observe_stages(item.pop("timings", {}))
+            if item.get("result") is not None:
+                tag = result_dictionary_tag(item["result"])
+                tags.add(tag)
+                fresh[analysis_cache_key(texts[i], layers, tag)] = item["result"]
+        await analysis_cache.set_many(fresh)
+
+    return items, tags
+
+@router.post("/analyze/batch", response_model=BatchOutput, response_model_exclude_unset=True)
+async def batch_analysis(input: BatchTextInput):
+    """Análisis por lotes: un único `nlp.pipe` y errores aislados por texto."""
+    if not input.texts:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Se requiere al menos un texto para analizar"
+        )
+    if len(input.texts) > settings.NLP_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lote demasiado grande (máximo {settings.NLP_BATCH_MAX_ITEMS} textos)"
+        )
+
+    layers = parse_layers(input.layers)
+    texts = [analysis_cache.normalize(text) for text in input.texts]
+    for text in texts:
+        observe_text_length(text)
+    try:
+        dictionary_tag = get_resources().tag
+        items, tags = await _cached_batch(texts, input, layers, dictionary_tag)
+        if tags - {dictionary_tag}:
+            # El diccionario cambió durante la petición: repetir con la versión
+            # nueva para no mezclar resultados cacheados y frescos de versiones distintas
+            items, _ = await _cached_batch(texts, input, layers, (tags - {dictionary_tag}).pop())
+    except PoolSaturatedError as pe:
+        raise _saturated(pe)
+
+    failed = sum(1 for item in items if item.get("error"))
+    return {
+        "results": [
+            {"index": item["index"], "result": item.get("result"), "error": item.get("error")}
+            for item in items
+        ],
+        "processed": len(items) - failed,
+        "failed": failed
+    }
+
+@router.post("/analyze/stream")
+async def stream_analysis(
+    request: Request,
+    layers: Optional[str] = Query(default=None, description=LAYERS_QUERY_DESCRIPTION)
+):
+    """
+    Análisis en streaming para corpus grandes.
+
+    Recibe NDJSON (`{"id": ..., "text": ...}` por línea, con `post_id` y
+    `user_id` opcionales para persistir el resultado) y devuelve NDJSON
+    (`{"id": ..., "result": ...}` o `{"id": ..., "error": ...}`) a medida que
+    cada texto termina, sin cargar el corpus completo en memoria.
+    """
+    return DuplexStreamingResponse(
+        stream_analysis_results(
+            iter_ndjson(request), settings.ANALYSIS_STREAM_WINDOW, _layers_query(layers)
+        ),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/posts")
+async def analyzed_posts(
+    risk_level: Optional[str] = Query(default=None, description="Bajo, Moderado o Alto"),
+    min_score: Optional[float] = Query(default=None, ge=0),
+    user_id: Optional[str] = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=1000),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Posts con análisis persistido, filtrados desde el grafo sin reanalizar.
+
+    Los filtros usan los índices `post_risk_score` y `post_semantic_score`;
+    con `user_id` se parte del autor por la relación POSTED.
+    """
+    # Sólo se incluyen las condiciones pedidas para que el planificador use los índices
+    conditions = ["p.semantic_score IS NOT NULL"]
+    if risk_level is not None:
+        conditions.append("p.risk_level = $risk_level")
+    if min_score is not None:
+        conditions.append("p.semantic_score >= $min_score")
+    match = "MATCH (:User {id: $user_id})-[:POSTED]->(p:Post)" if user_id else "MATCH (p:Post)"
+    query = f"""
+    {match}
+    WHERE {" AND ".join(conditions)}
+    RETURN p.id AS id, p.semantic_score AS semantic_score, p.risk_level AS risk_level,
+           toString(p.analyzed_at) AS analyzed_at,
+           [(p)-[m:MENTIONS]->(t:Term) | {{term: t.name, category: m.category}}] AS terms
+    ORDER BY p.semantic_score DESC
+    LIMIT $limit
+    """
+
+    async def read(tx):
+        result = await tx.run(
+            query, risk_level=risk_level, min_score=min_score, user_id=user_id, limit=limit
+        )
+        return [record.data() async for record in result]
+
+    try:
+        posts = await session.execute_read(read)
+    except Exception as e:
+        logger.error(f"Error consultando posts analizados: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Base de datos no disponible"
+        )
+    return {"posts": posts, "count": len(posts)}
+
+@router.post("/dictionary/reload")
+async def reload_dictionary(x_admin_token: Optional[str] = Header(default=None)):
+    """
+    Valida el diccionario en disco y lo activa sin reiniciar (administración).
+
+    Este proceso lo recarga de inmediato; los trabajadores del pool lo hacen
+    en menos de `DICTIONARY_RELOAD_INTERVAL` segundos. Si el fichero no es
+    válido se responde 422 y se mantiene la versión activa.
+    """
+    # Comparación en tiempo constante: no revela cuántos caracteres coinciden
+    if not settings.ADMIN_TOKEN or not hmac.compare_digest(
+        (x_admin_token or "").encode(), settings.ADMIN_TOKEN.encode()
+    ):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Acceso no autorizado")
+
+    try:
+        resources, changed = await asyncio.to_thread(reload_resources)
+    except (OSError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Diccionario no válido: {str(e)}"
+        )
+    return {
+        "changed": changed,
+        "version": resources.version,
+        "fingerprint": resources.fingerprint,
+        "categories": len(resources.categories),
+        "terms": sum(len(terms) for terms in resources.categories.values())
+    }
@@ -0,0 +1,74 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from neo4j import AsyncSession
+
+from app.config.settings import settings
+from app.models import NetworkRelationCreate
+from app.services.database import get_session
+from app.services.ingestion import bulk_write, iter_request_rows
+from app.services.network import FOLLOWS_QUERY, REPOSTS_QUERY, network_analyzer
+
+router = APIRouter(prefix="/network", tags=["Network"])
+
+@router.post("/follows/bulk", summary="Ingesta masiva de relaciones FOLLOWS entre usuarios")
+async def create_follows_bulk(
+    request: Request,
+    chunk_size: Optional[int] = Query(default=None, ge=1, le=50000),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Crea `(source)-[:FOLLOWS]->(target)` en lotes e invalida los agregados de
+    alcance afectados (hasta `NETWORK_MAX_DEPTH` saltos).
+    """
+    async def invalidate(batch):
+        await network_analyzer.invalidate(
+            session, "user",
+            [row["target_id"] for row in batch],
+            touched=[row["source_id"] for row in batch]
+        )
+
+    return await bulk_write(
+        session,
+        FOLLOWS_QUERY,
+        iter_request_rows(request),
+        NetworkRelationCreate,
+        chunk_size or settings.NEO4J_BULK_CHUNK_SIZE,
+        after_write=invalidate
+    )
+
+@router.post("/reposts/bulk", summary="Ingesta masiva de relaciones REPOST_OF entre posts")
+async def create_reposts_bulk(
+    request: Request,
+    chunk_size: Optional[int] = Query(default=None, ge=1, le=50000),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Crea `(repost)-[:REPOST_OF]->(original)` en lotes e invalida las
+    cascadas del post original y de sus ancestros.
+    """
+    async def invalidate(batch):
+        await network_analyzer.invalidate(session, "post", [row["target_id"] for row in batch])
+
+    return await bulk_write(
+        session,
+        REPOSTS_QUERY,
+        iter_request_rows(request),
+        NetworkRelationCreate,
+        chunk_size or settings.NEO4J_BULK_CHUNK_SIZE,
+        after_write=invalidate
+    )
+
+@router.get("/users/{user_id}", summary="Agregados de red de un usuario")
+async def user_metrics(user_id: str):
+    metrics = await network_analyzer.metrics("user", user_id)
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado en el grafo")
+    return metrics
+
+@router.get("/posts/{post_id}", summary="Agregados de red de un post")
+async def post_metrics(post_id: str):
+    metrics = await network_analyzer.metrics("post", post_id)
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="Post no encontrado en el grafo")
+    return metrics
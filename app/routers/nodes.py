@@ -1,18 +1,54 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.utils.neo4j_connector import Neo4jConnector
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from neo4j import AsyncSession
+from neo4j.exceptions import ConstraintError
+
+from app.config.settings import settings
+from app.models import NodeCreate
+from app.services.database import get_session
+from app.services.ingestion import bulk_write, iter_request_rows
 
 router = APIRouter(prefix="/nodes", tags=["Nodes"])
 
+BULK_NODES_QUERY = """
+UNWIND $rows AS row
+MERGE (n:Node {id: row.id})
+SET n.name = row.name, n.type = row.type
+RETURN count(n) AS written
+"""
+
 @router.post("/")
-async def create_node(node_data: dict, connector: Neo4jConnector = Depends()):
+async def create_node(node_data: dict, session: AsyncSession = Depends(get_session)):
+    async def create(tx):
+        result = await tx.run("CREATE (n:Node $props) RETURN n", props=node_data)
+        record = await result.single()
+        return record.data()
+
     try:
-        with connector.driver.session() as session:
-            result = session.execute_write(
-                lambda tx: tx.run(
-                    "CREATE (n:Node $props) RETURN n",
-                    props=node_data
-                )
-            )
-            return result.single().data()
+        return await session.execute_write(create)
+    except ConstraintError as e:
+        # Con NEO4J_NODE_ID_UNIQUE, un id ya existente no se duplica
+        raise HTTPException(status_code=409, detail=f"El nodo ya existe: {e}")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/bulk", summary="Ingesta masiva de nodos (array JSON o NDJSON)")
+async def create_nodes_bulk(
+    request: Request,
+    chunk_size: Optional[int] = Query(default=None, ge=1, le=50000),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Crea o actualiza nodos `NodeCreate` en lotes `UNWIND ... MERGE`.
+
+    Cada lote de `chunk_size` filas es una transacción; la respuesta detalla
+    filas recibidas, escritas e inválidas por lote.
+    """
+    return await bulk_write(
+        session,
+        BULK_NODES_QUERY,
+        iter_request_rows(request),
+        NodeCreate,
+        chunk_size or settings.NEO4J_BULK_CHUNK_SIZE
+    )
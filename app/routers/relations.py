@@ -1,24 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request
+from neo4j import AsyncSession
+
+from app.config.settings import settings
 from app.models.schemas import RelationCreate  # Asegúrate de tener este modelo
-from app.utils.neo4j_connector import Neo4jConnector
+from app.services.database import get_session
+from app.services.ingestion import bulk_write, iter_request_rows
 
 router = APIRouter(prefix="/relations", tags=["Relations"])
 
+BULK_RELATIONS_QUERY = """
+UNWIND $rows AS row
+MATCH (a:Node {id: row.source_id})
+MATCH (b:Node {id: row.target_id})
+MERGE (a)-[r:RELATION {type: row.relation_type}]->(b)
+RETURN count(r) AS written
+"""
+
 @router.post("/")
 async def create_relation(
     relation_data: RelationCreate = Body(...),  # Usar Body para recibir JSON
-    connector: Neo4jConnector = Depends()
+    session: AsyncSession = Depends(get_session)
 ):
+    async def create(tx):
+        result = await tx.run(
+            """MATCH (a:Node {id: $source_id}), (b:Node {id: $target_id})
+               CREATE (a)-[r:RELATION {type: $rel_type}]->(b)
+               RETURN r""",
+            source_id=relation_data.source_id,
+            target_id=relation_data.target_id,
+            rel_type=relation_data.relation_type
+        )
+        record = await result.single()
+        return record.data() if record else None
+
     try:
-        with connector.driver.session() as session:
-            result = session.run(
-                """MATCH (a:Node {id: $source_id}), (b:Node {id: $target_id})
-                   CREATE (a)-[r:RELATION {type: $rel_type}]->(b)
-                   RETURN r""",
-                source_id=relation_data.source_id,
-                target_id=relation_data.target_id,
-                rel_type=relation_data.relation_type
-            )
-            return result.single().data()
+        result = await session.execute_write(create)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if result is None:
+        raise HTTPException(status_code=404, detail="Nodo origen o destino no encontrado")
+    return result
+
+@router.post("/bulk", summary="Ingesta masiva de relaciones (array JSON o NDJSON)")
+async def create_relations_bulk(
+    request: Request,
+    chunk_size: Optional[int] = Query(default=None, ge=1, le=50000),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Crea relaciones `RelationCreate` en lotes `UNWIND ... MERGE`.
+
+    Las filas cuyo nodo origen o destino no existe no se escriben, por lo que
+    `written` puede ser menor que las filas válidas del lote.
+    """
+    return await bulk_write(
+        session,
+        BULK_RELATIONS_QUERY,
+        iter_request_rows(request),
+        RelationCreate,
+        chunk_size or settings.NEO4J_BULK_CHUNK_SIZE
+    )
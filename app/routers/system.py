@@ -24,7 +24,7 @@ async def health_check():
     """
     try:
         db_status = await check_db_connection()
-        redis_status = redis_cache.client.ping() if settings.USE_REDIS else "disabled"
+        redis_status = await redis_cache.ping() if settings.USE_REDIS else "disabled"
 
         return {
             "status": "operational",
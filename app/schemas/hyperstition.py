@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Dict, List
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 
 # Esquema para análisis sintáctico
 class SyntacticOutput(BaseModel):
@@ -10,13 +10,20 @@ class SyntacticOutput(BaseModel):
     negation_patterns: Dict[str, List[str]]
     subject_positions: Dict[str, int]
 
+# Estado de ejecución de cada capa del análisis integrado
+class LayerStatus(BaseModel):
+    status: str  # "ok", "timeout", "error" o "skipped"
+    seconds: float
+    detail: Optional[str] = None
+
 # Esquema principal que incluye todas las capas
 class FullAnalysisOutput(BaseModel):
-    hyperstition: Dict  # Asumiendo que tienes un esquema HyperstitionOutput definido
+    hyperstition: Dict[str, Any]  # Capas de HyperstitionOutput (términos, score, expansión...)
     semantics: Dict[str, float]
     syntax: SyntacticOutput  # Nueva sección
+    network: Dict[str, Any]
+    psychoaffective: Dict[str, Any]
+    cognitive_profile: Dict[str, Any]
     risk_profile: Dict[str, str]
     discourse_style: str
-
-# Si usas otros esquemas, importalos:
-# from .hyperstition import HyperstitionOutput
\ No newline at end of file
+    layers: Dict[str, LayerStatus] = Field(default_factory=dict)
@@ -1,8 +1,98 @@
-import logging
-from typing import Dict, Any, Optional
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config.settings import settings
 from app.utils.logger import analysis_logger
-from app.models.analysis import SyntacticProphet  # Asumiendo modelo existente
-from app.schemas.hyperstition import FullAnalysisOutput  # Esquema de respuesta
+from app.services.network import network_analyzer
+from app.schemas.hyperstition import FullAnalysisOutput, LayerStatus, SyntacticOutput
+from app.services.pipeline import analyze_with_cache
+
+# Capas de /hyperstition que alimenta cada capa del análisis integrado.
+# La semántica sólo necesita el tokenizador; la sintáctica, el parser.
+SEMANTIC_LAYERS = frozenset({
+    "detected_terms", "semantic_score", "risk_level", "cognitive_profile",
+    "referential_analysis", "semantic_expansion",
+})
+SYNTACTIC_LAYERS = frozenset({"syntactic_analysis", "linguistic_complexity"})
+
+# Salidas neutras con las que se sustituye una capa que falla o no llega a tiempo
+NEUTRAL_NETWORK = {"amplification_risk": 0.0, "available": False, "user": None, "post": None}
+NEUTRAL_SYNTAX = {
+    "sentence_types": {"declarative": 0, "interrogative": 0, "exclamative": 0},
+    "dependencies": [],
+    "complexity": {"subordinate_clauses": 0, "depth_score": 0.0},
+    "voice": {"active": 0, "passive": 0},
+    "negation_patterns": {},
+    "subject_positions": {"preverbal": 0, "postverbal": 0, "omitted": 0},
+}
+
+
+class Layer:
+    """Nodo del DAG de análisis: función asíncrona, dependencias y timeout.
+
+    `run` recibe los resultados de sus dependencias por nombre. Si supera el
+    timeout o lanza una excepción, el nodo entrega `fallback()` y su estado
+    queda marcado; las capas que dependen de él siguen con ese resultado.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Dict[str, Any]], Awaitable[Any]],
+        fallback: Callable[[], Any],
+        timeout: Optional[float] = None,
+        depends_on: Tuple[str, ...] = (),
+    ):
+        self.name = name
+        self.run = run
+        self.fallback = fallback
+        self.timeout = timeout
+        self.depends_on = depends_on
+
+
+async def run_layers(layers: Dict[str, Layer]) -> Tuple[Dict[str, Any], Dict[str, LayerStatus]]:
+    """Ejecuta el DAG: cada capa arranca en cuanto terminan sus dependencias.
+
+    Las capas independientes corren a la vez, así que la latencia total es la
+    del camino más lento y no la suma de todas. Un timeout cancela la espera,
+    no el trabajo ya enviado al pool de análisis (que no llega a cachearse).
+    """
+    tasks: Dict[str, asyncio.Task] = {}
+    statuses: Dict[str, LayerStatus] = {}
+
+    async def execute(layer: Layer) -> Any:
+        inputs = {name: await tasks[name] for name in layer.depends_on}
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(layer.run(inputs), layer.timeout)
+            status, detail = "ok", None
+        except asyncio.TimeoutError:
+            result, status, detail = layer.fallback(), "timeout", f"Más de {layer.timeout}s"
+            analysis_logger.warning(f"⏱️ Capa {layer.name} degradada: {detail}")
+        except Exception as e:
+            result, status, detail = layer.fallback(), "error", str(e)
+            analysis_logger.warning(f"⚠️ Capa {layer.name} degradada: {detail}")
+        statuses[layer.name] = LayerStatus(
+            status=status, seconds=round(time.perf_counter() - started, 4), detail=detail
+        )
+        return result
+
+    pending = dict(layers)
+    while pending:
+        ready = [
+            layer for layer in pending.values()
+            if all(name in tasks for name in layer.depends_on)
+        ]
+        if not ready:
+            raise ValueError(f"Dependencias circulares o desconocidas: {sorted(pending)}")
+        for layer in ready:
+            tasks[layer.name] = asyncio.create_task(execute(layer))
+            del pending[layer.name]
+
+    results = await asyncio.gather(*tasks.values())
+    return dict(zip(tasks, results)), statuses
+
 
 class CognitiveIntegrator:
     def __init__(self):
@@ -13,87 +103,195 @@ class CognitiveIntegrator:
             'psychoaffective': 0.1
         }
 
-    def fuse_layers(self, 
+    def fuse_layers(self,
                    hyperstition_data: Dict,
                    syntactic_data: Dict,
-                   network_data: Dict) -> FullAnalysisOutput:
+                   network_data: Dict,
+                   psychoaffective_data: Optional[Dict] = None,
+                   layers: Optional[Dict[str, LayerStatus]] = None) -> FullAnalysisOutput:
         """Integra múltiples capas analíticas en una estructura cognitiva unificada"""
-        
+        psychoaffective_data = psychoaffective_data or {"polarization": 0.0}
+
         # 1. Validación de datos entrantes
         self._validate_inputs(hyperstition_data, syntactic_data, network_data)
-        
+
         # 2. Cálculo de métricas combinadas
+        semantic_score = hyperstition_data.get('semantic_score', 0.0)
+        syntactic_score = self._syntactic_index(syntactic_data)
         cognitive_score = self._calculate_cognitive_index(
-            hyperstition_data.get('semantic_score', 0),
-            syntactic_data.get('complexity_score', 0),
-            network_data.get('amplification_risk', 0)
+            semantic_score,
+            syntactic_score,
+            network_data.get('amplification_risk', 0.0),
+            psychoaffective_data.get('polarization', 0.0)
         )
-        
+        expansion = hyperstition_data.get('semantic_expansion') or {}
+
         # 3. Construcción de la respuesta unificada
         return FullAnalysisOutput(
             hyperstition=hyperstition_data,
-            syntax=syntactic_data,
+            semantics={
+                "semantic_score": semantic_score,
+                "syntactic_score": syntactic_score,
+                "expanded_terms": float(sum(len(m) for m in expansion.get('matches', {}).values())),
+                "total_risk": float(hyperstition_data.get('cognitive_profile', {}).get('total_risk', 0.0)),
+            },
+            syntax=SyntacticOutput(**syntactic_data),
             network=network_data,
+            psychoaffective=psychoaffective_data,
             cognitive_profile={
                 "score": cognitive_score,
                 "risk_category": self._classify_risk(cognitive_score)
             },
+            risk_profile={
+                "semantic": hyperstition_data.get('risk_level', "N/A"),
+                "network": self._classify_risk(network_data.get('amplification_risk', 0.0)),
+                "cognitive": self._classify_risk(cognitive_score),
+            },
             discourse_style=self._detect_discourse_style(
-                syntactic_data, 
-                hyperstition_data
-            )
+                syntactic_data,
+                psychoaffective_data
+            ),
+            layers=layers or {}
         )
 
-    def _calculate_cognitive_index(self, 
-                                  semantic: float, 
-                                  syntactic: float, 
-                                  network: float) -> float:
-        """Calcula índice cognitivo ponderado"""
+    def _validate_inputs(self, *layers: Dict):
+        for layer in layers:
+            if not isinstance(layer, dict):
+                raise ValueError(f"Capa con formato inválido: {type(layer).__name__}")
+
+    def _syntactic_index(self, syntactic_data: Dict) -> float:
+        """Subordinación por oración y proporción de pasivas, en [0, 1]"""
+        sentences = sum(syntactic_data['sentence_types'].values())
+        if not sentences:
+            return 0.0
+        subordination = min(1.0, syntactic_data['complexity'].get('subordinate_clauses', 0) / sentences)
+        voice = syntactic_data['voice']
+        predicates = voice.get('active', 0) + voice.get('passive', 0)
+        passive_ratio = voice.get('passive', 0) / predicates if predicates else 0.0
+        return round(0.6 * subordination + 0.4 * passive_ratio, 3)
+
+    def _calculate_cognitive_index(self,
+                                  semantic: float,
+                                  syntactic: float,
+                                  network: float,
+                                  psychoaffective: float = 0.0) -> float:
+        """Calcula índice cognitivo ponderado (el score semántico se satura en 1)"""
         return round(
-            (semantic * self.cognitive_weights['semantic']) +
+            (min(semantic, 1.0) * self.cognitive_weights['semantic']) +
             (syntactic * self.cognitive_weights['syntactic']) +
-            (network * self.cognitive_weights['network']), 2
+            (network * self.cognitive_weights['network']) +
+            (psychoaffective * self.cognitive_weights['psychoaffective']), 2
         )
 
+    def _classify_risk(self, score: float) -> str:
+        return "Bajo" if score < 0.3 else "Moderado" if score < 0.6 else "Alto"
+
+    def _detect_discourse_style(self, syntactic_data: Dict, psychoaffective_data: Dict) -> str:
+        types = syntactic_data['sentence_types']
+        sentences = sum(types.values())
+        if not sentences:
+            return "indeterminado"
+        if types.get('interrogative', 0) * 2 > sentences:
+            return "interrogativo"
+        if types.get('exclamative', 0) * 2 > sentences:
+            return "exhortativo"
+        if psychoaffective_data.get('polarization', 0.0) >= 0.5:
+            return "polarizado"
+        voice = syntactic_data['voice']
+        if voice.get('passive', 0) > voice.get('active', 0):
+            return "impersonal"
+        return "declarativo"
+
+
 class HyperstitionAnalyzer:
-    def __init__(self, text: str):
+    def __init__(self, text: str, user_id: Optional[str] = None, post_id: Optional[str] = None):
         self.text = text
+        self.user_id = user_id
+        self.post_id = post_id
         self.integrator = CognitiveIntegrator()
-        self.syntactic_engine = SyntacticProphet()
         self.analysis = {
             "base_layers": {},
             "cognitive_layer": {},
             "integrated_output": None
         }
 
-    def _analyze_syntax(self) -> Dict:
-        """Ejecuta análisis sintáctico completo"""
-        return self.syntactic_engine.full_analysis(self.text)
+    async def analyze_semantic_layer(self, _: Dict = None) -> Dict:
+        """Términos, score, perfil de riesgo, expansión y referencial (caché + pool)"""
+        result = await analyze_with_cache(self.text, SEMANTIC_LAYERS)
+        self.analysis["base_layers"].update(result)
+        return result
+
+    async def analyze_psychoaffective_layer(self, inputs: Dict) -> Dict:
+        """Polarización nosotros/ellos y carga de riesgo a partir de la capa semántica"""
+        semantic = inputs.get("semantic") or {}
+        referential = semantic.get("referential_analysis") or {}
+        us, them = referential.get("nosotros", 0.0), referential.get("ellos", 0.0)
+        # Marcas de grupo saturadas al 10% de las palabras
+        polarization = round(min(1.0, (us + them) * 10), 3)
+        risk_vectors = (semantic.get("cognitive_profile") or {}).get("risk_vectors", {})
+        result = {
+            "polarization": polarization,
+            "group_framing": "nosotros-ellos" if us and them else "nosotros" if us else "ellos" if them else "ninguno",
+            "dominant_category": max(risk_vectors, key=risk_vectors.get) if risk_vectors else None,
+        }
+        self.analysis["cognitive_layer"]["psychoaffective"] = result
+        return result
 
-    def full_analysis(self) -> FullAnalysisOutput:
+    async def analyze_network_layer(self, _: Dict = None) -> Dict:
+        """Capa de red: riesgo de amplificación del autor y del post en el grafo"""
+        if not (self.user_id or self.post_id):
+            return dict(NEUTRAL_NETWORK)
+        try:
+            return await network_analyzer.analyze(self.user_id, self.post_id)
+        except Exception as e:
+            analysis_logger.warning(f"Capa de red no disponible: {str(e)}")
+            return dict(NEUTRAL_NETWORK)
+
+    async def _analyze_syntax(self, _: Dict = None) -> Dict:
+        """Ejecuta análisis sintáctico completo (parser + reglas de SyntacticProphet)"""
+        result = await analyze_with_cache(self.text, SYNTACTIC_LAYERS)
+        self.analysis["base_layers"]["linguistic_complexity"] = result.get("linguistic_complexity")
+        return result["syntactic_analysis"]
+
+    def layers(self) -> Dict[str, Layer]:
+        """DAG del análisis: red y las dos capas NLP en paralelo; la psicoafectiva
+        espera a la semántica."""
+        return {
+            "semantic": Layer(
+                "semantic", self.analyze_semantic_layer, dict,
+                settings.FULL_ANALYSIS_SEMANTIC_TIMEOUT,
+            ),
+            "syntactic": Layer(
+                "syntactic", self._analyze_syntax, lambda: dict(NEUTRAL_SYNTAX),
+                settings.FULL_ANALYSIS_SYNTACTIC_TIMEOUT,
+            ),
+            "network": Layer(
+                "network", self.analyze_network_layer, lambda: dict(NEUTRAL_NETWORK),
+                settings.FULL_ANALYSIS_NETWORK_TIMEOUT,
+            ),
+            "psychoaffective": Layer(
+                "psychoaffective", self.analyze_psychoaffective_layer,
+                lambda: {"polarization": 0.0, "group_framing": "ninguno", "dominant_category": None},
+                depends_on=("semantic",),
+            ),
+        }
+
+    async def full_analysis(self) -> FullAnalysisOutput:
         """Flujo completo de análisis integrado"""
         try:
-            # Capa hipersticiosa
-            self.analyze_semantic_layer()
-            self.analyze_psychoaffective_layer()
-            
-            # Capa de red
-            network_data = self.analyze_network_layer()
-            
-            # Capa sintáctica
-            syntactic_data = self._analyze_syntax()
-            
+            results, statuses = await run_layers(self.layers())
+
             # Integración cognitiva
             self.analysis["integrated_output"] = self.integrator.fuse_layers(
-                hyperstition_data=self.analysis["base_layers"],
-                syntactic_data=syntactic_data,
-                network_data=network_data
+                hyperstition_data=results["semantic"],
+                syntactic_data=results["syntactic"],
+                network_data=results["network"],
+                psychoaffective_data=results["psychoaffective"],
+                layers=statuses
             )
-            
+
             return self.analysis["integrated_output"]
 
         except Exception as e:
             analysis_logger.error(f"Error de integración cognitiva: {str(e)}")
             raise
-
-# ... (Mantener métodos existentes de HyperstitionAnalyzer sin cambios) ... 
\ No newline at end of file
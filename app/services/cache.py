@@ -1,39 +1,271 @@
 import redis
-import asyncio
+import redis.asyncio as aioredis
+import hashlib
+import json
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
 
-REDIS_URL = "redis://redis:6379"
+from app.config.settings import settings
 
 class RedisCache:
-    def __init__(self, url: str):
-        self.url = url
-        self.client = None
-
-    async def initialize(self):
-        """Inicializa la conexión a Redis."""
-        loop = asyncio.get_event_loop()
-        self.client = redis.Redis.from_url(
-            self.url, decode_responses=True, socket_timeout=5, socket_connect_timeout=5
-        )
+    """Cliente Redis asíncrono con un pool de conexiones acotado."""
+
+    def __init__(self, host: str, port: int, db: int = 0, max_connections: int = 20,
+                 socket_timeout: float = 5.0, pool_timeout: float = 2.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.max_connections = max_connections
+        self.socket_timeout = socket_timeout
+        self.pool_timeout = pool_timeout
+        self.pool: Optional[aioredis.ConnectionPool] = None
+        self.client: Optional[aioredis.Redis] = None
+
+    async def initialize(self, client: Optional[aioredis.Redis] = None):
+        """Inicializa la conexión a Redis.
+
+        Args:
+            client: Cliente ya construido (p. ej. `fakeredis.aioredis.FakeRedis`
+                en tests). Si se omite se crea un pool con la configuración.
+        """
+        if client is None:
+            # BlockingConnectionPool espera hasta `pool_timeout` por una conexión
+            # libre en lugar de abrir conexiones sin límite
+            self.pool = aioredis.BlockingConnectionPool(
+                host=self.host,
+                port=self.port,
+                db=self.db,
+                max_connections=self.max_connections,
+                timeout=self.pool_timeout,
+                socket_timeout=self.socket_timeout,
+                socket_connect_timeout=self.socket_timeout,
+                decode_responses=True,
+            )
+            client = aioredis.Redis(connection_pool=self.pool)
+        self.client = client
+
         try:
             # Verifica si Redis está disponible
-            pong = self.client.ping()
-            if pong:
+            if await self.client.ping():
                 print("✅ Conexión a Redis establecida correctamente.")
             else:
                 print("⚠️ No se pudo conectar a Redis.")
-        except redis.ConnectionError as e:
+        except (redis.ConnectionError, redis.TimeoutError) as e:
             print(f"❌ Error de conexión a Redis: {str(e)}")
-            self.client = None
+            await self.close()
+
+    async def ping(self) -> bool:
+        """Comprueba la conexión sin bloquear el event loop."""
+        if not self.client:
+            return False
+        return bool(await self.client.ping())
+
+    async def get(self, key: str) -> Optional[str]:
+        """Obtiene un valor; None si no existe o Redis no está disponible."""
+        if not self.client:
+            return None
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: str, ttl: Optional[int] = None):
+        """Guarda un valor con expiración opcional (segundos)."""
+        if self.client:
+            await self.client.set(key, value, ex=ttl)
+
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Obtiene varios valores en un único viaje de red."""
+        if not self.client or not keys:
+            return [None] * len(keys)
+        return await self.client.mget(keys)
+
+    async def mset(self, mapping: Dict[str, str], ttl: Optional[int] = None):
+        """Guarda varios valores (con expiración) en un pipeline sin transacción."""
+        if not self.client or not mapping:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in mapping.items():
+                pipe.set(key, value, ex=ttl)
+            await pipe.execute()
+
+    async def delete(self, *keys: str) -> int:
+        """Borra claves; devuelve cuántas existían."""
+        if not self.client or not keys:
+            return 0
+        return await self.client.delete(*keys)
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Uso del pool de conexiones (creadas / en uso / máximo)."""
+        if self.pool is None:
+            return {"created": 0, "in_use": 0, "max": self.max_connections}
+        in_use = len(getattr(self.pool, "_in_use_connections", ()))
+        available = len(getattr(self.pool, "_available_connections", ()))
+        return {
+            "created": in_use + available,
+            "in_use": in_use,
+            "max": self.max_connections,
+        }
 
     async def close(self):
-        """Cierra la conexión a Redis."""
+        """Cierra la conexión a Redis y libera el pool."""
         if self.client:
-            self.client.close()
+            await self.client.aclose()
+            self.client = None
             print("🔌 Conexión a Redis cerrada.")
+        if self.pool is not None:
+            await self.pool.disconnect()
+            self.pool = None
 
 # Instancia global del cliente Redis
-redis_cache = RedisCache(REDIS_URL)
+redis_cache = RedisCache(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    db=settings.REDIS_DB,
+    max_connections=settings.REDIS_MAX_CONNECTIONS,
+    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    pool_timeout=settings.REDIS_POOL_TIMEOUT,
+)
+
+class AnalysisCache:
+    """Caché de resultados de análisis direccionada por contenido.
+
+    Un LRU en memoria del proceso actúa delante de Redis. La clave se deriva
+    del hash del texto normalizado y de las versiones de la API y del
+    diccionario, por lo que un cambio de versión invalida las entradas.
+    """
+
+    PREFIX = "hyperstition:analysis"
+
+    def __init__(self, backend: RedisCache, max_entries: int = 1024, ttl: int = 86400,
+                 enabled: bool = True):
+        self.backend = backend
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.enabled = enabled
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self.counters = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "errors": 0}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Forma canónica del texto: Unicode NFC y espacios colapsados."""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    def make_key(self, normalized_text: str, *versions: str) -> str:
+        digest = hashlib.sha256(normalized_text.encode("utf-8")).hexdigest()
+        return ":".join([self.PREFIX, *versions, digest])
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+
+        entry = self._local.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._local.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return value
+            del self._local[key]
+
+        try:
+            raw = await self.backend.get(key)
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"⚠️ Error leyendo caché de análisis: {str(e)}")
+            raw = None
+
+        if raw is None:
+            self.counters["misses"] += 1
+            return None
+
+        value = json.loads(raw)
+        self._remember(key, value)
+        self.counters["redis_hits"] += 1
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        if not self.enabled:
+            return
+
+        self._remember(key, value)
+        try:
+            await self.backend.set(key, json.dumps(value, ensure_ascii=False), ttl=self.ttl)
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"⚠️ Error escribiendo caché de análisis: {str(e)}")
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Versión por lotes de `get`: un solo MGET para lo que no está en memoria."""
+        if not self.enabled:
+            return [None] * len(keys)
+
+        values: List[Optional[Dict[str, Any]]] = [None] * len(keys)
+        remote = []
+        now = time.monotonic()
+        for i, key in enumerate(keys):
+            entry = self._local.get(key)
+            if entry is not None and entry[0] > now:
+                self._local.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                values[i] = entry[1]
+            else:
+                remote.append(i)
+
+        if remote:
+            try:
+                raws = await self.backend.mget([keys[i] for i in remote])
+            except Exception as e:
+                self.counters["errors"] += 1
+                print(f"⚠️ Error leyendo caché de análisis: {str(e)}")
+                raws = [None] * len(remote)
+
+            for i, raw in zip(remote, raws):
+                if raw is None:
+                    self.counters["misses"] += 1
+                    continue
+                values[i] = json.loads(raw)
+                self._remember(keys[i], values[i])
+                self.counters["redis_hits"] += 1
+
+        return values
+
+    async def set_many(self, items: Dict[str, Dict[str, Any]]):
+        """Versión por lotes de `set`: un único pipeline hacia Redis."""
+        if not self.enabled or not items:
+            return
+
+        for key, value in items.items():
+            self._remember(key, value)
+        try:
+            await self.backend.mset(
+                {key: json.dumps(value, ensure_ascii=False) for key, value in items.items()},
+                ttl=self.ttl,
+            )
+        except Exception as e:
+            self.counters["errors"] += 1
+            print(f"⚠️ Error escribiendo caché de análisis: {str(e)}")
+
+    def _remember(self, key: str, value: Dict[str, Any]):
+        self._local[key] = (time.monotonic() + self.ttl, value)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        hits = self.counters["memory_hits"] + self.counters["redis_hits"]
+        return {**self.counters, "hits": hits, "local_entries": len(self._local)}
+
+    def clear_local(self):
+        self._local.clear()
+
+# Caché de resultados del análisis hipersticioso
+analysis_cache = AnalysisCache(
+    redis_cache,
+    max_entries=settings.ANALYSIS_CACHE_LRU_SIZE,
+    ttl=settings.ANALYSIS_CACHE_TTL,
+    enabled=settings.ANALYSIS_CACHE_ENABLED,
+)
 
 async def get_redis_pool():
-    """Retorna la instancia global de Redis."""
+    """Retorna el cliente Redis global (comparte el pool de conexiones)."""
     return redis_cache.client
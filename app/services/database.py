@@ -1,43 +1,134 @@
-import asyncio
-from neo4j import GraphDatabase
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional
 
-# Configurar conexión a Neo4j
-NEO4J_URI = "bolt://neo4j:7687"
-NEO4J_USER = "neo4j"
-NEO4J_PASSWORD = "hyperstition"
+from neo4j import AsyncDriver, AsyncGraphDatabase, AsyncSession
 
-# Crear driver de conexión
-driver = GraphDatabase.driver(NEO4J_URI, auth=(NEO4J_USER, NEO4J_PASSWORD))
+from app.config.settings import settings
+
+# Driver único por proceso: mantiene el pool de conexiones Bolt
+_driver: Optional[AsyncDriver] = None
+# Sesiones abiertas (cada una retiene como mucho una conexión del pool)
+_sessions_in_use = 0
+
+def get_driver() -> AsyncDriver:
+    """Devuelve el driver asíncrono compartido, creándolo en el primer uso."""
+    global _driver
+    if _driver is None:
+        _driver = AsyncGraphDatabase.driver(
+            settings.NEO4J_URI,
+            auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD),
+            max_connection_pool_size=settings.NEO4J_MAX_POOL_SIZE,
+            connection_acquisition_timeout=settings.NEO4J_ACQUISITION_TIMEOUT,
+            connection_timeout=settings.NEO4J_CONNECTION_TIMEOUT,
+            max_connection_lifetime=settings.NEO4J_MAX_CONNECTION_LIFETIME,
+        )
+    return _driver
+
+@asynccontextmanager
+async def open_session() -> AsyncIterator[AsyncSession]:
+    """Sesión del driver compartido, contabilizada para las métricas del pool."""
+    global _sessions_in_use
+    _sessions_in_use += 1
+    try:
+        async with get_driver().session() as session:
+            yield session
+    finally:
+        _sessions_in_use -= 1
+
+async def get_session() -> AsyncIterator[AsyncSession]:
+    """Dependencia FastAPI: sesión del pool compartido, cerrada al terminar la petición."""
+    async with open_session() as session:
+        yield session
+
+def pool_stats() -> Dict[str, int]:
+    """Uso del pool de Neo4j en este proceso."""
+    return {"sessions_in_use": _sessions_in_use, "max_connections": settings.NEO4J_MAX_POOL_SIZE}
 
 async def check_db_connection():
     """Verifica si la conexión con Neo4j es exitosa."""
-    loop = asyncio.get_event_loop()
     try:
-        def query(tx):
-            return tx.run("RETURN 'Conexión exitosa' AS message").single()["message"]
-        
-        result = await loop.run_in_executor(None, lambda: driver.session().read_transaction(query))
-        return result
+        # Transacción implícita: sin los reintentos de execute_read, el health
+        # check falla rápido si Neo4j no responde
+        async with open_session() as session:
+            result = await session.run("RETURN 'Conexión exitosa' AS message")
+            record = await result.single()
+            return record["message"]
     except Exception as e:
         raise RuntimeError(f"Error de conexión a Neo4j: {str(e)}") from e
 
+# Ids de :Node repetidos (impiden crear la restricción única)
+DUPLICATE_NODE_IDS_QUERY = """
+MATCH (n:Node) WHERE n.id IS NOT NULL
+WITH n.id AS id, count(*) AS copies
+WHERE copies > 1
+RETURN count(id) AS duplicated, collect(id)[..10] AS sample
+"""
+
+async def ensure_node_id_constraint(session: AsyncSession) -> bool:
+    """Crea la restricción única de `Node.id` si los datos existentes la admiten.
+
+    Con ids repetidos no se crea (la ingesta masiva sigue funcionando, sin
+    índice) y se avisa con una muestra para deduplicarlos a mano.
+    """
+    async def duplicates(tx):
+        result = await tx.run(DUPLICATE_NODE_IDS_QUERY)
+        return await result.single()
+
+    record = await session.execute_read(duplicates)
+    if record and record["duplicated"]:
+        print(
+            f"⚠️ {record['duplicated']} ids de :Node repetidos (p. ej. {record['sample']}); "
+            "no se crea la restricción única de Node.id"
+        )
+        return False
+
+    async def create(tx):
+        await tx.run("CREATE CONSTRAINT IF NOT EXISTS FOR (n:Node) REQUIRE n.id IS UNIQUE")
+
+    await session.execute_write(create)
+    return True
+
 async def init_db():
     """Inicializa la base de datos creando índices y estructuras necesarias."""
-    loop = asyncio.get_event_loop()
     try:
-        def create_constraints(tx):
-            tx.run("CREATE CONSTRAINT IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE")
-            tx.run("CREATE CONSTRAINT IF NOT EXISTS FOR (p:Post) REQUIRE p.id IS UNIQUE")
+        async def create_constraints(tx):
+            await tx.run("CREATE CONSTRAINT IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE")
+            await tx.run("CREATE CONSTRAINT IF NOT EXISTS FOR (p:Post) REQUIRE p.id IS UNIQUE")
+            await tx.run("CREATE CONSTRAINT IF NOT EXISTS FOR (t:Term) REQUIRE t.name IS UNIQUE")
+
+        async def create_indexes(tx):
+            # Consultas agregadas sobre análisis persistidos (p. ej. posts "Alto" por score)
+            await tx.run(
+                "CREATE INDEX post_risk_score IF NOT EXISTS "
+                "FOR (p:Post) ON (p.risk_level, p.semantic_score)"
+            )
+            await tx.run(
+                "CREATE INDEX post_semantic_score IF NOT EXISTS FOR (p:Post) ON (p.semantic_score)"
+            )
+            await tx.run(
+                "CREATE INDEX post_analyzed_at IF NOT EXISTS FOR (p:Post) ON (p.analyzed_at)"
+            )
+            await tx.run(
+                "CREATE INDEX mentions_category IF NOT EXISTS FOR ()-[m:MENTIONS]-() ON (m.category)"
+            )
 
-        await loop.run_in_executor(None, lambda: driver.session().write_transaction(create_constraints))
+        async with open_session() as session:
+            await session.execute_write(create_constraints)
+            await session.execute_write(create_indexes)
+            # Índice único para que los MERGE de la ingesta masiva no recorran todo el grafo
+            if settings.NEO4J_NODE_ID_UNIQUE:
+                await ensure_node_id_constraint(session)
         print("✅ Base de datos inicializada correctamente.")
     except Exception as e:
         raise RuntimeError(f"❌ Error al inicializar la base de datos: {str(e)}") from e
 
 async def close_db_connections():
     """Cierra la conexión con la base de datos de forma segura."""
+    global _driver
     try:
-        driver.close()
+        if _driver is not None:
+            await _driver.close()
+            _driver = None
         print("🔌 Conexión a Neo4j cerrada correctamente.")
     except Exception as e:
         print(f"⚠️ Error al cerrar la conexión: {str(e)}")
@@ -0,0 +1,121 @@
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Type
+
+from fastapi import HTTPException, Request
+from neo4j import AsyncSession
+from pydantic import BaseModel, ValidationError
+
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+MAX_ERRORS_PER_CHUNK = 10
+
+async def iter_ndjson(request: Request) -> AsyncIterator[Any]:
+    """Lee el cuerpo NDJSON línea a línea sin cargarlo entero en memoria.
+
+    Las líneas que no son JSON válido se entregan como `ValueError` para que
+    el consumidor las contabilice sin abortar la lectura.
+    """
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _parse_line(line)
+    if buffer.strip():
+        yield _parse_line(buffer)
+
+def _parse_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(f"JSON inválido: {str(e)}")
+
+async def iter_request_rows(request: Request) -> AsyncIterator[Any]:
+    """Filas del cuerpo de la petición: NDJSON en streaming o un array JSON."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_MEDIA_TYPES:
+        async for row in iter_ndjson(request):
+            yield row
+        return
+
+    try:
+        rows = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="El cuerpo debe ser un array JSON o NDJSON")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="El cuerpo debe ser un array JSON o NDJSON")
+    for row in rows:
+        yield row
+
+async def bulk_write(
+    session: AsyncSession,
+    query: str,
+    rows: AsyncIterator[Any],
+    model: Type[BaseModel],
+    chunk_size: int,
+    after_write: Optional[Callable[[List[Dict]], Awaitable[Any]]] = None,
+) -> Dict[str, Any]:
+    """Valida las filas con `model` y las escribe en transacciones `UNWIND`.
+
+    `query` recibe el lote como parámetro `$rows` y debe devolver una columna
+    `written`. Cada lote es una transacción independiente: un lote fallido se
+    reporta y no impide escribir los siguientes. `after_write` se llama con
+    cada lote escrito (p. ej. para invalidar cachés); si falla, el error se
+    añade al informe del lote sin marcarlo como fallido.
+    """
+    chunks: List[Dict[str, Any]] = []
+
+    async def write(tx, batch):
+        result = await tx.run(query, rows=batch)
+        record = await result.single()
+        return record["written"] if record else 0
+
+    async def flush(batch: List[Dict], received: int, errors: List[str]):
+        report = {
+            "chunk": len(chunks),
+            "received": received,
+            "written": 0,
+            "invalid": received - len(batch),
+            "errors": errors[:MAX_ERRORS_PER_CHUNK],
+            "failed": False,
+        }
+        if batch:
+            try:
+                report["written"] = await session.execute_write(write, batch)
+            except Exception as e:
+                report["failed"] = True
+                report["errors"].append(f"Error en la transacción: {str(e)}")
+            else:
+                if after_write is not None:
+                    try:
+                        await after_write(batch)
+                    except Exception as e:
+                        report["errors"].append(f"Error tras la escritura: {str(e)}")
+        chunks.append(report)
+
+    batch: List[Dict] = []
+    errors: List[str] = []
+    received = 0
+    async for row in rows:
+        received += 1
+        try:
+            if isinstance(row, Exception):
+                raise row
+            batch.append(model.model_validate(row).model_dump())
+        except (ValueError, ValidationError) as e:
+            errors.append(f"Fila {received - 1} del lote: {str(e)}")
+
+        if received == chunk_size:
+            await flush(batch, received, errors)
+            batch, errors, received = [], [], 0
+
+    if received:
+        await flush(batch, received, errors)
+
+    return {
+        "chunks": chunks,
+        "total_received": sum(c["received"] for c in chunks),
+        "total_written": sum(c["written"] for c in chunks),
+        "total_invalid": sum(c["invalid"] for c in chunks),
+        "failed_chunks": sum(1 for c in chunks if c["failed"]),
+    }
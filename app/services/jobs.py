@@ -0,0 +1,499 @@
+"""Trabajos de análisis de corpus largos, fuera del ciclo petición/respuesta.
+
+Un trabajo es un corpus (textos en línea o un fichero del servidor) que se
+encola y consumen los `JobRunner` de cualquier proceso conectado al mismo
+Redis. Cada trozo de `chunk_size` textos se analiza en el pool de análisis
+con `run_batch_analysis` y sus resultados se añaden junto con el checkpoint
+(`processed`) en una única transacción: si un trabajador muere, otro retoma
+el trabajo en el primer texto sin resultado cuando caduca su lease.
+
+Claves en Redis:
+
+    jobs:queue            lista de ids pendientes
+    jobs:running          zset id -> fin del lease (segundos epoch)
+    jobs:<id>             hash con estado y contadores
+    jobs:<id>:input       lista de textos (sólo corpus en línea)
+    jobs:<id>:results     lista de resultados JSON, en el orden del corpus
+
+Sin Redis se usa `MemoryJobStore`, que tiene la misma semántica dentro de
+un único proceso pero no sobrevive a un reinicio.
+"""
+import asyncio
+import itertools
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+from app.config.settings import settings
+from app.services.cache import redis_cache
+from app.services.pipeline import run_batch_analysis, warm_up_worker
+from app.services.workers import PoolSaturatedError, analysis_pool
+from app.utils.logger import app_logger
+
+# Campos numéricos del hash de un trabajo
+_INT_FIELDS = ("total", "processed", "failed")
+
+
+def new_job(source: str, total: int, layers: Optional[FrozenSet[str]], path: Optional[str] = None) -> Dict[str, Any]:
+    now = time.time()
+    return {
+        "id": uuid.uuid4().hex,
+        "status": "queued",
+        "source": source,
+        "path": path or "",
+        "layers": ",".join(sorted(layers)) if layers else "",
+        "total": total,
+        "processed": 0,
+        "failed": 0,
+        "created_at": now,
+        "updated_at": now,
+        "error": "",
+        "worker": "",
+    }
+
+
+def _decode(raw: Dict[str, Any]) -> Dict[str, Any]:
+    job = dict(raw)
+    for field in _INT_FIELDS:
+        job[field] = int(job.get(field) or 0)
+    for field in ("created_at", "updated_at"):
+        job[field] = float(job.get(field) or 0)
+    return job
+
+
+class RedisJobStore:
+    """Estado, cola y resultados de los trabajos en Redis."""
+
+    QUEUE = "jobs:queue"
+    RUNNING = "jobs:running"
+
+    def __init__(self, client: aioredis.Redis, ttl: int = 604800):
+        self.client = client
+        self.ttl = ttl
+
+    @staticmethod
+    def key(job_id: str, suffix: str = "") -> str:
+        return f"jobs:{job_id}{':' + suffix if suffix else ''}"
+
+    async def create(self, job: Dict[str, Any], texts: Optional[List[str]] = None):
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.hset(self.key(job["id"]), mapping=job)
+            if texts:
+                pipe.rpush(self.key(job["id"], "input"), *texts)
+            pipe.lpush(self.QUEUE, job["id"])
+            await pipe.execute()
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self.client.hgetall(self.key(job_id))
+        return _decode(raw) if raw else None
+
+    async def claim(self, worker: str, lease: float) -> Optional[Dict[str, Any]]:
+        """Saca el siguiente trabajo de la cola y lo marca como propio.
+
+        Sacarlo de la cola y registrar su lease van en la misma transacción:
+        si el proceso muere antes del EXEC, el trabajo sigue en la cola.
+        """
+        async with self.client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(self.QUEUE)
+                    job_id = await pipe.lindex(self.QUEUE, -1)
+                    if job_id is None:
+                        return None
+                    now = time.time()
+                    pipe.multi()
+                    pipe.rpop(self.QUEUE)
+                    pipe.zadd(self.RUNNING, {job_id: now + lease})
+                    pipe.hset(self.key(job_id), mapping={"status": "running", "worker": worker, "updated_at": now})
+                    await pipe.execute()
+                    break
+                except redis.WatchError:
+                    continue  # Otro consumidor tocó la cola: reintentar con la nueva cabeza
+        return await self.get(job_id)
+
+    async def inputs(self, job_id: str, start: int, count: int) -> List[str]:
+        return await self.client.lrange(self.key(job_id, "input"), start, start + count - 1)
+
+    async def checkpoint(
+        self, job_id: str, worker: str, results: List[Dict[str, Any]], failed: int, lease: float
+    ) -> bool:
+        """Añade resultados y avanza el checkpoint de forma atómica.
+
+        Devuelve False si el trabajo ya no pertenece a `worker` (su lease
+        caducó y otro lo ha retomado); en ese caso no se escribe nada.
+        """
+        key = self.key(job_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.hget(key, "worker") != worker:
+                    return False
+                now = time.time()
+                pipe.multi()
+                pipe.rpush(self.key(job_id, "results"), *(json.dumps(r) for r in results))
+                pipe.hincrby(key, "processed", len(results))
+                pipe.hincrby(key, "failed", failed)
+                pipe.hset(key, "updated_at", now)
+                pipe.zadd(self.RUNNING, {job_id: now + lease})
+                await pipe.execute()
+                return True
+            except redis.WatchError:
+                return False
+
+    async def finish(self, job_id: str, worker: str, status: str, error: str = "") -> bool:
+        """Cierra el trabajo y programa la caducidad de su estado y resultados.
+
+        Como `checkpoint`, devuelve False sin tocar nada si el trabajo ya no
+        pertenece a `worker`.
+        """
+        key = self.key(job_id)
+        async with self.client.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(key)
+                if await pipe.hget(key, "worker") != worker:
+                    return False
+                pipe.multi()
+                pipe.hset(key, mapping={
+                    "status": status, "error": error, "worker": "", "updated_at": time.time()
+                })
+                pipe.zrem(self.RUNNING, job_id)
+                pipe.delete(self.key(job_id, "input"))
+                pipe.expire(key, self.ttl)
+                pipe.expire(self.key(job_id, "results"), self.ttl)
+                await pipe.execute()
+                return True
+            except redis.WatchError:
+                return False
+
+    async def results(self, job_id: str, offset: int, limit: int) -> List[Dict[str, Any]]:
+        raw = await self.client.lrange(self.key(job_id, "results"), offset, offset + limit - 1)
+        return [json.loads(item) for item in raw]
+
+    async def requeue_expired(self) -> List[str]:
+        """Devuelve a la cola los trabajos cuyo lease ha caducado.
+
+        Quitar el lease y volver a encolar es una única transacción vigilando
+        el hash del trabajo: si otro proceso lo reencola, o su trabajador
+        guarda un checkpoint a tiempo, la transacción se descarta.
+        """
+        now = time.time()
+        expired = await self.client.zrangebyscore(self.RUNNING, 0, now)
+        requeued = []
+        for job_id in expired:
+            async with self.client.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(self.key(job_id))
+                    until = await pipe.zscore(self.RUNNING, job_id)
+                    if until is None or until > now:
+                        continue
+                    pipe.multi()
+                    pipe.zrem(self.RUNNING, job_id)
+                    pipe.hset(self.key(job_id), mapping={"status": "queued", "worker": ""})
+                    pipe.rpush(self.QUEUE, job_id)
+                    await pipe.execute()
+                    requeued.append(job_id)
+                except redis.WatchError:
+                    continue
+        return requeued
+
+
+class MemoryJobStore:
+    """Sustituto local de `RedisJobStore` (un solo proceso, sin persistencia).
+
+    Los trabajos terminados se descartan `ttl` segundos después, al revisar
+    los leases, como hace Redis con la caducidad de sus claves.
+    """
+
+    def __init__(self, ttl: int = 604800):
+        self.ttl = ttl
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.queue: List[str] = []
+        self.running: Dict[str, float] = {}
+        self._inputs: Dict[str, List[str]] = {}
+        self._results: Dict[str, List[Dict[str, Any]]] = {}
+
+    async def create(self, job: Dict[str, Any], texts: Optional[List[str]] = None):
+        self.jobs[job["id"]] = dict(job)
+        self._inputs[job["id"]] = list(texts or [])
+        self._results[job["id"]] = []
+        self.queue.insert(0, job["id"])
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        return dict(job) if job else None
+
+    async def claim(self, worker: str, lease: float) -> Optional[Dict[str, Any]]:
+        if not self.queue:
+            return None
+        job_id = self.queue.pop()
+        now = time.time()
+        self.running[job_id] = now + lease
+        self.jobs[job_id].update(status="running", worker=worker, updated_at=now)
+        return dict(self.jobs[job_id])
+
+    async def inputs(self, job_id: str, start: int, count: int) -> List[str]:
+        return self._inputs[job_id][start:start + count]
+
+    async def checkpoint(
+        self, job_id: str, worker: str, results: List[Dict[str, Any]], failed: int, lease: float
+    ) -> bool:
+        job = self.jobs[job_id]
+        if job["worker"] != worker:
+            return False
+        now = time.time()
+        self._results[job_id].extend(results)
+        job["processed"] += len(results)
+        job["failed"] += failed
+        job["updated_at"] = now
+        self.running[job_id] = now + lease
+        return True
+
+    async def finish(self, job_id: str, worker: str, status: str, error: str = "") -> bool:
+        job = self.jobs[job_id]
+        if job["worker"] != worker:
+            return False
+        job.update(status=status, error=error, worker="", updated_at=time.time())
+        self.running.pop(job_id, None)
+        self._inputs.pop(job_id, None)
+        return True
+
+    async def results(self, job_id: str, offset: int, limit: int) -> List[Dict[str, Any]]:
+        return self._results.get(job_id, [])[offset:offset + limit]
+
+    async def requeue_expired(self) -> List[str]:
+        now = time.time()
+        expired = [job_id for job_id, until in self.running.items() if until <= now]
+        for job_id in expired:
+            del self.running[job_id]
+            self.jobs[job_id].update(status="queued", worker="")
+            self.queue.append(job_id)
+        stale = [
+            job_id for job_id, job in self.jobs.items()
+            if job["status"] in ("completed", "failed") and job["updated_at"] + self.ttl <= now
+        ]
+        for job_id in stale:
+            del self.jobs[job_id]
+            self._results.pop(job_id, None)
+        return expired
+
+
+# --- Corpus en fichero ---
+
+def resolve_corpus_path(path: str, root: Path) -> Path:
+    """Ruta de un corpus del servidor; debe estar dentro de `root`."""
+    root = root.resolve()
+    resolved = (root / path).resolve()
+    if not resolved.is_relative_to(root) or not resolved.is_file():
+        raise ValueError(f"Corpus no encontrado en {root}: {path}")
+    return resolved
+
+
+def iter_corpus_items(path: Path) -> Iterator[Any]:
+    """Un ítem por línea no vacía: el texto, o un ValueError si la línea no vale.
+
+    En `.ndjson`/`.jsonl` se toma el campo `text` de cada objeto; las líneas
+    inválidas se entregan como error para conservar los índices del corpus.
+    """
+    ndjson = path.suffix in (".ndjson", ".jsonl")
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            if not ndjson:
+                yield line
+                continue
+            try:
+                text = json.loads(line).get("text")
+            except (ValueError, AttributeError):
+                text = None
+            yield text if isinstance(text, str) else ValueError("Línea sin campo 'text' válido")
+
+
+def count_corpus_items(path: Path) -> int:
+    with open(path, encoding="utf-8") as handle:
+        return sum(1 for line in handle if line.strip())
+
+
+# --- Consumidores ---
+
+class JobRunner:
+    """Consume trabajos de la cola y los analiza por trozos en el pool.
+
+    Cada consumidor renueva el lease del trabajo en cada checkpoint; un lease
+    caducado significa que su trabajador murió, y el trabajo vuelve a la cola
+    para continuar desde el último checkpoint.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 1,
+        chunk_size: int = 100,
+        lease: float = 60.0,
+        poll_interval: float = 1.0,
+        corpus_dir: str = "data/corpus",
+    ):
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self.corpus_dir = Path(corpus_dir)
+        self._store = None
+        self.worker_id = uuid.uuid4().hex[:12]
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def store(self):
+        """Redis si está conectado al primer uso; si no, el sustituto en memoria."""
+        if self._store is None:
+            self._store = RedisJobStore(redis_cache.client, settings.JOBS_RESULT_TTL) \
+                if redis_cache.client is not None else MemoryJobStore(settings.JOBS_RESULT_TTL)
+        return self._store
+
+    def start(self, store=None, consume: bool = True):
+        """Fija el almacén y arranca los consumidores en el event loop actual."""
+        if store is not None:
+            self._store = store
+        store = self.store
+        if not consume or self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._consume(f"{self.worker_id}-{n}"))
+            for n in range(self.concurrency)
+        ]
+        app_logger.info(
+            f"Trabajos de análisis: {self.concurrency} consumidores ({type(store).__name__})"
+        )
+
+    async def stop(self):
+        """Detiene los consumidores; el trabajo en curso se retoma tras el lease."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # --- Encolado ---
+
+    async def submit_texts(self, texts: List[str], layers: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+        job = new_job("inline", len(texts), layers)
+        await self.store.create(job, texts)
+        return job
+
+    async def submit_file(self, path: str, layers: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+        resolved = resolve_corpus_path(path, self.corpus_dir)
+        total = await asyncio.to_thread(count_corpus_items, resolved)
+        job = new_job("file", total, layers, str(resolved))
+        await self.store.create(job)
+        return job
+
+    # --- Consumo ---
+
+    async def _consume(self, worker: str):
+        while True:
+            try:
+                await self.store.requeue_expired()
+                job = await self.store.claim(worker, self.lease)
+                if job is None:
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+                await self.process(job, worker)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                app_logger.error(f"Error en el consumidor de trabajos {worker}: {str(e)}", exc_info=True)
+                await asyncio.sleep(self.poll_interval)
+
+    async def _chunks(self, job: Dict[str, Any]):
+        """Trozos (índice inicial, ítems) desde el checkpoint del trabajo."""
+        start = job["processed"]
+        if job["source"] == "inline":
+            while True:
+                items = await self.store.inputs(job["id"], start, self.chunk_size)
+                if not items:
+                    return
+                yield start, items
+                start += len(items)
+        else:
+            items = itertools.islice(iter_corpus_items(Path(job["path"])), start, None)
+            while True:
+                chunk = await asyncio.to_thread(lambda: list(itertools.islice(items, self.chunk_size)))
+                if not chunk:
+                    return
+                yield start, chunk
+                start += len(chunk)
+
+    async def _analyze(self, texts: List[str], layers: Optional[FrozenSet[str]]) -> List[Dict[str, Any]]:
+        while True:
+            try:
+                return await analysis_pool.run(run_batch_analysis, texts, None, None, layers)
+            except PoolSaturatedError as e:
+                # Los trabajos ceden ante las peticiones interactivas
+                await asyncio.sleep(e.retry_after)
+
+    async def process(self, job: Dict[str, Any], worker: str):
+        """Analiza un trabajo desde su checkpoint hasta el final."""
+        job_id = job["id"]
+        layers = frozenset(job["layers"].split(",")) if job["layers"] else None
+        if job["processed"]:
+            app_logger.info(f"⏯️ Trabajo {job_id} reanudado en el ítem {job['processed']}")
+        try:
+            async for start, items in self._chunks(job):
+                texts = [item if isinstance(item, str) else "" for item in items]
+                analyzed = await self._analyze(texts, layers)
+                results = []
+                for offset, (item, analyzed_item) in enumerate(zip(items, analyzed)):
+                    entry = {"index": start + offset}
+                    if isinstance(item, Exception):
+                        entry["error"] = str(item)
+                    elif "result" in analyzed_item:
+                        entry["result"] = analyzed_item["result"]
+                    else:
+                        entry["error"] = analyzed_item.get("error", "Error desconocido")
+                    results.append(entry)
+                failed = sum(1 for entry in results if "error" in entry)
+                if not await self.store.checkpoint(job_id, worker, results, failed, self.lease):
+                    app_logger.warning(f"Trabajo {job_id} retomado por otro trabajador; se abandona")
+                    return
+        except Exception as e:
+            app_logger.error(f"Trabajo {job_id} fallido: {str(e)}", exc_info=True)
+            if not await self.store.finish(job_id, worker, "failed", str(e)):
+                app_logger.warning(f"Trabajo {job_id} retomado por otro trabajador; no se marca como fallido")
+            return
+        if not await self.store.finish(job_id, worker, "completed"):
+            app_logger.warning(f"Trabajo {job_id} retomado por otro trabajador; no se marca como completado")
+            return
+        app_logger.info(f"✅ Trabajo {job_id} completado")
+
+
+# Instancia global de los trabajos de análisis
+analysis_jobs = JobRunner(
+    concurrency=settings.JOBS_CONCURRENCY,
+    chunk_size=settings.JOBS_CHUNK_SIZE,
+    lease=settings.JOBS_LEASE_SECONDS,
+    poll_interval=settings.JOBS_POLL_INTERVAL,
+    corpus_dir=settings.JOBS_CORPUS_DIR,
+)
+
+
+async def _run_worker():
+    """Proceso consumidor independiente: `python -m app.services.jobs`."""
+    await redis_cache.initialize()
+    if redis_cache.client is None:
+        raise SystemExit("Los consumidores independientes necesitan Redis")
+    analysis_pool.start(initializer=warm_up_worker)
+    analysis_jobs.start()
+    try:
+        await asyncio.gather(*analysis_jobs._tasks)
+    finally:
+        await analysis_jobs.stop()
+        analysis_pool.shutdown()
+        await redis_cache.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(_run_worker())
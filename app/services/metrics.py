@@ -0,0 +1,133 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Etapas del pipeline de análisis (etiqueta `stage`)
+STAGES = (
+    "term_detection",
+    "spacy_parse",
+    "linguistic",
+    "referential",
+    "syntactic",
+    "cognitive",
+    "semantic_expansion",
+)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latencia de las peticiones HTTP por ruta",
+    ["method", "route", "status"],
+)
+
+STAGE_LATENCY = Histogram(
+    "analysis_stage_duration_seconds",
+    "Duración de cada etapa del análisis por texto",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+# Series creadas de antemano: cada etapa se exporta (a cero) antes de su primera medida
+for _stage in STAGES:
+    STAGE_LATENCY.labels(_stage)
+
+TEXT_LENGTH = Histogram(
+    "analysis_text_length_chars",
+    "Longitud en caracteres de los textos analizados",
+    buckets=(50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000),
+)
+
+# Tiempos de la petición en curso, para la cabecera Server-Timing
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+class StageTimer:
+    """Acumula la duración (segundos) de cada etapa de un análisis.
+
+    Vive junto al análisis, también dentro de los trabajadores del pool: las
+    duraciones viajan con el resultado y se registran en el proceso principal.
+    """
+
+    def __init__(self):
+        self.durations: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        self.durations[name] = self.durations.get(name, 0.0) + seconds
+
+
+def observe_stages(durations: Dict[str, float]):
+    """Registra las etapas de un análisis y las suma a la petición en curso."""
+    request_timings = _request_timings.get()
+    for stage, seconds in durations.items():
+        STAGE_LATENCY.labels(stage).observe(seconds)
+        if request_timings is not None:
+            request_timings[stage] = request_timings.get(stage, 0.0) + seconds
+
+
+def observe_text_length(text: str):
+    TEXT_LENGTH.observe(len(text))
+
+
+def start_request_timing() -> Dict[str, float]:
+    """Abre el acumulador de etapas de la petición actual (middleware)."""
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing_header(total: float, timings: Dict[str, float]) -> str:
+    """Cabecera `Server-Timing` (milisegundos) con el total y cada etapa."""
+    entries = [f"total;dur={total * 1000:.2f}"]
+    entries += [f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in timings.items()]
+    return ", ".join(entries)
+
+
+def observe_request(method: str, route: str, status: int, seconds: float):
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(seconds)
+
+
+class StatsCollector:
+    """Expone en cada scrape los contadores que ya mantienen otros servicios.
+
+    `sources` asocia un prefijo de métrica a una función que devuelve un
+    diccionario plano de números; las claves en `counters` se exportan como
+    contadores y el resto como gauges.
+    """
+
+    def __init__(self, sources: Dict[str, Callable[[], Dict[str, float]]], counters: Iterable[str] = ()):
+        self.sources = sources
+        self.counters = set(counters)
+
+    def collect(self):
+        for prefix, source in self.sources.items():
+            try:
+                stats = source()
+            except Exception:
+                continue
+            for key, value in stats.items():
+                if not isinstance(value, (int, float)) or isinstance(value, bool):
+                    continue
+                name = f"{prefix}_{key}"
+                if name in self.counters:
+                    yield CounterMetricFamily(name, f"{prefix}: {key}", value=value)
+                else:
+                    yield GaugeMetricFamily(name, f"{prefix}: {key}", value=value)
+
+
+def register_stats(sources: Dict[str, Callable[[], Dict[str, float]]], counters: Iterable[str] = ()):
+    REGISTRY.register(StatsCollector(sources, counters))
+
+
+def render_metrics() -> tuple:
+    """Cuerpo y content-type de la exposición en formato texto de Prometheus."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,299 @@
+"""Capa de red: amplificación a partir del grafo de usuarios y posts.
+
+Modelo del grafo:
+
+    (:User)-[:FOLLOWS]->(:User)
+    (:User)-[:POSTED]->(:Post)
+    (:Post)-[:REPOST_OF]->(:Post)
+
+Los agregados por nodo (`net_*`) se guardan en el propio nodo. Los grados
+se mantienen de forma incremental al escribir relaciones; alcance y cascadas
+se recalculan con recorridos de profundidad acotada sólo cuando el nodo está
+marcado como obsoleto (`net_stale`). Cada resultado se cachea en Redis y las
+escrituras de relaciones invalidan las claves afectadas.
+"""
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from neo4j import AsyncSession
+
+from app.config.settings import settings
+from app.services.cache import RedisCache, redis_cache
+from app.services.database import open_session
+
+# Escalas de saturación de cada señal: x / (x + escala) vale 0.5 en la escala
+REACH_SCALE = 1000.0
+CASCADE_SCALE = 100.0
+FOLLOWERS_SCALE = 500.0
+RISK_WEIGHTS = {"reach": 0.5, "cascade": 0.3, "followers": 0.2}
+
+FOLLOWS_QUERY = """
+UNWIND $rows AS row
+MERGE (a:User {id: row.source_id})
+MERGE (b:User {id: row.target_id})
+MERGE (a)-[f:FOLLOWS]->(b)
+ON CREATE SET a.net_following = coalesce(a.net_following, 0) + 1,
+              b.net_followers = coalesce(b.net_followers, 0) + 1
+RETURN count(f) AS written
+"""
+
+REPOSTS_QUERY = """
+UNWIND $rows AS row
+MERGE (r:Post {id: row.source_id})
+MERGE (p:Post {id: row.target_id})
+MERGE (r)-[e:REPOST_OF]->(p)
+ON CREATE SET p.net_reposts = coalesce(p.net_reposts, 0) + 1
+RETURN count(e) AS written
+"""
+
+
+def _saturate(value: float, scale: float) -> float:
+    return value / (value + scale) if value > 0 else 0.0
+
+
+def amplification_risk(user: Optional[Dict[str, Any]], post: Optional[Dict[str, Any]]) -> float:
+    """Riesgo de amplificación en [0, 1] a partir de los agregados disponibles."""
+    signals = {
+        "reach": _saturate(user["reach"], REACH_SCALE) if user else 0.0,
+        "followers": _saturate(user["followers"], FOLLOWERS_SCALE) if user else 0.0,
+        "cascade": _saturate(post["cascade_size"], CASCADE_SCALE) if post else 0.0,
+    }
+    weights = {
+        name: weight for name, weight in RISK_WEIGHTS.items()
+        if (post if name == "cascade" else user)
+    }
+    if not weights:
+        return 0.0
+    total = sum(weights.values())
+    return round(sum(signals[name] * weight for name, weight in weights.items()) / total, 3)
+
+
+class NetworkAnalyzer:
+    """Agregados de red por nodo con caché en Redis y recálculo acotado."""
+
+    def __init__(self, cache: RedisCache, max_depth: int = 3, ttl: int = 300):
+        if max_depth < 1:
+            raise ValueError("La profundidad máxima debe ser al menos 1")
+        self.cache = cache
+        self.max_depth = max_depth
+        self.ttl = ttl
+
+    @staticmethod
+    def cache_key(kind: str, node_id: str) -> str:
+        return f"network:{kind}:{node_id}"
+
+    # --- Consultas (la profundidad no admite parámetros en Cypher) ---
+
+    def _user_query(self) -> str:
+        return f"""
+        MATCH (u:User {{id: $id}})
+        CALL {{
+            WITH u
+            OPTIONAL MATCH (f:User)-[:FOLLOWS*1..{self.max_depth}]->(u)
+            WHERE f <> u
+            RETURN count(DISTINCT f) AS reach
+        }}
+        WITH u, reach,
+             size([(u)<-[:FOLLOWS]-(x) | x]) AS followers,
+             size([(u)-[:FOLLOWS]->(x) | x]) AS following,
+             size([(u)-[:POSTED]->(p:Post) | p]) AS posts
+        SET u.net_reach = reach, u.net_followers = followers, u.net_following = following,
+            u.net_posts = posts, u.net_stale = false, u.net_updated_at = datetime()
+        RETURN reach, followers, following, posts
+        """
+
+    def _post_query(self) -> str:
+        return f"""
+        MATCH (p:Post {{id: $id}})
+        CALL {{
+            WITH p
+            OPTIONAL MATCH path = (r:Post)-[:REPOST_OF*1..{self.max_depth}]->(p)
+            OPTIONAL MATCH (reposter:User)-[:POSTED]->(r)
+            RETURN count(DISTINCT r) AS cascade_size,
+                   coalesce(max(length(path)), 0) AS cascade_depth,
+                   count(DISTINCT reposter) AS reposters
+        }}
+        WITH p, cascade_size, cascade_depth, reposters,
+             head([(author:User)-[:POSTED]->(p) | author.id]) AS author_id
+        SET p.net_cascade_size = cascade_size, p.net_cascade_depth = cascade_depth,
+            p.net_reposters = reposters, p.net_reposts = size([(p)<-[:REPOST_OF]-(x) | x]),
+            p.net_author_id = author_id, p.net_stale = false, p.net_updated_at = datetime()
+        RETURN cascade_size, cascade_depth, reposters, author_id
+        """
+
+    def _stored_query(self, kind: str) -> str:
+        label = "User" if kind == "user" else "Post"
+        return f"MATCH (n:{label} {{id: $id}}) RETURN properties(n) AS props"
+
+    def _stale_flag_query(self, kind: str) -> str:
+        label = "User" if kind == "user" else "Post"
+        return f"MATCH (n:{label} {{id: $id}}) RETURN coalesce(n.net_stale, true) AS stale"
+
+    def _stale_query(self, kind: str) -> str:
+        # Nodos cuyos agregados cambian con la nueva arista, hasta la profundidad máxima:
+        # el alcance de los seguidos por `id` y las cascadas de los ancestros del post.
+        # `ids` son los destinos de las aristas, ya a un salto del nodo de origen:
+        # por eso basta con max_depth - 1 saltos más
+        label, rel = ("User", "FOLLOWS") if kind == "user" else ("Post", "REPOST_OF")
+        return f"""
+        UNWIND $ids AS id
+        MATCH (:{label} {{id: id}})-[:{rel}*0..{self.max_depth - 1}]->(n:{label})
+        SET n.net_stale = true
+        RETURN collect(DISTINCT n.id) AS ids
+        """
+
+    def _posted_stale_query(self) -> str:
+        # Un POSTED nuevo cambia `posts` del autor, `author_id` del post y los
+        # `reposters` de las cascadas que lo incluyen. Aquí se parte del propio
+        # repost (no del destino de una arista nueva), así que se recorren los
+        # max_depth saltos completos, como en `_post_query`
+        return f"""
+        UNWIND $rows AS row
+        MATCH (u:User {{id: row.user_id}})
+        SET u.net_stale = true
+        WITH DISTINCT row.post_id AS post_id
+        MATCH (:Post {{id: post_id}})-[:REPOST_OF*0..{self.max_depth}]->(n:Post)
+        SET n.net_stale = true
+        RETURN collect(DISTINCT n.id) AS ids
+        """
+
+    # --- Lectura ---
+
+    @staticmethod
+    def _from_props(kind: str, props: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if props.get("net_stale", True):
+            return None
+        if kind == "user":
+            fields = ("reach", "followers", "following", "posts")
+        else:
+            fields = ("cascade_size", "cascade_depth", "reposters", "author_id")
+        if any(f"net_{field}" not in props for field in fields if field != "author_id"):
+            return None
+        return {field: props.get(f"net_{field}") for field in fields}
+
+    async def _compute(self, session: AsyncSession, kind: str, node_id: str) -> Optional[Dict[str, Any]]:
+        async def read_stored(tx):
+            result = await tx.run(self._stored_query(kind), id=node_id)
+            record = await result.single()
+            return record["props"] if record else None
+
+        props = await session.execute_read(read_stored)
+        if props is None:
+            return None
+        stored = self._from_props(kind, props)
+        if stored is not None:
+            return stored
+
+        query = self._user_query() if kind == "user" else self._post_query()
+
+        async def recompute(tx):
+            result = await tx.run(query, id=node_id)
+            record = await result.single()
+            return record.data() if record else None
+
+        return await session.execute_write(recompute)
+
+    async def metrics(self, kind: str, node_id: str) -> Optional[Dict[str, Any]]:
+        """Agregados de un usuario (`kind="user"`) o post; None si no está en el grafo."""
+        key = self.cache_key(kind, node_id)
+        try:
+            cached = await self.cache.get(key)
+        except Exception:
+            cached = None
+        if cached is not None:
+            return json.loads(cached)
+
+        async with open_session() as session:
+            metrics = await self._compute(session, kind, node_id)
+
+        if metrics is not None:
+            try:
+                await self.cache.set(key, json.dumps(metrics), ttl=self.ttl)
+                # Una invalidación concurrente marca el nodo y después borra la clave;
+                # si ya la borró antes de este set, el nodo se ve obsoleto y se retira
+                if await self._is_stale(kind, node_id):
+                    await self.cache.delete(key)
+            except Exception:
+                try:
+                    await self.cache.delete(key)
+                except Exception:
+                    pass
+        return metrics
+
+    async def _is_stale(self, kind: str, node_id: str) -> bool:
+        async def read_flag(tx):
+            result = await tx.run(self._stale_flag_query(kind), id=node_id)
+            record = await result.single()
+            return record["stale"] if record else True
+
+        async with open_session() as session:
+            return await session.execute_read(read_flag)
+
+    async def analyze(self, user_id: Optional[str] = None, post_id: Optional[str] = None) -> Dict[str, Any]:
+        """Capa de red para un texto: agregados del autor y del post, y riesgo."""
+        post = await self.metrics("post", post_id) if post_id else None
+        if not user_id and post:
+            user_id = post.get("author_id")
+        user = await self.metrics("user", user_id) if user_id else None
+        return {
+            "amplification_risk": amplification_risk(user, post),
+            "available": bool(user or post),
+            "user": user,
+            "post": post,
+        }
+
+    # --- Invalidación ---
+
+    async def invalidate(
+        self, session: AsyncSession, kind: str, ids: Iterable[str], touched: Iterable[str] = ()
+    ) -> List[str]:
+        """Marca obsoletos los nodos afectados por nuevas aristas y borra su caché.
+
+        `ids` son los destinos de las aristas nuevas; `touched`, nodos cuyos
+        contadores ya se actualizaron en la escritura y sólo pierden la caché.
+        """
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+
+        async def mark(tx):
+            result = await tx.run(self._stale_query(kind), ids=ids)
+            record = await result.single()
+            return record["ids"] if record else []
+
+        affected = await session.execute_write(mark)
+        keys = {self.cache_key(kind, node_id) for node_id in [*affected, *touched]}
+        await self.cache.delete(*keys)
+        return affected
+
+    async def invalidate_posted(self, session: AsyncSession, rows: Iterable[Dict[str, Any]]) -> List[str]:
+        """Invalida los agregados afectados por aristas `(user)-[:POSTED]->(post)`.
+
+        `rows` son filas con `post_id` y `user_id` (las que no tienen autor no
+        crean arista y se ignoran). Devuelve los posts marcados como obsoletos.
+        """
+        rows = [
+            {"post_id": row["post_id"], "user_id": row["user_id"]}
+            for row in rows if row.get("user_id")
+        ]
+        if not rows:
+            return []
+
+        async def mark(tx):
+            result = await tx.run(self._posted_stale_query(), rows=rows)
+            record = await result.single()
+            return record["ids"] if record else []
+
+        affected = await session.execute_write(mark)
+        keys = {self.cache_key("post", post_id) for post_id in affected}
+        keys.update(self.cache_key("user", row["user_id"]) for row in rows)
+        await self.cache.delete(*keys)
+        return affected
+
+
+# Instancia global de la capa de red
+network_analyzer = NetworkAnalyzer(
+    redis_cache,
+    max_depth=settings.NETWORK_MAX_DEPTH,
+    ttl=settings.NETWORK_CACHE_TTL,
+)
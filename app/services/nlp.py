@@ -0,0 +1,128 @@
+import logging
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Sequence
+
+if TYPE_CHECKING:  # spaCy se importa al cargar el modelo, no al importar el módulo
+    from spacy.language import Language
+    from spacy.tokens import Doc
+
+logger = logging.getLogger("hyperstition-core")
+
+# Componentes que otros necesitan para funcionar (p. ej. el parser escucha al tok2vec)
+COMPONENT_DEPENDENCIES = {
+    "parser": ("tok2vec",),
+    "morphologizer": ("tok2vec",),
+    "tagger": ("tok2vec",),
+    "ner": ("tok2vec",),
+    "lemmatizer": ("attribute_ruler", "morphologizer"),
+    "attribute_ruler": ("morphologizer",),
+}
+
+# Pseudocomponente: segmentación de oraciones por reglas, sin parser
+SENTENCIZER = "sentencizer"
+
+class NLPPipeline:
+    """Pipeline spaCy configurable que ejecuta sólo los componentes pedidos.
+
+    El modelo se carga una vez por proceso sin los componentes excluidos. Cada
+    llamada indica qué componentes necesita y el resto se desactiva para esa
+    llamada (sin mutar el pipeline, por lo que es seguro entre hilos). Si sólo
+    se piden límites de oración, se usa un pipeline ligero con `sentencizer`.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        fallback_model: Optional[str] = None,
+        exclude: Sequence[str] = (),
+    ):
+        self.model_name = model_name
+        self.fallback_model = fallback_model
+        self.exclude = list(exclude)
+        self.loaded_model: Optional[str] = None
+        self._nlp: Optional["Language"] = None
+        self._sentencizer: Optional["Language"] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._nlp is not None
+
+    def load(self) -> "Language":
+        """Carga el modelo principal (o el de respaldo si no está instalado)."""
+        if self._nlp is None:
+            import spacy
+
+            try:
+                self._nlp = spacy.load(self.model_name, exclude=self.exclude)
+                self.loaded_model = self.model_name
+            except OSError as e:
+                if not self.fallback_model:
+                    raise
+                logger.warning(
+                    f"⚠️ Modelo {self.model_name} no disponible ({str(e)}); "
+                    f"usando {self.fallback_model}"
+                )
+                self._nlp = spacy.load(self.fallback_model, exclude=self.exclude)
+                self.loaded_model = self.fallback_model
+            logger.info(f"🧠 Modelo spaCy cargado: {self.loaded_model} {self._nlp.pipe_names}")
+        return self._nlp
+
+    @property
+    def nlp(self) -> "Language":
+        return self.load()
+
+    @property
+    def sentencizer(self) -> "Language":
+        """Pipeline ligero: tokenizador del modelo + `sentencizer` por reglas."""
+        if self._sentencizer is None:
+            import spacy
+
+            nlp = self.load()
+            fast = spacy.blank(nlp.lang, vocab=nlp.vocab)
+            fast.tokenizer = nlp.tokenizer
+            fast.add_pipe(SENTENCIZER)
+            self._sentencizer = fast
+        return self._sentencizer
+
+    def disabled_for(self, components: Iterable[str]) -> List[str]:
+        """Componentes del modelo que pueden desactivarse para `components`."""
+        needed = set()
+        pending = list(components)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(COMPONENT_DEPENDENCIES.get(name, ()))
+        return [name for name in self.nlp.pipe_names if name not in needed]
+
+    def _route(self, components: Optional[Iterable[str]]):
+        """Elige pipeline y componentes desactivados para una petición."""
+        if components is None:
+            return self.nlp, []
+        components = set(components)
+        if not components:
+            return None, []
+        if components == {SENTENCIZER}:
+            return self.sentencizer, []
+        components.discard(SENTENCIZER)
+        return self.nlp, self.disabled_for(components)
+
+    def parse(self, text: str, components: Optional[Iterable[str]] = None) -> "Doc":
+        """Procesa un texto; `components=None` ejecuta el pipeline completo."""
+        nlp, disable = self._route(components)
+        if nlp is None:
+            return self.nlp.make_doc(text)
+        return nlp(text, disable=disable)
+
+    def pipe(
+        self,
+        texts: Iterable[str],
+        components: Optional[Iterable[str]] = None,
+        batch_size: int = 64,
+        n_process: int = 1,
+    ) -> Iterator["Doc"]:
+        """Versión por lotes de `parse` sobre `nlp.pipe`."""
+        nlp, disable = self._route(components)
+        if nlp is None:
+            tokenizer = self.nlp.make_doc
+            return (tokenizer(text) for text in texts)
+        return nlp.pipe(texts, disable=disable, batch_size=batch_size, n_process=n_process)
@@ -0,0 +1,177 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config.settings import settings
+from app.services.database import open_session
+from app.services.network import network_analyzer
+from app.utils.logger import app_logger
+
+# Un resultado por fila: propiedades en el Post y aristas MENTIONS a cada Term.
+# Si el análisis incluye `detected_terms` (`row.terms` no nulo) se sustituyen
+# las menciones anteriores; si no, se conservan. `posted` lista las aristas
+# POSTED creadas por este lote (no las que ya existían), marcadas con
+# `new` en el ON CREATE y desmarcadas antes de terminar.
+PERSIST_ANALYSIS_QUERY = """
+UNWIND $rows AS row
+MERGE (p:Post {id: row.post_id})
+SET p += row.props, p.analyzed_at = datetime()
+FOREACH (_ IN CASE WHEN row.user_id IS NULL THEN [] ELSE [1] END |
+    MERGE (u:User {id: row.user_id})
+    MERGE (u)-[posted:POSTED]->(p)
+    ON CREATE SET posted.new = true)
+WITH p, row
+OPTIONAL MATCH (:User {id: row.user_id})-[posted:POSTED {new: true}]->(p)
+REMOVE posted.new
+WITH p, row, posted IS NOT NULL AS created
+OPTIONAL MATCH (p)-[old:MENTIONS]->(:Term)
+WHERE row.terms IS NOT NULL
+DELETE old
+WITH DISTINCT p, row, created
+FOREACH (term IN coalesce(row.terms, []) |
+    MERGE (t:Term {name: term.name})
+    MERGE (p)-[:MENTIONS {category: term.category}]->(t))
+RETURN count(p) AS written,
+       collect(CASE WHEN created THEN {post_id: row.post_id, user_id: row.user_id} END) AS posted
+"""
+
+# Marca de fin de cola para `stop`
+_STOP = object()
+
+# Campos del resultado que se guardan como propiedades del Post
+PERSISTED_FIELDS = ("semantic_score", "risk_level")
+
+
+def build_analysis_row(post_id: str, result: Dict[str, Any], user_id: Optional[str] = None) -> Dict[str, Any]:
+    """Fila de `PERSIST_ANALYSIS_QUERY` a partir de un resultado de análisis."""
+    props = {field: result[field] for field in PERSISTED_FIELDS if field in result}
+    metadata = result.get("metadata", {})
+    props["analysis_version"] = metadata.get("version")
+    props["dictionary_version"] = metadata.get("dictionary_version")
+
+    terms = None
+    if "detected_terms" in result:
+        terms = [
+            {"name": term, "category": category}
+            for category, found in result["detected_terms"].items()
+            for term in found
+        ]
+    return {"post_id": post_id, "user_id": user_id, "props": props, "terms": terms}
+
+
+class AnalysisPersister:
+    """Guarda resultados de análisis en Neo4j en segundo plano y por lotes.
+
+    `submit` nunca bloquea la petición: encola la fila y, si la cola está
+    llena, la descarta y lo contabiliza. Una tarea agrupa hasta `batch_size`
+    filas (o lo acumulado en `flush_interval` segundos) por transacción.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        queue_size: int = 10000,
+    ):
+        self.enabled = enabled
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.counters = {"submitted": 0, "persisted": 0, "dropped": 0, "failed": 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Arranca la tarea de escritura en el event loop actual."""
+        if not self.enabled or self._task is not None:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._task = asyncio.create_task(self._run())
+        app_logger.info("Persistencia de análisis en Neo4j activada")
+
+    def submit(self, post_id: str, result: Dict[str, Any], user_id: Optional[str] = None) -> bool:
+        """Encola un resultado; devuelve False si no se va a persistir."""
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(build_analysis_row(post_id, result, user_id))
+        except asyncio.QueueFull:
+            self.counters["dropped"] += 1
+            return False
+        self.counters["submitted"] += 1
+        return True
+
+    async def _next_batch(self) -> Tuple[List[Dict[str, Any]], bool]:
+        """Siguiente lote y si se ha pedido parar."""
+        loop = asyncio.get_running_loop()
+        batch: List[Dict[str, Any]] = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            if deadline is None:
+                item = await self._queue.get()
+                deadline = loop.time() + self.flush_interval
+            else:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    async def write(self, batch: List[Dict[str, Any]]):
+        """Escribe un lote en una transacción; los fallos se registran y se cuentan.
+
+        Tras escribir, invalida los agregados de red que cambian con las
+        aristas POSTED creadas por el lote (como la ingesta de relaciones);
+        reanalizar un post ya enlazado a su autor no invalida nada.
+        """
+        async def persist(tx):
+            result = await tx.run(PERSIST_ANALYSIS_QUERY, rows=batch)
+            record = await result.single()
+            return record["posted"] if record else []
+
+        try:
+            async with open_session() as session:
+                posted = await session.execute_write(persist)
+                self.counters["persisted"] += len(batch)
+                try:
+                    await network_analyzer.invalidate_posted(session, posted)
+                except Exception as e:
+                    app_logger.error(f"Error al invalidar agregados de red tras persistir: {str(e)}")
+        except Exception as e:
+            self.counters["failed"] += len(batch)
+            app_logger.error(f"Error al persistir {len(batch)} análisis en Neo4j: {str(e)}")
+
+    async def _run(self):
+        stopping = False
+        while not stopping:
+            batch, stopping = await self._next_batch()
+            if batch:
+                await self.write(batch)
+
+    async def stop(self):
+        """Escribe lo que quede en la cola y detiene la tarea."""
+        if self._task is None:
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    def stats(self) -> Dict[str, int]:
+        queued = self._queue.qsize() if self._queue is not None else 0
+        return {**self.counters, "queued": queued}
+
+
+# Instancia global de la persistencia de análisis
+analysis_persister = AnalysisPersister(
+    enabled=settings.ANALYSIS_PERSIST_ENABLED,
+    batch_size=settings.ANALYSIS_PERSIST_BATCH_SIZE,
+    flush_interval=settings.ANALYSIS_PERSIST_FLUSH_INTERVAL,
+    queue_size=settings.ANALYSIS_PERSIST_QUEUE_SIZE,
+)
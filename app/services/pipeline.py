@@ -0,0 +1,656 @@
+"""Pipeline de análisis hipersticial, independiente de la capa HTTP.
+
+Reúne el diccionario recargable, el contexto de análisis compartido, las
+capas seleccionables y los puntos de entrada del pool de trabajadores
+(`analyze_text`, `run_batch_analysis`). `analyze_with_cache` es la entrada
+asíncrona que usan los routers y los servicios: caché por contenido y, si
+falla, el pool.
+"""
+from fastapi import HTTPException, status
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+from functools import cached_property, lru_cache
+from pathlib import Path
+from datetime import datetime
+import numpy as np
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from app.config.settings import settings
+from app.services.nlp import NLPPipeline, SENTENCIZER
+from app.services.term_matcher import TermMatcher
+from app.services.workers import analysis_pool
+from app.services.cache import analysis_cache
+from app.services.reloader import FileWatcher
+from app.services.metrics import StageTimer, observe_stages, observe_text_length
+from app.services.syllables import syllable_counter
+from app.services.semantic import semantic_expander
+from app.models.analysis import syntactic_prophet
+
+nlp_pipeline = NLPPipeline(
+    settings.NLP_MODEL,
+    fallback_model=settings.NLP_FALLBACK_MODEL,
+    exclude=settings.NLP_DISABLED_COMPONENTS
+)  # El modelo se carga en el primer uso o en el calentamiento del arranque
+logger = logging.getLogger("hyperstition-core")
+logger.setLevel(logging.INFO)
+
+DICTIONARY_PATH = Path("app/data/hyperstition_terms.json")
+API_VERSION = "2.2"
+MIN_TEXT_LENGTH = 15
+
+# ---------------
+# 1. CARGA DINÁMICA DE RECURSOS
+# ---------------
+def read_hyperstition_resources(path: Path = DICTIONARY_PATH) -> Dict:
+    """Lee y valida el diccionario; lanza una excepción si no es válido."""
+    # Verificar que el archivo JSON exista
+    if not path.exists():
+        raise FileNotFoundError(f"Archivo JSON no encontrado: {path}")
+
+    # Cargar el JSON
+    with open(path, "r", encoding="utf-8") as f:
+        full_data = json.load(f)
+
+    # Validar estructura básica
+    if not isinstance(full_data, dict) or "categorias" not in full_data:
+        raise ValueError("El JSON debe contener la clave 'categorias'")
+    if "metadatos" not in full_data or "pesos_analiticos" not in full_data["metadatos"]:
+        raise ValueError("El JSON debe contener 'metadatos.pesos_analiticos'")
+
+    # Extraer categorías y pesos
+    categories = full_data["categorias"]
+    weights = full_data["metadatos"]["pesos_analiticos"]
+
+    # Validar tipos: listas de términos y pesos numéricos
+    for category, terms in categories.items():
+        if not isinstance(terms, list) or not all(isinstance(term, str) for term in terms):
+            raise ValueError(f"La categoría '{category}' debe ser una lista de términos")
+    for category, weight in weights.items():
+        if isinstance(weight, bool) or not isinstance(weight, (int, float)):
+            raise ValueError(f"El peso de '{category}' debe ser numérico")
+
+    # Validar que todas las categorías tengan un peso
+    missing_weights = set(categories.keys()) - set(weights.keys())
+    if missing_weights:
+        raise ValueError(
+            f"Las siguientes categorías no tienen un peso definido: {missing_weights}"
+        )
+
+    # Retornar recursos cargados
+    return {
+        "categories": categories,
+        "weights": weights,
+        "metadata": full_data.get("metadatos", {})
+    }
+
+def load_hyperstition_resources() -> Dict:
+    """Carga y valida el diccionario desde el JSON (vacío si no es válido)."""
+    try:
+        return read_hyperstition_resources()
+
+    except json.JSONDecodeError as e:
+        logger.error(f"Error al decodificar el JSON: {str(e)}")
+        return {"categories": {}, "weights": {}, "metadata": {}}
+    except Exception as e:
+        logger.error(f"Error al cargar recursos: {str(e)}")
+        return {"categories": {}, "weights": {}, "metadata": {}}
+
+# ---------------
+# 2. INICIALIZACIÓN PEREZOSA
+# ---------------
+class HyperstitionResources:
+    """Diccionario cargado junto con su matcher compilado.
+
+    Una instancia no se modifica tras construirse, así que un análisis que
+    toma una referencia trabaja siempre con una única versión del diccionario.
+    """
+
+    def __init__(self, categories: Dict, weights: Dict, metadata: Dict):
+        self.categories = categories
+        self.weights = weights
+        self.metadata = metadata
+        self.fingerprint = self.fingerprint_of(categories, weights, metadata)
+        self.matcher = TermMatcher(categories)
+
+    @staticmethod
+    def fingerprint_of(categories: Dict, weights: Dict, metadata: Dict) -> str:
+        """Huella del contenido: cambia aunque no se actualice `metadatos.version`."""
+        payload = json.dumps([categories, weights, metadata], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def version(self) -> str:
+        return str(self.metadata.get("version", "N/A"))
+
+    @property
+    def tag(self) -> str:
+        """Versión + huella; identifica el diccionario en claves de caché."""
+        return f"{self.version}+{self.fingerprint}"
+
+_resources: Optional[HyperstitionResources] = None
+_resources_lock = threading.Lock()
+_reload_lock = threading.Lock()  # Serializa las recargas (vigilante y endpoint)
+
+def get_resources() -> HyperstitionResources:
+    """Devuelve el diccionario activo, cargándolo una sola vez por proceso."""
+    global _resources
+    if _resources is None:
+        with _resources_lock:
+            if _resources is None:
+                loaded = load_hyperstition_resources()
+                _resources = HyperstitionResources(
+                    loaded["categories"], loaded["weights"], loaded["metadata"]
+                )
+                logger.info(f"🔑 Pesos analíticos cargados: {_resources.weights}")
+                logger.info(f"📚 Categorías disponibles: {list(_resources.categories.keys())}")
+    return _resources
+
+def reload_resources(path: Path = DICTIONARY_PATH) -> Tuple[HyperstitionResources, bool]:
+    """Valida el diccionario en disco y, si ha cambiado, lo activa.
+
+    El matcher se compila antes de tomar el lock y la sustitución es una
+    única asignación: los análisis en curso conservan la versión anterior.
+    Si el fichero no es válido se lanza la excepción y no se cambia nada.
+
+    Returns:
+        El diccionario activo y si ha sido sustituido.
+    """
+    global _resources
+    with _reload_lock:
+        loaded = read_hyperstition_resources(path)
+        current = _resources
+        fingerprint = HyperstitionResources.fingerprint_of(
+            loaded["categories"], loaded["weights"], loaded["metadata"]
+        )
+        if current is not None and current.fingerprint == fingerprint:
+            return current, False
+
+        fresh = HyperstitionResources(loaded["categories"], loaded["weights"], loaded["metadata"])
+        with _resources_lock:
+            previous, _resources = _resources, fresh
+    logger.info(
+        f"♻️ Diccionario recargado: {previous.tag if previous else 'N/A'} -> {fresh.tag}"
+    )
+    return fresh, True
+
+# Cada proceso vigila el fichero y recarga su copia fuera del camino de las peticiones
+dictionary_watcher = FileWatcher(
+    DICTIONARY_PATH, lambda: reload_resources(), settings.DICTIONARY_RELOAD_INTERVAL
+)
+
+
+# ---------------
+# 3. CONTEXTO DE ANÁLISIS
+# ---------------
+# Marcas referenciales por categoría (comparadas en minúsculas)
+REFERENTIAL_LEXICON: Dict[str, FrozenSet[str]] = {
+    "yo": frozenset({"yo", "mí", "me"}),
+    "nosotros": frozenset({"nosotros", "nuestro"}),
+    "ellos": frozenset({"ellos", "su", "les"}),
+    "neutro": frozenset({"según", "expertos"}),
+}
+LONG_WORD_LENGTH = 7
+
+@lru_cache(maxsize=None)
+def _referential_ids() -> Dict[str, FrozenSet[int]]:
+    """Hashes de `Vocab` del léxico referencial (iguales en cualquier modelo)."""
+    from spacy.strings import hash_string
+
+    return {
+        category: frozenset(hash_string(word) for word in words)
+        for category, words in REFERENTIAL_LEXICON.items()
+    }
+
+class LexicalStats:
+    """Recuentos léxicos de un Doc obtenidos en una sola pasada.
+
+    Se leen con `Doc.to_array` las columnas LOWER, LENGTH, IS_PUNCT e IS_SPACE;
+    las palabras son los tokens que no son puntuación ni espacio, así que
+    "yo," o "ellos." cuentan como "yo" y "ellos". Las sílabas se consultan
+    una vez por forma distinta (con caché) y se ponderan por su frecuencia.
+    `forms` guarda esas formas distintas en minúsculas.
+    """
+
+    __slots__ = ("words", "long_words", "syllables", "referential", "forms")
+
+    def __init__(self, doc):
+        from spacy.attrs import IS_PUNCT, IS_SPACE, LENGTH, LOWER
+
+        array = doc.to_array([LOWER, LENGTH, IS_PUNCT, IS_SPACE]).reshape(-1, 4)
+        words = array[(array[:, 2] == 0) & (array[:, 3] == 0)]
+        forms, counts = np.unique(words[:, 0], return_counts=True)
+        frequency = dict(zip(forms.tolist(), counts.tolist()))
+        strings = doc.vocab.strings
+
+        self.forms = [strings[form] for form in frequency]
+        self.words = len(words)
+        self.long_words = int(np.count_nonzero(words[:, 1] > LONG_WORD_LENGTH))
+        self.syllables = syllable_counter.total(self.forms, frequency.values())
+        self.referential = {
+            category: sum(frequency.get(form, 0) for form in ids)
+            for category, ids in _referential_ids().items()
+        }
+
+class AnalysisContext:
+    """Texto de entrada con su parseo spaCy compartido entre analizadores.
+
+    El `Doc` se calcula una sola vez (y sólo si alguna capa lo necesita);
+    oraciones y listas de tokens se derivan de él bajo demanda. `components`
+    limita el parseo a los componentes spaCy que piden las capas activas
+    (None = pipeline completo).
+    """
+
+    def __init__(
+        self,
+        text: str,
+        doc=None,
+        components: Optional[FrozenSet[str]] = None,
+        resources: Optional[HyperstitionResources] = None
+    ):
+        self.text = text
+        self.components = components
+        self.timer = StageTimer()
+        if doc is not None:
+            self.doc = doc
+        if resources is not None:
+            self.resources = resources
+
+    @classmethod
+    def of(cls, source: Union[str, "AnalysisContext"]) -> "AnalysisContext":
+        return source if isinstance(source, cls) else cls(source)
+
+    @cached_property
+    def doc(self):
+        return nlp_pipeline.parse(self.text, self.components)
+
+    @cached_property
+    def resources(self) -> HyperstitionResources:
+        """Diccionario fijado para todo el análisis de este texto."""
+        return get_resources()
+
+    @cached_property
+    def sents(self) -> list:
+        return list(self.doc.sents)
+
+    @cached_property
+    def lexical(self) -> LexicalStats:
+        """Recuentos léxicos compartidos por las capas referencial y lingüística."""
+        return LexicalStats(self.doc)
+
+# ---------------
+# 4. FUNCIONES CORE
+# ---------------
+def detect_hyperstition_terms(source: Union[str, AnalysisContext]) -> Dict[str, List[str]]:
+    """Detección de términos con soporte multi-categoría (una sola pasada)."""
+    ctx = AnalysisContext.of(source)
+    return ctx.resources.matcher.detect(ctx.text)
+
+def analyze_referential(source: Union[str, AnalysisContext]) -> Dict[str, float]:
+    """Análisis de marcas referenciales en el texto."""
+    stats = AnalysisContext.of(source).lexical
+    total = stats.words or 1
+    return {
+        category: round(count / total, 2)
+        for category, count in stats.referential.items()
+    }
+
+def analyze_linguistic_complexity(source: Union[str, AnalysisContext]) -> Dict[str, float]:
+    """Cálculo de métricas de complejidad lingüística."""
+    ctx = AnalysisContext.of(source)
+    stats = ctx.lexical
+    words = stats.words
+
+    return {
+        "avg_sentence_length": round(words / len(ctx.sents), 2) if ctx.sents else 0,
+        "avg_syllables_per_word": round(stats.syllables / words, 2) if words else 0,
+        "long_word_ratio": round(stats.long_words / words, 2) if words else 0
+    }
+
+def expand_semantic_terms(source: Union[str, AnalysisContext]) -> Dict[str, Any]:
+    """Formas del texto cercanas a las categorías del diccionario (word2vec)."""
+    ctx = AnalysisContext.of(source)
+    resources = ctx.resources
+    return semantic_expander.expand(ctx.lexical.forms, resources.categories, resources.tag)
+
+def calculate_semantic_score(detected_terms: Dict, weights: Optional[Dict] = None) -> float:
+    """Cálculo dinámico del score semántico."""
+    if not detected_terms:
+        return 0.0
+    
+    weights = weights if weights is not None else get_resources().weights
+    total_score = sum(
+        len(terms) * weights.get(category, 1.0)
+        for category, terms in detected_terms.items()
+    )
+    return round(total_score / len(detected_terms), 3)
+
+# ---------------
+# 5. ANALIZADORES ESPECIALIZADOS
+# ---------------
+class SyntacticAnalyzer:
+    """Analizador sintáctico completo con detección de estructuras complejas."""
+    
+    def analyze(self, source: Union[str, AnalysisContext]) -> Dict[str, Any]:
+        ctx = AnalysisContext.of(source)
+        return {
+            "sentence_types": self._detect_sentence_types(ctx),
+            "dependencies": self._extract_dependencies(ctx.doc),
+            "complexity": self._calculate_complexity(ctx),
+            # Voz, negación y sujeto: reglas de syntactic_rules.json en una pasada
+            **syntactic_prophet.analyze(ctx.doc)
+        }
+
+    def _detect_sentence_types(self, ctx: AnalysisContext) -> Dict:
+        types = {"declarative": 0, "interrogative": 0, "exclamative": 0}
+        for sent in ctx.sents:
+            if '?' in sent.text:
+                types["interrogative"] += 1
+            elif '!' in sent.text:
+                types["exclamative"] += 1
+            else:
+                types["declarative"] += 1
+        return types
+
+    def _extract_dependencies(self, doc) -> List[Dict]:
+        return [{
+            "governor": token.head.text,
+            "dependent": token.text,
+            "relation": token.dep_
+        } for token in doc if token.dep_ not in ["punct", "space"]]
+
+    def _calculate_complexity(self, ctx: AnalysisContext) -> Dict:
+        from spacy.attrs import DEP, HEAD  # spaCy ya está cargado si hay un Doc
+
+        doc = ctx.doc
+        if not len(doc):
+            return {"subordinate_clauses": 0, "depth_score": 0}
+
+        # HEAD llega como desplazamiento relativo en uint64; int64 recupera el signo
+        arr = doc.to_array([HEAD, DEP]).astype(np.int64)
+        heads = (np.arange(len(doc)) + arr[:, 0]).tolist()
+
+        # |subárbol(t)| = 1 + descendientes, así que sum(|subárbol|) = sum(profundidad + 1)
+        depth_total = sum(self._tree_depths(heads)) + len(doc)
+
+        # Oraciones con al menos un marcador de subordinación ("mark")
+        is_mark = arr[:, 1] == doc.vocab.strings["mark"]
+        starts = [sent.start for sent in ctx.sents]
+        subordinate = int(np.count_nonzero(np.add.reduceat(is_mark, starts))) if starts else 0
+
+        return {
+            "subordinate_clauses": subordinate,
+            "depth_score": round(depth_total / len(doc), 2)
+        }
+
+    @staticmethod
+    def _tree_depths(heads: List[int]) -> List[int]:
+        """Profundidad de cada token (raíz = 0) en tiempo lineal.
+
+        Cada cadena de núcleos se recorre sólo hasta el primer token con
+        profundidad ya conocida, por lo que cada token se visita una vez.
+        """
+        depths = [-1] * len(heads)
+        for i in range(len(heads)):
+            path = []
+            j = i
+            while depths[j] < 0 and heads[j] != j:
+                path.append(j)
+                j = heads[j]
+            if depths[j] < 0:
+                depths[j] = 0
+            depth = depths[j]
+            for k in reversed(path):
+                depth += 1
+                depths[k] = depth
+        return depths
+
+class CognitiveIntegrator:
+    """Integrador cognitivo con cálculo de vectores de riesgo."""
+    
+    def generate_profile(self, detected_terms: Dict, weights: Optional[Dict] = None) -> Dict:
+        weights = weights if weights is not None else get_resources().weights
+        risk_vectors = {
+            category: len(terms) * weights.get(category, 1.0)
+            for category, terms in detected_terms.items()
+        }
+        return {
+            "risk_vectors": risk_vectors,
+            "total_risk": round(sum(risk_vectors.values()), 2)
+        }
+
+# ---------------
+# 6. PIPELINE DE ANÁLISIS
+# ---------------
+def validate_text(text: str) -> None:
+    """Valida que el texto tenga la longitud mínima para analizarse."""
+    if len(text) < MIN_TEXT_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Texto insuficiente para análisis (mínimo {MIN_TEXT_LENGTH} caracteres)"
+        )
+
+# Capas seleccionables -> componentes spaCy que necesitan
+ANALYSIS_LAYERS: Dict[str, Tuple[str, ...]] = {
+    "detected_terms": (),
+    "semantic_score": (),
+    "risk_level": (),
+    # Sólo usa límites de oración: en modo rápido basta el sentencizer por reglas
+    "linguistic_complexity": (SENTENCIZER,) if settings.NLP_FAST_SENTENCES else ("parser",),
+    "referential_analysis": (),
+    "syntactic_analysis": ("parser", "morphologizer"),
+    "cognitive_profile": (),
+    "semantic_expansion": (),
+}
+ALL_LAYERS: FrozenSet[str] = frozenset(ANALYSIS_LAYERS)
+TERM_LAYERS: FrozenSet[str] = frozenset(
+    {"detected_terms", "semantic_score", "risk_level", "cognitive_profile"}
+)
+
+def parse_layers(names: Optional[Iterable[str]]) -> Optional[FrozenSet[str]]:
+    """Normaliza la selección de capas; None equivale a todas."""
+    if names is None:
+        return None
+    layers = frozenset(name.strip() for name in names if name.strip())
+    unknown = layers - ALL_LAYERS
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Capas desconocidas: {sorted(unknown)}. Disponibles: {sorted(ALL_LAYERS)}"
+        )
+    return layers if layers != ALL_LAYERS else None
+
+def required_components(layers: Optional[FrozenSet[str]]) -> FrozenSet[str]:
+    """Componentes spaCy necesarios para las capas solicitadas."""
+    return frozenset(
+        component for layer in (layers or ALL_LAYERS) for component in ANALYSIS_LAYERS[layer]
+    )
+
+def run_analysis(ctx: AnalysisContext, layers: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """Ejecuta las capas solicitadas (todas por defecto) sobre un contexto.
+
+    El `Doc` del contexto es perezoso: si ninguna capa lo usa, spaCy no llega
+    a ejecutarse.
+    """
+    layers = layers or ALL_LAYERS
+    resources = ctx.resources
+    timer = ctx.timer
+    result: Dict[str, Any] = {}
+
+    if "doc" not in vars(ctx) and required_components(layers):
+        # Parseo explícito para medirlo aparte de las capas que lo usan
+        with timer.stage("spacy_parse"):
+            ctx.doc
+
+    if layers & TERM_LAYERS:
+        with timer.stage("term_detection"):
+            detected_terms = detect_hyperstition_terms(ctx)
+            semantic_score = calculate_semantic_score(detected_terms, resources.weights)
+        if "detected_terms" in layers:
+            result["detected_terms"] = detected_terms
+        if "semantic_score" in layers:
+            result["semantic_score"] = semantic_score
+        if "risk_level" in layers:
+            result["risk_level"] = "Bajo" if semantic_score < 0.1 else "Moderado" if semantic_score < 0.3 else "Alto"
+        if "cognitive_profile" in layers:
+            with timer.stage("cognitive"):
+                result["cognitive_profile"] = CognitiveIntegrator().generate_profile(
+                    detected_terms, resources.weights
+                )
+
+    if "linguistic_complexity" in layers:
+        with timer.stage("linguistic"):
+            result["linguistic_complexity"] = analyze_linguistic_complexity(ctx)
+    if "referential_analysis" in layers:
+        with timer.stage("referential"):
+            result["referential_analysis"] = analyze_referential(ctx)
+    if "syntactic_analysis" in layers:
+        with timer.stage("syntactic"):
+            result["syntactic_analysis"] = SyntacticAnalyzer().analyze(ctx)
+    if "semantic_expansion" in layers:
+        with timer.stage("semantic_expansion"):
+            result["semantic_expansion"] = expand_semantic_terms(ctx)
+
+    result["metadata"] = {
+        "version": API_VERSION,
+        "dictionary_version": resources.version,
+        "dictionary_fingerprint": resources.fingerprint,
+        "timestamp": datetime.utcnow().isoformat()
+    }
+    return result
+
+def analyze_text(
+    text: str, layers: Optional[FrozenSet[str]] = None
+) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Punto de entrada del pool de trabajadores para un único texto.
+
+    Devuelve el resultado y la duración de cada etapa (segundos).
+    """
+    ctx = AnalysisContext(text, components=required_components(layers))
+    return run_analysis(ctx, layers), ctx.timer.durations
+
+def analysis_cache_key(
+    normalized_text: str,
+    layers: Optional[FrozenSet[str]] = None,
+    dictionary_tag: Optional[str] = None
+) -> str:
+    """Clave de caché: texto normalizado + versiones de API y diccionario + capas.
+
+    `dictionary_tag` por defecto es el del diccionario activo en este proceso.
+    """
+    return analysis_cache.make_key(
+        normalized_text,
+        API_VERSION,
+        dictionary_tag or get_resources().tag,
+        ",".join(sorted(layers)) if layers else "all"
+    )
+
+def result_dictionary_tag(result: Dict[str, Any]) -> str:
+    """Diccionario con el que se calculó un resultado (puede ser de otro proceso)."""
+    metadata = result["metadata"]
+    return f"{metadata['dictionary_version']}+{metadata['dictionary_fingerprint']}"
+
+def refresh_timestamp(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Copia de un resultado cacheado con `metadata.timestamp` actualizado."""
+    return {
+        **result,
+        "metadata": {**result["metadata"], "timestamp": datetime.utcnow().isoformat()}
+    }
+
+def warm_up_worker() -> None:
+    """Inicializador de trabajador: carga modelo y diccionario una sola vez."""
+    dictionary_watcher.start()
+    get_resources()
+    semantic_expander.load()
+    # El parseo de calentamiento compila también las reglas sintácticas
+    syntactic_prophet.analyze(
+        nlp_pipeline.parse("Calentamiento del modelo.", required_components(None))
+    )
+
+def run_batch_analysis(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    n_process: Optional[int] = None,
+    layers: Optional[FrozenSet[str]] = None
+) -> List[Dict[str, Any]]:
+    """Analiza una lista de textos con `nlp.pipe`, aislando los errores por ítem.
+
+    Si ninguna capa solicitada necesita componentes spaCy, cada texto sólo se
+    tokeniza (y sólo si alguna capa usa el `Doc`). Todo el lote se analiza
+    con el mismo diccionario aunque se recargue a mitad. Cada ítem analizado incluye `timings` (segundos por etapa); el parseo de
+    `nlp.pipe` se reparte a partes iguales entre los textos del lote.
+    """
+    resources = get_resources()
+    items: List[Dict[str, Any]] = [{"index": i} for i in range(len(texts))]
+    pending = []
+    for i, text in enumerate(texts):
+        try:
+            validate_text(text)
+            pending.append(i)
+        except HTTPException as he:
+            items[i]["error"] = he.detail
+
+    components = required_components(layers)
+    if components:
+        docs = nlp_pipeline.pipe(
+            (texts[i] for i in pending),
+            components,
+            batch_size=batch_size or settings.NLP_BATCH_SIZE,
+            n_process=n_process or settings.NLP_N_PROCESS
+        )
+    else:
+        docs = (None for _ in pending)
+    docs = iter(docs)
+    parse_time = 0.0
+    timers = []
+    try:
+        for i in pending:
+            started = time.perf_counter()
+            doc = next(docs)
+            parse_time += time.perf_counter() - started
+            ctx = AnalysisContext(texts[i], doc=doc, components=components, resources=resources)
+            timers.append(ctx.timer)
+            items[i]["timings"] = ctx.timer.durations
+            try:
+                items[i]["result"] = run_analysis(ctx, layers)
+            except Exception as e:
+                logger.error(f"Error en análisis del ítem {i}: {str(e)}", exc_info=True)
+                items[i]["error"] = f"Error interno del sistema v{API_VERSION}"
+    except Exception as e:
+        # Un fallo de nlp.pipe invalida el resto del lote, no lo ya procesado
+        logger.error(f"Error en nlp.pipe: {str(e)}", exc_info=True)
+        for i in pending:
+            if "result" not in items[i] and "error" not in items[i]:
+                items[i]["error"] = f"Error interno del sistema v{API_VERSION}"
+
+    if components and timers:
+        for timer in timers:
+            timer.add("spacy_parse", parse_time / len(timers))
+    return items
+
+async def analyze_with_cache(text: str, layers: Optional[FrozenSet[str]] = None) -> Dict[str, Any]:
+    """Análisis de un texto validado: caché por contenido y, si falla, el pool."""
+    text = analysis_cache.normalize(text)
+    observe_text_length(text)
+    cache_key = analysis_cache_key(text, layers)
+    cached = await analysis_cache.get(cache_key)
+    if cached is not None:
+        return refresh_timestamp(cached)
+
+    # El análisis (CPU-bound) se ejecuta en el pool, fuera del event loop
+    result, timings = await analysis_pool.run(analyze_text, text, layers)
+    observe_stages(timings)
+    # Un trabajador que aún no ha recargado el diccionario guarda con su versión
+    await analysis_cache.set(analysis_cache_key(text, layers, result_dictionary_tag(result)), result)
+    return result
+
+# ---------------
+# 7. VERIFICACIÓN INICIAL
+# ---------------
+if __name__ == "__main__":
+    # Prueba de carga básica
+    test_text = "El neurocapitalismo y la algocracia predictiva aceleran el colapso geopolítico."
+    print("=== PRUEBA DE DETECCIÓN ===")
+    print(detect_hyperstition_terms(test_text))
@@ -0,0 +1,69 @@
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+logger = logging.getLogger("hyperstition-core")
+
+
+class FileWatcher:
+    """Vigila el mtime de un fichero en un hilo daemon y avisa de los cambios.
+
+    `on_change` se ejecuta en el hilo del vigilante, nunca en el de una
+    petición. Si falla, el error se registra y no se reintenta hasta que el
+    fichero vuelva a cambiar. `interval <= 0` desactiva el vigilante.
+    """
+
+    def __init__(self, path: Union[str, Path], on_change: Callable[[], None], interval: float):
+        self.path = Path(path)
+        self.on_change = on_change
+        self.interval = interval
+        self._mtime: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _current_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    def check(self) -> bool:
+        """Comprueba el fichero una vez; devuelve True si ha cambiado."""
+        mtime = self._current_mtime()
+        if mtime is None or mtime == self._mtime:
+            return False
+        self._mtime = mtime
+        try:
+            self.on_change()
+        except Exception as e:
+            logger.error(f"❌ Error al recargar {self.path}: {str(e)}")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        """Arranca el hilo (idempotente). El estado actual se toma como base."""
+        if self.interval <= 0:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._mtime = self._current_mtime()
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"watch-{self.path.name}", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        with self._lock:
+            if self._thread is None:
+                return
+            self._stop.set()
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
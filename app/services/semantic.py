@@ -0,0 +1,206 @@
+"""Capa de expansión semántica: tokens cercanos al diccionario en el espacio word2vec.
+
+Los vectores se abren con `mmap='r'`: las páginas del fichero `.npy` las
+comparte el sistema operativo entre todos los trabajadores del pool en lugar
+de copiarse en cada proceso. Por eso no se normaliza la matriz completa
+(`get_normed_vectors` crearía una copia privada) y sólo se normalizan las
+filas que usa cada documento.
+
+Por cada categoría del diccionario se precalcula un centroide normalizado de
+sus términos. Un documento se resuelve con un único producto matricial
+(formas distintas × centroides); el término más cercano sólo se busca para
+las formas que superan el umbral.
+"""
+import logging
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.config.settings import settings
+
+if TYPE_CHECKING:  # gensim se importa al cargar los vectores, no al importar el módulo
+    from gensim.models import KeyedVectors
+
+logger = logging.getLogger("hyperstition-core")
+
+
+def load_keyed_vectors(path: Union[str, Path]) -> "KeyedVectors":
+    """Abre unos `KeyedVectors` en modo mmap de sólo lectura.
+
+    Acepta también un `Word2Vec` completo guardado con `model.save` (se usa
+    su `wv`), como el que genera la versión anterior del entrenamiento.
+    """
+    from gensim.models import KeyedVectors
+    from gensim.utils import SaveLoad
+
+    loaded = SaveLoad.load(str(path), mmap="r")
+    vectors = getattr(loaded, "wv", loaded)
+    if not isinstance(vectors, KeyedVectors):
+        raise TypeError(f"{path} no contiene vectores de palabras ({type(loaded).__name__})")
+    return vectors
+
+
+class CategoryIndex:
+    """Centroides y términos de un diccionario proyectados en unos vectores.
+
+    Un término de varias palabras se representa con la media de las que estén
+    en el vocabulario; los términos sin ninguna se ignoran.
+    """
+
+    def __init__(self, vectors: "KeyedVectors", categories: Dict[str, List[str]]):
+        self.terms = frozenset(
+            term.lower() for terms in categories.values() for term in terms if term
+        )
+        names: List[str] = []
+        centroids: List[np.ndarray] = []
+        term_rows: List[np.ndarray] = []
+        term_names: List[str] = []
+        term_categories: List[int] = []
+
+        for category, terms in categories.items():
+            rows = []
+            for term in dict.fromkeys(t.lower() for t in terms if t):
+                vector = self._term_vector(vectors, term)
+                if vector is not None:
+                    rows.append(vector)
+                    term_names.append(term)
+                    term_categories.append(len(names))
+            if rows:
+                matrix = _normalize(np.vstack(rows))
+                term_rows.append(matrix)
+                centroids.append(matrix.mean(axis=0))
+                names.append(category)
+
+        dim = vectors.vector_size
+        self.categories = names
+        self.centroids = _normalize(np.vstack(centroids)) if centroids else np.empty((0, dim), np.float32)
+        self.term_matrix = np.vstack(term_rows) if term_rows else np.empty((0, dim), np.float32)
+        self.term_names = term_names
+        self.term_categories = np.asarray(term_categories, dtype=np.int64)
+
+    @staticmethod
+    def _term_vector(vectors: "KeyedVectors", term: str) -> Optional[np.ndarray]:
+        if term in vectors.key_to_index:
+            return vectors[term]
+        indices = [vectors.key_to_index[w] for w in term.split() if w in vectors.key_to_index]
+        if not indices:
+            return None
+        return vectors.vectors[indices].mean(axis=0)
+
+    def __len__(self) -> int:
+        return len(self.categories)
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms > 0, norms, 1.0)
+
+
+class SemanticExpander:
+    """Marca las formas de un texto similares a alguna categoría del diccionario.
+
+    Los vectores se cargan una vez por proceso en el primer uso (o en el
+    calentamiento). El índice de categorías se reconstruye cuando cambia la
+    etiqueta del diccionario; la sustitución es una única asignación, así que
+    un análisis en curso conserva el índice con el que empezó.
+    """
+
+    def __init__(self, model_path: Union[str, Path], threshold: float = 0.6, enabled: bool = True):
+        self.model_path = Path(model_path)
+        self.threshold = threshold
+        self.enabled = enabled
+        self._vectors: Optional["KeyedVectors"] = None
+        self._unavailable = False
+        self._index: Optional[Tuple[str, CategoryIndex]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._vectors is not None
+
+    def load(self) -> Optional["KeyedVectors"]:
+        """Abre los vectores; None si la capa está desactivada o no hay modelo."""
+        if not self.enabled or self._unavailable:
+            return None
+        if self._vectors is None:
+            with self._lock:
+                if self._vectors is None and not self._unavailable:
+                    try:
+                        self._vectors = load_keyed_vectors(self.model_path)
+                        logger.info(
+                            f"🧭 Vectores semánticos cargados (mmap): {self.model_path} "
+                            f"{len(self._vectors)}×{self._vectors.vector_size}"
+                        )
+                    except Exception as e:
+                        self._unavailable = True
+                        logger.warning(f"⚠️ Expansión semántica no disponible: {str(e)}")
+        return self._vectors
+
+    def use_vectors(self, vectors: "KeyedVectors"):
+        """Sustituye los vectores (p. ej. tras reentrenar) y descarta el índice."""
+        with self._lock:
+            self._vectors = vectors
+            self._unavailable = False
+            self._index = None
+
+    def index_for(self, categories: Dict[str, List[str]], tag: str) -> Optional[CategoryIndex]:
+        """Índice de categorías para el diccionario identificado por `tag`."""
+        vectors = self.load()
+        if vectors is None:
+            return None
+        current = self._index
+        if current is not None and current[0] == tag:
+            return current[1]
+        index = CategoryIndex(vectors, categories)
+        self._index = (tag, index)
+        return index
+
+    def expand(
+        self, forms: Iterable[str], categories: Dict[str, List[str]], tag: str
+    ) -> Dict[str, Any]:
+        """Formas distintas (en minúsculas) cercanas a cada categoría.
+
+        Los términos exactos del diccionario se omiten: ya los detecta la capa
+        de términos. Cada forma se asigna a su categoría más similar.
+        """
+        index = self.index_for(categories, tag)
+        if index is None or not len(index):
+            return {"available": False, "matches": {}}
+
+        key_to_index = self._vectors.key_to_index
+        candidates = [
+            form for form in dict.fromkeys(forms)
+            if form in key_to_index and form not in index.terms
+        ]
+        matches: Dict[str, List[Dict[str, Any]]] = {}
+        if candidates:
+            rows = _normalize(self._vectors.vectors[[key_to_index[f] for f in candidates]])
+            scores = rows @ index.centroids.T
+            best = scores.argmax(axis=1)
+            best_scores = scores[np.arange(len(candidates)), best]
+            flagged = np.flatnonzero(best_scores >= self.threshold)
+            if flagged.size:
+                # Término más cercano dentro de la categoría asignada
+                term_scores = rows[flagged] @ index.term_matrix.T
+                term_scores[index.term_categories[None, :] != best[flagged][:, None]] = -np.inf
+                nearest = term_scores.argmax(axis=1)
+                for row, term_idx in zip(flagged.tolist(), nearest.tolist()):
+                    matches.setdefault(index.categories[best[row]], []).append({
+                        "token": candidates[row],
+                        "similarity": round(float(best_scores[row]), 3),
+                        "nearest_term": index.term_names[term_idx],
+                    })
+        for found in matches.values():
+            found.sort(key=lambda match: match["similarity"], reverse=True)
+        return {"available": True, "matches": matches}
+
+
+# Instancia global de la expansión semántica (vectores compartidos por mmap)
+semantic_expander = SemanticExpander(
+    settings.SEMANTIC_MODEL_PATH,
+    threshold=settings.SEMANTIC_THRESHOLD,
+    enabled=settings.SEMANTIC_ENABLED,
+)
@@ -0,0 +1,81 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List
+
+from app.config.settings import settings
+
+# Vocales fuertes (las débiles con tilde forman hiato, así que cuentan como fuertes)
+STRONG_VOWELS = frozenset("aeoáéóíú")
+WEAK_VOWELS = frozenset("iuü")
+_VOWELS = "aeiouáéíóúü"
+
+# "u" muda en que/qui/gue/gui (con "ü" sí suena: pingüino)
+_SILENT_U = re.compile(r"(?<=[qg])u(?=[eiéí])")
+# "y" es vocal cuando no precede a otra vocal: y, hoy, muy, Paraguay
+_VOCALIC_Y = re.compile(rf"y(?![{_VOWELS}])")
+# La "h" intercalada no impide el diptongo: ahu-ma-do
+_SILENT_H = re.compile(rf"(?<=[{_VOWELS}])h(?=[{_VOWELS}])")
+
+
+def count_syllables(word: str) -> int:
+    """Número de sílabas de una palabra española (mínimo 1).
+
+    Cuenta núcleos vocálicos: dos vocales fuertes seguidas forman hiato;
+    una débil junto a otra vocal forma diptongo o triptongo, salvo que la
+    débil lleve tilde (día, oír).
+    """
+    word = word.lower()
+    word = _SILENT_U.sub("", word)
+    word = _VOCALIC_Y.sub("i", word)
+    word = _SILENT_H.sub("", word)
+
+    syllables = 0
+    previous = None  # "strong", "weak" o None (consonante)
+    for char in word:
+        if char in STRONG_VOWELS:
+            if previous != "weak":
+                syllables += 1
+            previous = "strong"
+        elif char in WEAK_VOWELS:
+            if previous is None:
+                syllables += 1
+            previous = "weak"
+        else:
+            previous = None
+    return max(1, syllables)
+
+
+class SyllableCounter:
+    """Contador de sílabas con un LRU acotado por forma en minúsculas.
+
+    Las palabras frecuentes del español se repiten constantemente, así que en
+    textos largos casi todas las consultas son aciertos de caché.
+    """
+
+    def __init__(self, maxsize: int = 50000):
+        self.maxsize = maxsize
+        self._count = lru_cache(maxsize=maxsize)(count_syllables)
+
+    def count(self, word: str) -> int:
+        return self._count(word.lower())
+
+    def count_many(self, words: Iterable[str]) -> List[int]:
+        """Sílabas de cada palabra, en el mismo orden."""
+        count = self._count
+        return [count(word.lower()) for word in words]
+
+    def total(self, words: Iterable[str], frequencies: Iterable[int]) -> int:
+        """Suma de sílabas de formas distintas ponderadas por su frecuencia."""
+        count = self._count
+        return sum(count(word.lower()) * frequency for word, frequency in zip(words, frequencies))
+
+    def stats(self) -> Dict[str, int]:
+        info = self._count.cache_info()
+        return {"hits": info.hits, "misses": info.misses, "entries": info.currsize, "max": self.maxsize}
+
+    def clear(self):
+        self._count.cache_clear()
+
+
+# Contador compartido por proceso
+syllable_counter = SyllableCounter(settings.SYLLABLE_CACHE_SIZE)
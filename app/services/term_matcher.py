@@ -0,0 +1,75 @@
+import re
+from typing import Dict, List, Tuple
+
+
+class TermMatcher:
+    """Detector de términos compilado una sola vez a partir del diccionario.
+
+    Todas las variantes se combinan en una única alternancia (ordenada de más
+    larga a más corta) dentro de un lookahead, de modo que el texto se recorre
+    en una sola pasada y se detectan también coincidencias solapadas. El
+    resultado es idéntico al de aplicar ``\\bterm\\b`` término por término.
+    """
+
+    def __init__(self, dictionary: Dict[str, List[str]]):
+        self.categories = list(dictionary.keys())
+        # término normalizado -> [(índice de categoría, índice del término)]
+        self._index: Dict[str, List[Tuple[int, int]]] = {}
+        self._terms: List[List[str]] = []
+
+        for cat_idx, category in enumerate(self.categories):
+            terms = list(dictionary[category])
+            self._terms.append(terms)
+            for term_idx, term in enumerate(terms):
+                if term:
+                    self._index.setdefault(term.lower(), []).append((cat_idx, term_idx))
+
+        keys = sorted(self._index, key=len, reverse=True)
+        # Términos más cortos que son prefijo de otro término: la alternancia
+        # sólo devuelve la variante más larga en cada posición.
+        self._prefixes: Dict[str, List[Tuple[str, re.Pattern]]] = {}
+        for key in keys:
+            prefixes = [
+                (key[:i], re.compile(rf"{re.escape(key[:i])}\b", re.IGNORECASE))
+                for i in range(len(key) - 1, 0, -1)
+                if key[:i] in self._index
+            ]
+            if prefixes:
+                self._prefixes[key] = prefixes
+
+        self._pattern = (
+            re.compile(
+                r"(?=\b(" + "|".join(re.escape(k) for k in keys) + r")\b)",
+                re.IGNORECASE,
+            )
+            if keys else None
+        )
+
+    def _scan(self, text: str) -> set:
+        found = set()
+        for match in self._pattern.finditer(text):
+            key = match.group(1).lower()
+            if key not in self._index:
+                continue
+            found.add(key)
+            for prefix, prefix_pattern in self._prefixes.get(key, ()):
+                if prefix not in found and prefix_pattern.match(text, match.start()):
+                    found.add(prefix)
+        return found
+
+    def detect(self, text: str) -> Dict[str, List[str]]:
+        """Devuelve los términos detectados agrupados por categoría."""
+        if self._pattern is None:
+            return {}
+
+        hits = sorted(
+            position
+            for key in self._scan(text)
+            for position in self._index[key]
+        )
+
+        detected: Dict[str, List[str]] = {}
+        for cat_idx, term_idx in hits:
+            category = self.categories[cat_idx]
+            detected.setdefault(category, []).append(self._terms[cat_idx][term_idx])
+        return detected
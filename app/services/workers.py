@@ -0,0 +1,131 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.config.settings import settings
+from app.utils.logger import app_logger
+
+
+class PoolSaturatedError(RuntimeError):
+    """La cola del pool de análisis está llena; el cliente debe reintentar."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Pool de análisis saturado")
+        self.retry_after = retry_after
+
+
+class AnalysisPool:
+    """Pool de trabajadores para el análisis NLP (CPU-bound).
+
+    Saca el parseo spaCy y el resto del pipeline del event loop. Limita las
+    tareas en ejecución con un semáforo y rechaza peticiones nuevas cuando
+    la cola de espera está llena, en lugar de dejar crecer la latencia.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        workers: int = 2,
+        max_concurrency: int = 2,
+        queue_size: int = 32,
+        retry_after: int = 5,
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Modo de pool no soportado: {mode}")
+        self.mode = mode
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.retry_after = retry_after
+        self.executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._waiting = 0
+
+    def start(self, initializer: Optional[Callable[[], Any]] = None):
+        """Crea el ejecutor; `initializer` se ejecuta una vez por trabajador."""
+        if self.executor is not None:
+            return
+        if self.mode == "process":
+            # spawn: los procesos no heredan hilos ni conexiones del padre
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+            )
+        else:
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="analysis",
+                initializer=initializer,
+            )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        app_logger.info(f"Pool de análisis iniciado ({self.mode}, {self.workers} trabajadores)")
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Ejecuta `fn(*args)` en el pool respetando el límite de concurrencia.
+
+        Si se cancela la espera, el hueco sigue ocupado hasta que el trabajo
+        termina en el ejecutor.
+
+        Raises:
+            PoolSaturatedError: si ya hay `queue_size` tareas esperando turno.
+        """
+        if self.executor is None:
+            self.start()
+
+        if self._waiting >= self.queue_size:
+            raise PoolSaturatedError(self.retry_after)
+
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._in_flight += 1
+        semaphore = self._semaphore
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        except BaseException:
+            self._in_flight -= 1
+            semaphore.release()
+            raise
+        # El hueco se libera cuando el ejecutor termina, no cuando se deja de
+        # esperar: cancelar la espera (p. ej. un timeout) no detiene el trabajo
+        future.add_done_callback(lambda done: self._release(semaphore, done))
+        return await asyncio.shield(future)
+
+    def _release(self, semaphore: asyncio.Semaphore, future: asyncio.Future):
+        self._in_flight -= 1
+        semaphore.release()
+        if not future.cancelled():
+            future.exception()  # Evita el aviso si nadie espera ya el resultado
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+            "queue_size": self.queue_size,
+        }
+
+    def shutdown(self):
+        """Detiene el ejecutor esperando a que terminen las tareas en curso."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+            self._semaphore = None
+            app_logger.info("Pool de análisis detenido")
+
+
+# Instancia global del pool de análisis
+analysis_pool = AnalysisPool(
+    mode=settings.ANALYSIS_POOL_MODE,
+    workers=settings.ANALYSIS_WORKERS,
+    max_concurrency=settings.ANALYSIS_MAX_CONCURRENCY,
+    queue_size=settings.ANALYSIS_QUEUE_SIZE,
+    retry_after=settings.ANALYSIS_RETRY_AFTER,
+)
@@ -1,15 +1,27 @@
+import asyncio
+import json
+
 import pytest
-from httpx import AsyncClient
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+from starlette.requests import ClientDisconnect
+
 from app.main import app
 from app.config.settings import settings
+from app.routers import hyperstition
+from app.services.workers import PoolSaturatedError
 
 TEST_TEXT = "El neurocapitalismo acelera el colapso geopolítico mediante algoritmos predictivos."
 
-@pytest.fixture
+
+@pytest_asyncio.fixture
 async def client():
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+    transport = ASGITransport(app=app)
+    headers = {"User-Agent": "curl/8.0"}
+    async with AsyncClient(transport=transport, base_url="http://test", headers=headers) as ac:
         yield ac
 
+
 @pytest.mark.asyncio
 async def test_syntactic_analysis(client):
     """Prueba el análisis sintáctico integrado en la respuesta"""
@@ -17,24 +29,24 @@ async def test_syntactic_analysis(client):
         "/hyperstition/analyze",
         json={"text": TEST_TEXT}
     )
-    
+
     assert response.status_code == 200
     json_response = response.json()
-    
+
     # Verificación básica de estructura sintáctica
-    assert "syntax" in json_response
-    assert isinstance(json_response["syntax"], dict)
-    
-    # Validación de campos específicos
-    syntax_data = json_response["syntax"]
-    assert "complexity" in syntax_data
-    assert isinstance(syntax_data["complexity"], dict)
-    
+    syntax_data = json_response["syntactic_analysis"]
+    assert set(syntax_data) == {
+        "sentence_types", "dependencies", "complexity",
+        "voice", "negation_patterns", "subject_positions",
+    }
+    assert isinstance(syntax_data["dependencies"], list)
+    assert set(syntax_data["voice"]) == {"active", "passive"}
+
     # Verificación de valores numéricos
-    assert syntax_data["complexity"]["score"] > 0
     assert syntax_data["complexity"]["subordinate_clauses"] >= 0
     assert syntax_data["complexity"]["depth_score"] > 0
 
+
 @pytest.mark.asyncio
 async def test_full_analysis_structure(client):
     """Prueba la estructura completa de la respuesta"""
@@ -42,23 +54,40 @@ async def test_full_analysis_structure(client):
         "/hyperstition/analyze",
         json={"text": TEST_TEXT}
     )
-    
+
     assert response.status_code == 200
     json_response = response.json()
-    
+
     # Campos obligatorios
     required_fields = {
-        "hyperstition", 
-        "semantics", 
-        "syntax", 
-        "risk_profile", 
-        "discourse_style"
+        "detected_terms",
+        "semantic_score",
+        "risk_level",
+        "linguistic_complexity",
+        "referential_analysis",
+        "syntactic_analysis",
+        "cognitive_profile",
+        "metadata",
     }
-    assert all(field in json_response for field in required_fields)
-    
+    assert required_fields <= set(json_response)
+
     # Validación de tipos
-    assert isinstance(json_response["syntax"]["dependencies"], list)
-    assert isinstance(json_response["risk_profile"]["level"], str)
+    assert isinstance(json_response["risk_level"], str)
+    assert json_response["metadata"]["version"] == "2.2"
+    assert "Server-Timing" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_layers_limit_response(client):
+    """Sólo se devuelven las capas solicitadas"""
+    response = await client.post(
+        "/hyperstition/analyze?layers=risk_level,semantic_score",
+        json={"text": TEST_TEXT}
+    )
+
+    assert response.status_code == 200
+    assert set(response.json()) == {"risk_level", "semantic_score", "metadata"}
+
 
 @pytest.mark.asyncio
 async def test_error_handling(client):
@@ -67,10 +96,11 @@ async def test_error_handling(client):
         "/hyperstition/analyze",
         json={"invalid_field": "texto mal formado"}
     )
-    
+
     assert response.status_code == 422
     assert "detail" in response.json()
 
+
 @pytest.mark.asyncio
 async def test_empty_input(client):
     """Prueba el comportamiento con texto vacío"""
@@ -78,6 +108,201 @@ async def test_empty_input(client):
         "/hyperstition/analyze",
         json={"text": ""}
     )
-    
+
     assert response.status_code == 400
-    assert "text" in response.json()["detail"].lower()
\ No newline at end of file
+    assert "texto" in response.json()["detail"].lower()
+
+
+def ndjson(*rows):
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows) + "\n"
+
+
+@pytest.mark.asyncio
+async def test_stream_keeps_ids_and_reports_bad_lines(client, monkeypatch):
+    """Cada resultado sale con su id según termina; las líneas inválidas no cortan el stream"""
+    async def fake_analyze(text, layers=None):
+        await asyncio.sleep(0.1 if text.startswith("lento") else 0)
+        return {"echo": text}
+
+    monkeypatch.setattr(hyperstition, "analyze_with_cache", fake_analyze)
+    body = ndjson(
+        {"id": "a", "text": "lento: primer texto del corpus"},
+        {"id": "b", "text": "rápido: segundo texto del corpus"},
+        "{no es json",
+        {"id": "c", "text": 42},
+        {"id": "d", "text": "corto"},
+    )
+    response = await client.post(
+        "/hyperstition/analyze/stream", content=body,
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    by_id = {line["id"]: line for line in lines}
+    assert by_id["a"]["result"] == {"echo": "lento: primer texto del corpus"}
+    assert by_id["b"]["result"] == {"echo": "rápido: segundo texto del corpus"}
+    assert [line["id"] for line in lines if "result" in line] == ["b", "a"]
+    assert by_id[None]["line"] == 3 and "JSON inválido" in by_id[None]["error"]
+    assert "cadena" in by_id["c"]["error"]
+    assert "mínimo" in by_id["d"]["error"]
+
+
+@pytest.mark.asyncio
+async def test_stream_waits_when_pool_is_saturated(client, monkeypatch):
+    """Un pool saturado retrasa el ítem en lugar de convertirlo en error"""
+    attempts = []
+
+    async def saturated_once(text, layers=None):
+        attempts.append(text)
+        if len(attempts) == 1:
+            raise PoolSaturatedError(0)
+        return {"echo": text}
+
+    monkeypatch.setattr(hyperstition, "analyze_with_cache", saturated_once)
+    response = await client.post(
+        "/hyperstition/analyze/stream",
+        content=ndjson({"id": 1, "text": "texto con el pool lleno"}),
+        headers={"Content-Type": "application/x-ndjson"}
+    )
+
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"id": 1, "result": {"echo": "texto con el pool lleno"}}
+    ]
+    assert len(attempts) == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_isolates_item_errors(client):
+    """Un texto inválido no hace fallar al resto del lote"""
+    response = await client.post(
+        "/hyperstition/analyze/batch",
+        json={"texts": [TEST_TEXT, "corto"], "layers": ["risk_level"]}
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["processed"], data["failed"]) == (1, 1)
+    ok, failed = data["results"]
+    assert ok["index"] == 0 and ok["result"]["risk_level"] and ok["error"] is None
+    assert failed["index"] == 1 and failed["result"] is None and "mínimo" in failed["error"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("options", [
+    {"n_process": settings.NLP_MAX_N_PROCESS + 1},
+    {"n_process": 0},
+    {"batch_size": 0},
+])
+async def test_batch_rejects_invalid_options(client, options):
+    """n_process está acotado por NLP_MAX_N_PROCESS y batch_size debe ser positivo"""
+    response = await client.post(
+        "/hyperstition/analyze/batch", json={"texts": [TEST_TEXT], **options}
+    )
+
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_batch_size_limit(client, monkeypatch):
+    """Los lotes por encima de NLP_BATCH_MAX_ITEMS se rechazan con 413"""
+    monkeypatch.setattr(settings, "NLP_BATCH_MAX_ITEMS", 2)
+    response = await client.post(
+        "/hyperstition/analyze/batch", json={"texts": [TEST_TEXT] * 3}
+    )
+
+    assert response.status_code == 413
+    assert "2" in response.json()["detail"]
+
+
+def stream_scope(spec_version):
+    """Petición ASGI directa a /analyze/stream (pasa por todos los middlewares)."""
+    path = "/hyperstition/analyze/stream"
+    return {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": spec_version},
+        "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+        "headers": [(b"host", b"test"), (b"user-agent", b"curl/8.0"),
+                    (b"content-type", b"application/x-ndjson")],
+        "client": ("127.0.0.1", 50000), "server": ("test", 80),
+    }
+
+
+def cancellable_analysis(monkeypatch):
+    cancelled = []
+
+    async def analyze(text, layers=None):
+        try:
+            await asyncio.sleep(30 if text.startswith("lento") else 0)
+        except asyncio.CancelledError:
+            cancelled.append(text)
+            raise
+        return {"echo": text}
+
+    monkeypatch.setattr(hyperstition, "analyze_with_cache", analyze)
+    return cancelled
+
+
+@pytest.mark.asyncio
+async def test_stream_stops_when_client_disconnects_while_sending(monkeypatch):
+    """Desconexión a mitad del cuerpo: se cancelan los análisis en vuelo"""
+    cancelled = cancellable_analysis(monkeypatch)
+    messages = [{
+        "type": "http.request",
+        "body": ndjson({"id": 1, "text": "lento: texto que no llega a terminar"}).encode(),
+        "more_body": True,
+    }]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(0.05)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        pass
+
+    with pytest.raises(ClientDisconnect):
+        await asyncio.wait_for(app(stream_scope("2.3"), receive, send), 5)
+    assert cancelled == ["lento: texto que no llega a terminar"]
+
+
+@pytest.mark.asyncio
+async def test_stream_stops_when_client_stops_reading(monkeypatch):
+    """Fallo al escribir la respuesta: el stream termina y no sigue analizando"""
+    cancelled = cancellable_analysis(monkeypatch)
+    messages = [{
+        "type": "http.request",
+        "body": ndjson(
+            {"id": 1, "text": "rápido: primer texto del corpus"},
+            {"id": 2, "text": "lento: segundo texto del corpus"},
+        ).encode(),
+        "more_body": False,
+    }]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            raise OSError("Broken pipe")
+
+    with pytest.raises((OSError, ClientDisconnect)):
+        await asyncio.wait_for(app(stream_scope("2.4"), receive, send), 5)
+    assert cancelled == ["lento: segundo texto del corpus"]
+
+
+@pytest.mark.asyncio
+async def test_duplex_response_maps_send_errors_to_client_disconnect():
+    async def rows():
+        yield "{}\n"
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            raise OSError("Broken pipe")
+
+    response = hyperstition.DuplexStreamingResponse(rows(), media_type="application/x-ndjson")
+    with pytest.raises(ClientDisconnect):
+        await response(stream_scope("2.4"), None, send)
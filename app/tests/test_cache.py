@@ -0,0 +1,77 @@
+import pytest
+import pytest_asyncio
+from fakeredis import aioredis as fake_aioredis
+
+from app.services.cache import AnalysisCache, RedisCache
+
+
+def make_cache(**kwargs):
+    # Backend sin inicializar: sólo se usa el LRU local
+    return AnalysisCache(RedisCache("localhost", 6379), **kwargs)
+
+
+@pytest_asyncio.fixture
+async def fake_redis():
+    backend = RedisCache("localhost", 6379)
+    await backend.initialize(client=fake_aioredis.FakeRedis(decode_responses=True))
+    yield backend
+    await backend.close()
+
+
+def test_key_depends_on_text_and_versions():
+    cache = make_cache()
+    text = cache.normalize("  El colapso\tes   inminente \n")
+    assert text == "El colapso es inminente"
+    assert cache.make_key(text, "2.2", "1.0") == cache.make_key(text, "2.2", "1.0")
+    assert cache.make_key(text, "2.2", "1.0") != cache.make_key(text, "2.2", "1.1")
+    assert cache.make_key(text, "2.2", "1.0") != cache.make_key(text + ".", "2.2", "1.0")
+
+
+@pytest.mark.asyncio
+async def test_lru_hits_misses_and_eviction():
+    cache = make_cache(max_entries=2)
+    assert await cache.get("a") is None
+
+    await cache.set("a", {"value": 1})
+    await cache.set("b", {"value": 2})
+    assert await cache.get("a") == {"value": 1}
+
+    await cache.set("c", {"value": 3})  # expulsa "b", el menos reciente
+    assert await cache.get("b") is None
+    assert await cache.get("c") == {"value": 3}
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["local_entries"] == 2
+
+
+@pytest.mark.asyncio
+async def test_disabled_cache_never_stores():
+    cache = make_cache(enabled=False)
+    await cache.set("a", {"value": 1})
+    assert await cache.get("a") is None
+
+
+@pytest.mark.asyncio
+async def test_redis_backend_roundtrip(fake_redis):
+    assert await fake_redis.ping() is True
+
+    await fake_redis.mset({"a": "1", "b": "2"}, ttl=60)
+    assert await fake_redis.mget(["a", "x", "b"]) == ["1", None, "2"]
+    assert await fake_redis.client.ttl("a") > 0
+
+
+@pytest.mark.asyncio
+async def test_batch_helpers_use_redis_tier(fake_redis):
+    writer = AnalysisCache(fake_redis)
+    await writer.set_many({"k1": {"value": 1}, "k2": {"value": 2}})
+
+    # Un proceso distinto (LRU vacío) encuentra los valores en Redis
+    reader = AnalysisCache(fake_redis)
+    assert await reader.get_many(["k1", "k3", "k2"]) == [{"value": 1}, None, {"value": 2}]
+    assert reader.stats()["redis_hits"] == 2
+    assert reader.stats()["misses"] == 1
+
+    assert await reader.get("k1") == {"value": 1}
+    assert reader.stats()["memory_hits"] == 1
@@ -0,0 +1,75 @@
+import json
+import os
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.config.settings import settings
+from app.main import app
+from app.services import pipeline
+from app.services.reloader import FileWatcher
+
+
+def write_dictionary(path, terms, version="1.0"):
+    path.write_text(json.dumps({
+        "categorias": {"tecno": terms},
+        "metadatos": {"version": version, "pesos_analiticos": {"tecno": 0.5}},
+    }), encoding="utf-8")
+
+
+@pytest.fixture
+def dictionary(tmp_path, monkeypatch):
+    path = tmp_path / "hyperstition_terms.json"
+    write_dictionary(path, ["algocracia"])
+    monkeypatch.setattr(pipeline, "_resources", None)
+    pipeline.reload_resources(path)
+    return path
+
+
+def test_reload_swaps_without_mixing_versions(dictionary):
+    ctx = pipeline.AnalysisContext("La algocracia y el neurocapitalismo avanzan juntos.")
+    old = ctx.resources
+    key = pipeline.analysis_cache_key("texto")
+
+    # Mismo número de versión, contenido distinto: la huella lo distingue
+    write_dictionary(dictionary, ["algocracia", "neurocapitalismo"])
+    fresh, changed = pipeline.reload_resources(dictionary)
+
+    assert changed and fresh is pipeline.get_resources()
+    assert fresh.version == old.version and fresh.fingerprint != old.fingerprint
+    assert pipeline.analysis_cache_key("texto") != key
+    # El contexto ya creado sigue con el diccionario con el que empezó
+    assert pipeline.detect_hyperstition_terms(ctx) == {"tecno": ["algocracia"]}
+    assert pipeline.reload_resources(dictionary) == (fresh, False)
+
+
+def test_invalid_dictionary_keeps_active_version(dictionary):
+    active = pipeline.get_resources()
+    dictionary.write_text(json.dumps({"categorias": {"tecno": ["x"]}, "metadatos": {}}))
+
+    with pytest.raises(ValueError):
+        pipeline.reload_resources(dictionary)
+    assert pipeline.get_resources() is active
+
+
+def test_watcher_fires_on_mtime_change(tmp_path):
+    path = tmp_path / "dict.json"
+    path.write_text("{}")
+    calls = []
+    watcher = FileWatcher(path, lambda: calls.append(1), interval=60)
+    watcher._mtime = os.stat(path).st_mtime
+
+    assert not watcher.check()
+    os.utime(path, (0, os.stat(path).st_mtime + 1))
+    assert watcher.check() and calls == [1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("headers", [{}, {"X-Admin-Token": "incorrecto"}, {"X-Admin-Token": "contraseña".encode("latin-1")}])
+async def test_reload_requires_admin_token(monkeypatch, headers):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secreto")
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test", headers={"User-Agent": "curl/8.0"}) as ac:
+        response = await ac.post("/hyperstition/dictionary/reload", headers=headers)
+
+    assert response.status_code == 403
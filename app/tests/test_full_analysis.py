@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.services.analysis import NEUTRAL_NETWORK, NEUTRAL_SYNTAX, CognitiveIntegrator, Layer, run_layers
+
+TEST_TEXT = "Nosotros sabemos la verdad. Ellos controlan el colapso geopolítico mediante algoritmos."
+
+
+def sleeper(seconds, value):
+    async def run(inputs):
+        await asyncio.sleep(seconds)
+        return value
+    return run
+
+
+@pytest.mark.asyncio
+async def test_independent_layers_run_concurrently():
+    started = time.perf_counter()
+    results, statuses = await run_layers({
+        "a": Layer("a", sleeper(0.2, 1), lambda: 0),
+        "b": Layer("b", sleeper(0.2, 2), lambda: 0),
+        "c": Layer("c", lambda inputs: sleeper(0, inputs["a"] + inputs["b"])(inputs), lambda: 0,
+                   depends_on=("a", "b")),
+    })
+    elapsed = time.perf_counter() - started
+
+    assert results == {"a": 1, "b": 2, "c": 3}
+    assert {s.status for s in statuses.values()} == {"ok"}
+    assert elapsed < 0.35
+
+
+@pytest.mark.asyncio
+async def test_slow_or_failing_layers_degrade():
+    async def boom(inputs):
+        raise RuntimeError("sin conexión")
+
+    results, statuses = await run_layers({
+        "slow": Layer("slow", sleeper(1, "tarde"), lambda: "neutro", timeout=0.05),
+        "broken": Layer("broken", boom, lambda: "neutro"),
+        "after": Layer("after", lambda inputs: sleeper(0, inputs["slow"])(inputs), lambda: None,
+                       depends_on=("slow",)),
+    })
+
+    assert results == {"slow": "neutro", "broken": "neutro", "after": "neutro"}
+    assert statuses["slow"].status == "timeout"
+    assert statuses["broken"].status == "error"
+    assert statuses["broken"].detail == "sin conexión"
+    assert statuses["after"].status == "ok"
+
+
+def test_fuse_layers_with_degraded_inputs():
+    output = CognitiveIntegrator().fuse_layers({}, dict(NEUTRAL_SYNTAX), dict(NEUTRAL_NETWORK))
+
+    assert output.cognitive_profile == {"score": 0.0, "risk_category": "Bajo"}
+    assert output.discourse_style == "indeterminado"
+    assert output.risk_profile["semantic"] == "N/A"
+
+
+@pytest_asyncio.fixture
+async def client():
+    transport = ASGITransport(app=app)
+    headers = {"User-Agent": "curl/8.0"}
+    async with AsyncClient(transport=transport, base_url="http://test", headers=headers) as ac:
+        yield ac
+
+
+@pytest.mark.asyncio
+async def test_analysis_endpoint_fuses_all_layers(client):
+    response = await client.post("/analysis/", json={"text": TEST_TEXT})
+
+    assert response.status_code == 200
+    data = response.json()["data"]
+    assert set(data["layers"]) == {"semantic", "syntactic", "network", "psychoaffective"}
+    assert all(layer["status"] == "ok" for layer in data["layers"].values())
+    assert data["psychoaffective"]["group_framing"] == "nosotros-ellos"
+    assert data["syntax"]["sentence_types"]["declarative"] == 2
+    assert data["network"]["available"] is False
+    assert data["risk_profile"]["cognitive"] in {"Bajo", "Moderado", "Alto"}
+
+
+@pytest.mark.asyncio
+async def test_analysis_endpoint_rejects_short_text(client):
+    response = await client.post("/analysis/", json={"text": "corto"})
+
+    assert response.status_code == 400
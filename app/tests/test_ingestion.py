@@ -0,0 +1,70 @@
+import pytest
+
+from app.models import NodeCreate
+from app.services.ingestion import bulk_write
+
+
+class FakeResult:
+    def __init__(self, written):
+        self.written = written
+
+    async def single(self):
+        return {"written": self.written}
+
+
+class FakeTx:
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, query, rows):
+        self.session.calls += 1
+        if self.session.fail_on == self.session.calls:
+            raise RuntimeError("deadlock")
+        self.session.batches.append(rows)
+        return FakeResult(len(rows))
+
+
+class FakeSession:
+    """Sesión Neo4j mínima: registra los lotes enviados a cada transacción."""
+
+    def __init__(self, fail_on=None):
+        self.batches = []
+        self.calls = 0
+        self.fail_on = fail_on
+
+    async def execute_write(self, fn, *args):
+        return await fn(FakeTx(self), *args)
+
+
+async def rows(items):
+    for item in items:
+        yield item
+
+
+def node(i):
+    return {"id": f"n{i}", "name": f"Nodo {i}", "type": "User"}
+
+
+@pytest.mark.asyncio
+async def test_rows_are_chunked_into_transactions():
+    session = FakeSession()
+    report = await bulk_write(session, "UNWIND $rows AS row", rows([node(i) for i in range(5)]), NodeCreate, 2)
+
+    assert [len(batch) for batch in session.batches] == [2, 2, 1]
+    assert report["total_received"] == 5
+    assert report["total_written"] == 5
+    assert report["failed_chunks"] == 0
+
+
+@pytest.mark.asyncio
+async def test_invalid_rows_and_failed_chunks_are_reported():
+    session = FakeSession(fail_on=2)
+    items = [node(0), {"id": "sin-nombre"}, ValueError("JSON inválido"), node(3), node(4)]
+    report = await bulk_write(session, "UNWIND $rows AS row", rows(items), NodeCreate, 2)
+
+    first, second, third = report["chunks"]
+    assert (first["written"], first["invalid"], len(first["errors"])) == (1, 1, 1)
+    assert second["failed"] and second["written"] == 0 and second["invalid"] == 1
+    assert third["written"] == 1
+    assert report["total_invalid"] == 2
+    assert report["failed_chunks"] == 1
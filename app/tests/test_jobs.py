@@ -0,0 +1,243 @@
+import json
+
+import fakeredis.aioredis
+import pytest
+import redis.asyncio.client
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.services.jobs import JobRunner, MemoryJobStore, RedisJobStore, new_job
+
+TEXTS = [f"El colapso geopolítico número {i} acelera la algocracia." for i in range(5)]
+LAYERS = frozenset({"risk_level"})  # Sin parseo spaCy
+
+
+@pytest_asyncio.fixture(params=["redis", "memory"])
+async def store(request):
+    if request.param == "memory":
+        yield MemoryJobStore()
+        return
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    yield RedisJobStore(client)
+    await client.aclose()
+
+
+def runner_with(store, chunk_size=2):
+    runner = JobRunner(chunk_size=chunk_size, lease=60)
+    runner.start(store, consume=False)
+    return runner
+
+
+@pytest.mark.asyncio
+async def test_job_is_processed_in_checkpointed_chunks(store):
+    runner = runner_with(store)
+    job = await runner.submit_texts(TEXTS + [""], LAYERS)
+
+    claimed = await store.claim("w1", 60)
+    await runner.process(claimed, "w1")
+
+    done = await store.get(job["id"])
+    assert (done["status"], done["processed"], done["failed"]) == ("completed", 6, 1)
+    results = await store.results(job["id"], 0, 100)
+    assert [r["index"] for r in results] == list(range(6))
+    assert results[0]["result"]["risk_level"] in {"Bajo", "Moderado", "Alto"}
+    assert "error" in results[5]
+
+
+@pytest.mark.asyncio
+async def test_expired_job_resumes_from_checkpoint(store, monkeypatch):
+    runner = runner_with(store)
+    job = await runner.submit_texts(TEXTS, LAYERS)
+
+    # Un trabajador guarda el primer trozo y muere sin renovar el lease
+    await store.claim("muerto", 0)
+    first = [{"index": i, "result": {"risk_level": "previo"}} for i in range(2)]
+    assert await store.checkpoint(job["id"], "muerto", first, 0, lease=0)
+
+    assert await store.requeue_expired() == [job["id"]]
+    seen = []
+    original = runner._analyze
+
+    async def tracking(texts, layers):
+        seen.extend(texts)
+        return await original(texts, layers)
+
+    monkeypatch.setattr(runner, "_analyze", tracking)
+    resumed = await store.claim("w2", 60)
+    assert resumed["processed"] == 2
+    await runner.process(resumed, "w2")
+
+    assert seen == TEXTS[2:]
+    results = await store.results(job["id"], 0, 100)
+    assert [r["index"] for r in results] == list(range(5))
+    assert results[0]["result"]["risk_level"] == "previo"
+
+    # El trabajador caducado ya no puede escribir
+    assert not await store.checkpoint(job["id"], "muerto", first, 0, lease=60)
+
+
+@pytest.mark.asyncio
+async def test_expired_worker_cannot_finish(store):
+    runner = runner_with(store)
+    job = await runner.submit_texts(TEXTS, LAYERS)
+
+    await store.claim("lento", 0)
+    assert await store.requeue_expired() == [job["id"]]
+    await store.claim("w2", 60)
+
+    # El trabajador caducado no cierra el trabajo que ahora es de otro
+    assert not await store.finish(job["id"], "lento", "failed", "tarde")
+    current = await store.get(job["id"])
+    assert (current["status"], current["worker"]) == ("running", "w2")
+    assert await store.inputs(job["id"], 0, 100) == TEXTS
+
+    assert await store.finish(job["id"], "w2", "completed")
+    assert (await store.get(job["id"]))["status"] == "completed"
+
+
+@pytest.mark.asyncio
+async def test_memory_store_evicts_finished_jobs_after_ttl():
+    store = MemoryJobStore(ttl=60)
+    runner = runner_with(store)
+    finished = await runner.submit_texts(TEXTS, LAYERS)
+    await store.claim("w1", 60)
+    await store.checkpoint(finished["id"], "w1", [{"index": 0}], 0, lease=60)
+    await store.finish(finished["id"], "w1", "completed")
+    pending = await runner.submit_texts(TEXTS, LAYERS)
+
+    await store.requeue_expired()
+    assert await store.get(finished["id"]) is not None
+
+    store.jobs[finished["id"]]["updated_at"] -= 61
+    store.jobs[pending["id"]]["updated_at"] -= 61
+    await store.requeue_expired()
+
+    assert await store.get(finished["id"]) is None
+    assert await store.results(finished["id"], 0, 100) == []
+    assert finished["id"] not in store._results
+    assert await store.get(pending["id"]) is not None
+
+
+@pytest_asyncio.fixture
+async def redis_store():
+    client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    yield RedisJobStore(client)
+    await client.aclose()
+
+
+def fail_next_exec(monkeypatch):
+    """El siguiente EXEC falla como si el proceso muriera antes de enviarlo."""
+    execute = redis.asyncio.client.Pipeline.execute
+    calls = []
+
+    async def crash(self, *args, **kwargs):
+        if not calls:
+            calls.append(1)
+            raise ConnectionError("proceso caído")
+        return await execute(self, *args, **kwargs)
+
+    monkeypatch.setattr(redis.asyncio.client.Pipeline, "execute", crash)
+
+
+@pytest.mark.asyncio
+async def test_claim_is_atomic(redis_store, monkeypatch):
+    job = new_job("inline", 1, LAYERS)
+    await redis_store.create(job, ["texto"])
+
+    fail_next_exec(monkeypatch)
+    with pytest.raises(ConnectionError):
+        await redis_store.claim("muerto", 60)
+
+    client = redis_store.client
+    assert await client.lrange(RedisJobStore.QUEUE, 0, -1) == [job["id"]]
+    assert await client.zcard(RedisJobStore.RUNNING) == 0
+    assert (await redis_store.claim("w1", 60))["worker"] == "w1"
+    assert await redis_store.claim("w2", 60) is None
+
+
+@pytest.mark.asyncio
+async def test_requeue_is_atomic(redis_store, monkeypatch):
+    job = new_job("inline", 1, LAYERS)
+    await redis_store.create(job, ["texto"])
+    await redis_store.claim("muerto", 0)
+
+    fail_next_exec(monkeypatch)
+    with pytest.raises(ConnectionError):
+        await redis_store.requeue_expired()
+
+    client = redis_store.client
+    assert await client.zrange(RedisJobStore.RUNNING, 0, -1) == [job["id"]]
+    assert await client.llen(RedisJobStore.QUEUE) == 0
+    assert await redis_store.requeue_expired() == [job["id"]]
+    assert await redis_store.requeue_expired() == []
+    assert await client.lrange(RedisJobStore.QUEUE, 0, -1) == [job["id"]]
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_during_requeue_keeps_worker(redis_store, monkeypatch):
+    job = new_job("inline", 1, LAYERS)
+    await redis_store.create(job, ["texto"])
+    await redis_store.claim("w1", 0)
+    zscore = redis.asyncio.client.Pipeline.zscore
+
+    async def late_checkpoint(self, *args):
+        # El trabajador guarda su checkpoint justo después de leerse el lease caducado
+        until = await zscore(self, *args)
+        assert await redis_store.checkpoint(job["id"], "w1", [{"index": 0}], 0, lease=60)
+        return until
+
+    monkeypatch.setattr(redis.asyncio.client.Pipeline, "zscore", late_checkpoint)
+    assert await redis_store.requeue_expired() == []
+    assert (await redis_store.get(job["id"]))["worker"] == "w1"
+    assert await redis_store.client.llen(RedisJobStore.QUEUE) == 0
+
+
+@pytest.mark.asyncio
+async def test_file_corpus_keeps_line_indices(store, tmp_path):
+    corpus = tmp_path / "posts.ndjson"
+    corpus.write_text(
+        "\n".join([json.dumps({"text": TEXTS[0]}), "{roto", json.dumps({"text": TEXTS[1]})]),
+        encoding="utf-8",
+    )
+    runner = JobRunner(chunk_size=2, corpus_dir=str(tmp_path))
+    runner.start(store, consume=False)
+
+    job = await runner.submit_file("posts.ndjson", LAYERS)
+    assert job["total"] == 3
+    await runner.process(await store.claim("w1", 60), "w1")
+
+    results = await store.results(job["id"], 0, 10)
+    assert ["result" in r for r in results] == [True, False, True]
+
+    with pytest.raises(ValueError):
+        await runner.submit_file("../posts.ndjson")
+
+
+@pytest.mark.asyncio
+async def test_job_endpoints(monkeypatch):
+    runner = JobRunner(chunk_size=2)
+    runner.start(MemoryJobStore(), consume=False)
+    monkeypatch.setattr("app.routers.analyze.analysis_jobs", runner)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test", headers={"User-Agent": "curl/8.0"}) as ac:
+        response = await ac.post("/analysis/jobs", json={"texts": TEXTS, "layers": ["risk_level"]})
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert response.json()["status"] == "queued"
+
+        await runner.process(await runner.store.claim("w1", 60), "w1")
+
+        status = (await ac.get(f"/analysis/jobs/{job_id}")).json()
+        assert (status["status"], status["progress"]) == ("completed", 1.0)
+
+        page = (await ac.get(f"/analysis/jobs/{job_id}/results?offset=0&limit=3")).json()
+        assert [item["index"] for item in page["items"]] == [0, 1, 2]
+        assert page["next_offset"] == 3
+        last = (await ac.get(f"/analysis/jobs/{job_id}/results?offset=3&limit=3")).json()
+        assert last["next_offset"] is None
+
+        assert (await ac.get("/analysis/jobs/no-existe")).status_code == 404
+        both = await ac.post("/analysis/jobs", json={"texts": TEXTS, "path": "x.ndjson"})
+        assert both.status_code == 400
@@ -0,0 +1,86 @@
+import random
+
+import spacy
+
+from app.services.pipeline import (
+    AnalysisContext,
+    analyze_linguistic_complexity,
+    analyze_referential,
+    analyze_text,
+    nlp_pipeline,
+    run_batch_analysis,
+)
+from app.services.syllables import count_syllables
+
+nlp = spacy.blank("es")
+nlp.add_pipe("sentencizer")
+
+WORDS = ["yo", "Yo,", "nosotros", "ellos.", "su", "según", "expertos", "la", "algocracia",
+         "neurocapitalismo", "¿acaso?", "¡Colapso!", "mí", "geopolítico", "y", "\n\n"]
+
+
+def naive_complexity(doc):
+    words = [t.text for t in doc if not t.is_punct and not t.is_space]
+    sents = list(doc.sents)
+    syllables = sum(count_syllables(w) for w in words)
+    return {
+        "avg_sentence_length": round(len(words) / len(sents), 2) if sents else 0,
+        "avg_syllables_per_word": round(syllables / len(words), 2) if words else 0,
+        "long_word_ratio": round(len([w for w in words if len(w) > 7]) / len(words), 2) if words else 0,
+    }
+
+
+def test_referential_ignores_attached_punctuation():
+    doc = nlp("Yo, nosotros y ellos.")
+    result = analyze_referential(AnalysisContext(doc.text, doc=doc))
+
+    assert result == {"yo": 0.25, "nosotros": 0.25, "ellos": 0.25, "neutro": 0.0}
+
+
+def test_lexical_stats_match_token_walk():
+    rng = random.Random(3)
+    for _ in range(100):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 40)))
+        doc = nlp(text)
+        ctx = AnalysisContext(text, doc=doc)
+        assert analyze_linguistic_complexity(ctx) == naive_complexity(doc)
+
+
+def test_batch_tokenizer_only_layers_skip_pipeline(monkeypatch):
+    calls = []
+    parse, pipe = nlp_pipeline.parse, nlp_pipeline.pipe
+
+    def spy_parse(text, components=None):
+        calls.append(("parse", components))
+        return parse(text, components)
+
+    def spy_pipe(texts, components=None, **kwargs):
+        calls.append(("pipe", components))
+        return pipe(texts, components, **kwargs)
+
+    monkeypatch.setattr(nlp_pipeline, "parse", spy_parse)
+    monkeypatch.setattr(nlp_pipeline, "pipe", spy_pipe)
+    items = run_batch_analysis(
+        ["Nosotros sabemos que ellos mienten.", "Yo digo lo que dicen los expertos."],
+        layers=frozenset({"referential_analysis", "semantic_expansion"}),
+    )
+
+    assert all("result" in item for item in items)
+    assert items[0]["result"]["referential_analysis"]["nosotros"] > 0
+    assert calls and all(components == frozenset() for _, components in calls)
+
+
+def test_all_layers_share_one_parse(monkeypatch):
+    calls = []
+    parse = nlp_pipeline.parse
+
+    def spy_parse(text, components=None):
+        calls.append(text)
+        return parse(text, components)
+
+    monkeypatch.setattr(nlp_pipeline, "parse", spy_parse)
+    text = "Nosotros sabemos la verdad. Ellos controlan el colapso geopolítico."
+    result, _ = analyze_text(text)
+
+    assert calls == [text]
+    assert {"linguistic_complexity", "referential_analysis", "syntactic_analysis"} <= set(result)
@@ -0,0 +1,43 @@
+from prometheus_client import REGISTRY, CollectorRegistry, generate_latest
+
+from app.services.pipeline import AnalysisContext, run_analysis
+from app.services.metrics import STAGES, StageTimer, StatsCollector, server_timing_header
+
+
+def test_stage_timer_accumulates_and_formats_header():
+    timer = StageTimer()
+    timer.add("spacy_parse", 0.002)
+    timer.add("spacy_parse", 0.003)
+    with timer.stage("syntactic"):
+        pass
+
+    assert timer.durations["spacy_parse"] == 0.005
+    header = server_timing_header(0.01, timer.durations)
+    assert header.startswith("total;dur=10.00, spacy_parse;dur=5.00, syntactic;dur=")
+
+
+def test_run_analysis_times_requested_layers_only():
+    ctx = AnalysisContext("Un texto sin términos del diccionario.", components=frozenset())
+    run_analysis(ctx, frozenset({"detected_terms", "cognitive_profile"}))
+
+    assert set(ctx.timer.durations) == {"term_detection", "cognitive"}
+
+
+def test_stats_collector_exports_counters_and_gauges():
+    registry = CollectorRegistry()
+    registry.register(StatsCollector(
+        {"cache": lambda: {"misses": 3, "entries": 2, "mode": "thread"}},
+        counters=("cache_misses",)
+    ))
+    body = generate_latest(registry).decode()
+
+    assert "cache_misses_total 3.0" in body
+    assert "cache_entries 2.0" in body
+    assert "mode" not in body
+
+
+def test_stage_series_exist_before_first_observation():
+    for stage in STAGES:
+        assert REGISTRY.get_sample_value(
+            "analysis_stage_duration_seconds_count", {"stage": stage}
+        ) is not None
@@ -0,0 +1,94 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from neo4j.exceptions import ConstraintError
+
+from app.main import app
+from app.services import database
+from app.services.database import get_session, init_db
+
+
+class FakeResult:
+    def __init__(self, record):
+        self.record = record
+
+    async def single(self):
+        return self.record
+
+
+class FakeTx:
+    def __init__(self, session):
+        self.session = session
+
+    async def run(self, query, **params):
+        self.session.queries.append(query)
+        if "copies > 1" in query:
+            duplicated = self.session.duplicated
+            return FakeResult({"duplicated": len(duplicated), "sample": duplicated})
+        if "CREATE (n:Node" in query and self.session.duplicated:
+            raise ConstraintError("Node already exists with label `Node` and property `id`")
+        return FakeResult(None)
+
+
+class FakeSession:
+    """Sesión Neo4j mínima: registra consultas; `duplicated` simula ids repetidos."""
+
+    def __init__(self, duplicated=()):
+        self.queries = []
+        self.duplicated = list(duplicated)
+
+    async def execute_write(self, fn, *args):
+        return await fn(FakeTx(self), *args)
+
+    execute_read = execute_write
+
+
+def use_session(monkeypatch, session):
+    @asynccontextmanager
+    async def open_session():
+        yield session
+
+    monkeypatch.setattr(database, "open_session", open_session)
+
+
+def node_constraint(session):
+    return [q for q in session.queries if "(n:Node) REQUIRE n.id IS UNIQUE" in q]
+
+
+@pytest.mark.asyncio
+async def test_node_id_constraint_created_on_clean_graph(monkeypatch):
+    session = FakeSession()
+    use_session(monkeypatch, session)
+
+    await init_db()
+
+    assert len(node_constraint(session)) == 1
+
+
+@pytest.mark.asyncio
+async def test_duplicate_node_ids_skip_constraint_without_failing(monkeypatch):
+    session = FakeSession(duplicated=["n1"])
+    use_session(monkeypatch, session)
+
+    await init_db()
+
+    assert node_constraint(session) == []
+    assert any("(u:User) REQUIRE u.id IS UNIQUE" in q for q in session.queries)
+
+
+@pytest.mark.asyncio
+async def test_create_node_conflict_returns_409():
+    async def conflicting_session():
+        yield FakeSession(duplicated=["n1"])
+
+    app.dependency_overrides[get_session] = conflicting_session
+    try:
+        transport = ASGITransport(app=app)
+        async with AsyncClient(transport=transport, base_url="http://test", headers={"User-Agent": "curl/8.0"}) as ac:
+            response = await ac.post("/nodes/", json={"id": "n1", "name": "Nodo"})
+    finally:
+        app.dependency_overrides.pop(get_session, None)
+
+    assert response.status_code == 409
+    assert "ya existe" in response.json()["detail"]
@@ -0,0 +1,138 @@
+from contextlib import asynccontextmanager
+
+import fakeredis.aioredis
+import pytest
+import pytest_asyncio
+
+from app.services import network
+from app.services.cache import RedisCache
+from app.services.network import NetworkAnalyzer, amplification_risk
+
+
+class FakeRecord(dict):
+    def data(self):
+        return dict(self)
+
+
+class FakeTx:
+    def __init__(self, graph):
+        self.graph = graph
+
+    async def run(self, query, **params):
+        self.graph.queries.append(query)
+        self.record = self.graph.answer(query, params)
+        return self
+
+    async def single(self):
+        return self.record
+
+
+class FakeGraph:
+    """Grafo mínimo: un usuario con agregados obsoletos."""
+
+    def __init__(self):
+        self.queries = []
+        self.props = {"id": "u1", "net_stale": True}
+
+    def answer(self, query, params):
+        if "AS stale" in query:
+            return FakeRecord(stale=self.props.get("net_stale", True))
+        if "properties(n)" in query:
+            return FakeRecord(props=dict(self.props)) if params["id"] == "u1" else None
+        if "SET n.net_stale = true" in query:
+            self.props["net_stale"] = True
+            return FakeRecord(ids=["u1"])
+        metrics = {"reach": 40, "followers": 10, "following": 3, "posts": 2}
+        self.props.update({f"net_{k}": v for k, v in metrics.items()}, net_stale=False)
+        return FakeRecord(metrics)
+
+    async def execute_read(self, fn):
+        return await fn(FakeTx(self))
+
+    execute_write = execute_read
+
+
+@pytest_asyncio.fixture
+async def analyzer(monkeypatch):
+    graph = FakeGraph()
+
+    @asynccontextmanager
+    async def open_session():
+        yield graph
+
+    monkeypatch.setattr(network, "open_session", open_session)
+    cache = RedisCache("localhost", 6379)
+    await cache.initialize(client=fakeredis.aioredis.FakeRedis(decode_responses=True))
+    yield NetworkAnalyzer(cache, max_depth=2, ttl=60), graph
+    await cache.close()
+
+
+def test_amplification_risk_uses_available_layers():
+    assert amplification_risk(None, None) == 0.0
+    assert amplification_risk(None, {"cascade_size": 100}) == 0.5
+    user = {"reach": 1000, "followers": 500}
+    assert amplification_risk(user, None) == 0.5
+    assert 0.0 < amplification_risk(user, {"cascade_size": 0}) < 0.5
+
+
+@pytest.mark.asyncio
+async def test_metrics_are_recomputed_once_then_served_from_cache(analyzer):
+    analyzer, graph = analyzer
+
+    first = await analyzer.metrics("user", "u1")
+    recomputes = sum("FOLLOWS*1..2" in q for q in graph.queries)
+    second = await analyzer.metrics("user", "u1")
+
+    assert first == second == {"reach": 40, "followers": 10, "following": 3, "posts": 2}
+    assert recomputes == 1
+    assert sum("FOLLOWS*1..2" in q for q in graph.queries) == 1
+    assert await analyzer.metrics("user", "desconocido") is None
+
+
+@pytest.mark.asyncio
+async def test_new_relations_invalidate_cached_aggregates(analyzer):
+    analyzer, graph = analyzer
+    await analyzer.metrics("user", "u1")
+
+    affected = await analyzer.invalidate(graph, "user", ["u1"], touched=["u0"])
+
+    assert affected == ["u1"]
+    assert await analyzer.cache.get(analyzer.cache_key("user", "u1")) is None
+    await analyzer.metrics("user", "u1")
+    assert sum("FOLLOWS*1..2" in q for q in graph.queries) == 2
+
+
+@pytest.mark.asyncio
+async def test_posted_edges_invalidate_author_and_cascades(analyzer):
+    analyzer, graph = analyzer
+    await analyzer.metrics("user", "u1")
+
+    rows = [{"post_id": "p1", "user_id": "u1"}, {"post_id": "p2", "user_id": None}]
+    await analyzer.invalidate_posted(graph, rows)
+
+    posted = [q for q in graph.queries if "UNWIND $rows" in q]
+    assert len(posted) == 1 and "REPOST_OF*0..2" in posted[0]
+    assert graph.props["net_stale"] is True
+    assert await analyzer.cache.get(analyzer.cache_key("user", "u1")) is None
+    assert await analyzer.invalidate_posted(graph, rows[1:]) == []
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_recompute_is_not_cached(analyzer, monkeypatch):
+    analyzer, graph = analyzer
+    cache_set = analyzer.cache.set
+    races = [1]
+
+    async def late_set(key, value, ttl=None):
+        # La invalidación llega entre el recálculo y el guardado en caché
+        if races:
+            races.pop()
+            await analyzer.invalidate(graph, "user", ["u1"])
+        await cache_set(key, value, ttl=ttl)
+
+    monkeypatch.setattr(analyzer.cache, "set", late_set)
+    await analyzer.metrics("user", "u1")
+
+    assert await analyzer.cache.get(analyzer.cache_key("user", "u1")) is None
+    await analyzer.metrics("user", "u1")
+    assert sum("FOLLOWS*1..2" in q for q in graph.queries) == 2
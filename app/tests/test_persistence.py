@@ -0,0 +1,121 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.services import persistence
+from app.services.persistence import AnalysisPersister, build_analysis_row
+
+RESULT = {
+    "detected_terms": {"tecno": ["algocracia", "neurocapitalismo"]},
+    "semantic_score": 0.8,
+    "risk_level": "Alto",
+    "metadata": {"version": "2.2", "dictionary_version": "1.0", "timestamp": "t"},
+}
+
+
+class Written(list):
+    """Lotes escritos y aristas POSTED existentes en el grafo simulado."""
+
+    def __init__(self):
+        super().__init__()
+        self.posted = set()
+
+
+class FakeTx:
+    def __init__(self, batches):
+        self.batches = batches
+
+    async def run(self, query, rows):
+        self.batches.append(rows)
+        self.created = []
+        for row in rows:
+            edge = (row["user_id"], row["post_id"])
+            if row["user_id"] is not None and edge not in self.batches.posted:
+                self.batches.posted.add(edge)
+                self.created.append({"post_id": row["post_id"], "user_id": row["user_id"]})
+        return self
+
+    async def single(self):
+        return {"written": len(self.batches[-1]), "posted": self.created}
+
+
+class FakeSession:
+    def __init__(self, batches):
+        self.batches = batches
+
+    async def execute_write(self, fn):
+        return await fn(FakeTx(self.batches))
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    written = Written()
+
+    @asynccontextmanager
+    async def open_session():
+        yield FakeSession(written)
+
+    monkeypatch.setattr(persistence, "open_session", open_session)
+    return written
+
+
+def test_row_keeps_previous_terms_when_layer_not_requested():
+    row = build_analysis_row("p1", RESULT, "u1")
+    assert row["props"] == {
+        "semantic_score": 0.8, "risk_level": "Alto",
+        "analysis_version": "2.2", "dictionary_version": "1.0",
+    }
+    assert row["terms"] == [
+        {"name": "algocracia", "category": "tecno"},
+        {"name": "neurocapitalismo", "category": "tecno"},
+    ]
+
+    partial = build_analysis_row("p1", {"risk_level": "Bajo", "metadata": {}})
+    assert partial["terms"] is None and partial["user_id"] is None
+
+
+@pytest.mark.asyncio
+async def test_results_are_written_in_batches_and_flushed_on_stop(batches):
+    persister = AnalysisPersister(enabled=True, batch_size=2, flush_interval=60, queue_size=10)
+    persister.start()
+    for i in range(5):
+        assert persister.submit(f"p{i}", RESULT)
+    await persister.stop()
+
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+    assert persister.stats()["persisted"] == 5
+
+
+@pytest.mark.asyncio
+async def test_full_queue_drops_instead_of_blocking(batches):
+    persister = AnalysisPersister(enabled=True, batch_size=10, flush_interval=60, queue_size=1)
+    persister.start()
+    results = [persister.submit(f"p{i}", RESULT) for i in range(3)]
+    await persister.stop()
+
+    assert results == [True, False, False]
+    assert persister.stats()["dropped"] == 2
+
+
+@pytest.mark.asyncio
+async def test_written_posts_invalidate_network_aggregates(batches, monkeypatch):
+    invalidated = []
+
+    async def invalidate_posted(session, rows):
+        invalidated.append([(row["post_id"], row["user_id"]) for row in rows])
+        return []
+
+    monkeypatch.setattr(persistence.network_analyzer, "invalidate_posted", invalidate_posted)
+    persister = AnalysisPersister(enabled=True, batch_size=10, flush_interval=60, queue_size=10)
+    persister.start()
+    persister.submit("p1", RESULT, "u1")
+    persister.submit("p2", RESULT)
+    await persister.stop()
+
+    # Reanalizar p1 con el mismo autor no crea la arista: nada que invalidar
+    persister.start()
+    persister.submit("p1", RESULT, "u1")
+    persister.submit("p3", RESULT, "u1")
+    await persister.stop()
+
+    assert invalidated == [[("p1", "u1")], [("p3", "u1")]]
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from gensim.models import KeyedVectors
+
+from app.services.semantic import SemanticExpander, load_keyed_vectors
+
+CATEGORIES = {
+    "control": ["control", "poder"],
+    "colapso": ["colapso", "fin del mundo"],
+}
+
+WORDS = {
+    "control": [1.0, 0.0, 0.0],
+    "poder": [0.9, 0.1, 0.0],
+    "dominio": [0.95, 0.05, 0.05],
+    "colapso": [0.0, 1.0, 0.0],
+    "fin": [0.0, 0.9, 0.1],
+    "mundo": [0.1, 0.8, 0.2],
+    "ruina": [0.05, 0.95, 0.0],
+    "gato": [0.0, 0.0, 1.0],
+}
+
+
+@pytest.fixture
+def vectors_path(tmp_path):
+    vectors = KeyedVectors(vector_size=3)
+    vectors.add_vectors(list(WORDS), np.array(list(WORDS.values()), dtype=np.float32))
+    path = tmp_path / "vectors.kv"
+    # sep_limit=0: la matriz va en su propio .npy y puede abrirse con mmap
+    vectors.save(str(path), sep_limit=0)
+    return path
+
+
+def test_vectors_are_memory_mapped(vectors_path):
+    vectors = load_keyed_vectors(vectors_path)
+
+    assert isinstance(vectors.vectors, np.memmap)
+    assert not vectors.vectors.flags.writeable
+
+
+def test_expand_flags_close_forms_but_not_dictionary_terms(vectors_path):
+    expander = SemanticExpander(vectors_path, threshold=0.9)
+
+    result = expander.expand(
+        ["dominio", "control", "ruina", "gato", "inexistente"], CATEGORIES, "v1"
+    )
+
+    assert result["available"] is True
+    assert [m["token"] for m in result["matches"]["control"]] == ["dominio"]
+    assert result["matches"]["control"][0]["nearest_term"] == "control"
+    assert [m["token"] for m in result["matches"]["colapso"]] == ["ruina"]
+    assert result["matches"]["colapso"][0]["nearest_term"] == "colapso"
+
+
+def test_index_is_rebuilt_when_dictionary_changes(vectors_path):
+    expander = SemanticExpander(vectors_path, threshold=0.9)
+    first = expander.index_for(CATEGORIES, "v1")
+
+    assert expander.index_for(CATEGORIES, "v1") is first
+    updated = expander.index_for({"control": ["gato"]}, "v2")
+    assert updated is not first
+    assert updated.categories == ["control"]
+
+
+def test_missing_model_degrades_to_unavailable(tmp_path):
+    expander = SemanticExpander(tmp_path / "no-existe.kv")
+
+    assert expander.expand(["dominio"], CATEGORIES, "v1") == {"available": False, "matches": {}}
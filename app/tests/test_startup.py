@@ -0,0 +1,40 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Presupuesto de importación (segundos); ajustable en máquinas lentas de CI
+IMPORT_BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "5"))
+
+PROBE = """
+import json, os, sys
+import app.main
+from app.services import pipeline
+print(json.dumps({
+    "model_loaded": pipeline.nlp_pipeline.is_loaded,
+    "resources_loaded": pipeline._resources is not None,
+    "spacy_imported": "spacy" in sys.modules,
+    "logs_created": os.path.exists("logs"),
+}))
+"""
+
+
+def test_import_has_no_heavy_side_effects(tmp_path):
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env = dict(os.environ, PYTHONPATH=root)
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=tmp_path, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    elapsed = time.perf_counter() - started
+
+    state = json.loads(result.stdout.strip().splitlines()[-1])
+    assert state == {
+        "model_loaded": False,
+        "resources_loaded": False,
+        "spacy_imported": False,
+        "logs_created": False,
+    }
+    assert elapsed < IMPORT_BUDGET, f"Importar app.main tardó {elapsed:.2f}s"
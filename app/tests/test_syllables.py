@@ -0,0 +1,36 @@
+import pytest
+
+from app.services.syllables import SyllableCounter, count_syllables
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("casa", 2),
+    ("poeta", 3),       # hiato entre vocales fuertes
+    ("aéreo", 4),
+    ("día", 2),         # débil con tilde: hiato
+    ("oír", 2),
+    ("ciudad", 2),      # diptongo de débiles
+    ("buey", 1),        # triptongo con "y" final
+    ("Paraguay", 3),
+    ("muy", 1),
+    ("y", 1),
+    ("yo", 1),          # "y" consonante
+    ("ayer", 2),
+    ("que", 1),         # "u" muda
+    ("guiso", 2),
+    ("pingüino", 3),    # "ü" sí suena
+    ("ahumado", 3),     # "h" intercalada
+    ("búho", 2),
+    ("2024", 1),
+])
+def test_count_syllables(word, expected):
+    assert count_syllables(word) == expected
+
+
+def test_counter_caches_by_lowercase_form():
+    counter = SyllableCounter(maxsize=2)
+
+    assert counter.count_many(["Casa", "casa", "CASA", "poeta"]) == [2, 2, 2, 3]
+    assert counter.total(["casa", "poeta"], [3, 2]) == 12
+    stats = counter.stats()
+    assert stats["misses"] == 2 and stats["entries"] == 2
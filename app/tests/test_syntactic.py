@@ -0,0 +1,106 @@
+import random
+
+import spacy
+from spacy.tokens import Doc
+
+from app.services.pipeline import AnalysisContext, SyntacticAnalyzer
+
+DEPS = ["nsubj", "obj", "mark", "advcl", "det", "amod", "punct"]
+
+
+def random_doc(vocab, rng):
+    """Doc con varias oraciones y árboles de dependencias aleatorios válidos."""
+    words, heads, deps = [], [], []
+    for _ in range(rng.randint(1, 4)):
+        size, base = rng.randint(1, 25), len(words)
+        order = list(range(size))
+        rng.shuffle(order)
+        sent_heads = [0] * size
+        sent_heads[order[0]] = order[0]
+        for k in range(1, size):
+            sent_heads[order[k]] = order[rng.randrange(k)]
+        for i, head in enumerate(sent_heads):
+            words.append(f"w{base + i}")
+            heads.append(base + head)
+            deps.append("ROOT" if head == i else rng.choice(DEPS))
+    return Doc(vocab, words=words, heads=heads, deps=deps)
+
+
+def naive_complexity(doc):
+    return {
+        "subordinate_clauses": sum(1 for sent in doc.sents if "mark" in [t.dep_ for t in sent]),
+        "depth_score": round(sum(len(list(token.subtree)) for token in doc) / len(doc), 2)
+    }
+
+
+def test_complexity_matches_subtree_walk():
+    vocab = spacy.blank("es").vocab
+    rng = random.Random(7)
+    analyzer = SyntacticAnalyzer()
+    for _ in range(200):
+        doc = random_doc(vocab, rng)
+        ctx = AnalysisContext(doc.text, doc=doc)
+        assert analyzer._calculate_complexity(ctx) == naive_complexity(doc)
+
+
+def test_tree_depths_on_chain():
+    # 0 <- 1 <- 2 <- 3 (el token 0 es la raíz)
+    assert SyntacticAnalyzer._tree_depths([0, 0, 1, 2]) == [0, 1, 2, 3]
+
+
+def parsed(words, heads, deps, pos, morphs=None):
+    vocab = spacy.blank("es").vocab
+    return Doc(vocab, words=words, heads=heads, deps=deps, pos=pos,
+               morphs=morphs or [""] * len(words))
+
+
+def test_prophet_detects_periphrastic_passive_and_subject_position():
+    from app.models.analysis import SyntacticProphet
+
+    # "La ley fue aprobada ." / "Llegaron los soldados ."
+    doc = parsed(
+        ["La", "ley", "fue", "aprobada", ".", "Llegaron", "los", "soldados", "."],
+        [1, 3, 3, 3, 3, 5, 7, 5, 5],
+        ["det", "nsubj", "aux", "ROOT", "punct", "ROOT", "det", "nsubj", "punct"],
+        ["DET", "NOUN", "AUX", "VERB", "PUNCT", "VERB", "DET", "NOUN", "PUNCT"],
+        ["", "", "VerbForm=Fin", "VerbForm=Part", "", "VerbForm=Fin", "", "", ""],
+    )
+    result = SyntacticProphet().analyze(doc)
+
+    assert result["voice"] == {"active": 1, "passive": 1}
+    assert result["subject_positions"] == {"preverbal": 1, "postverbal": 1, "omitted": 0}
+    assert result["negation_patterns"] == {}
+
+
+def test_prophet_collects_negation_patterns():
+    from app.models.analysis import SyntacticProphet
+
+    # "No quiero nada ."
+    doc = parsed(
+        ["No", "quiero", "nada", "."],
+        [1, 1, 1, 1],
+        ["advmod", "ROOT", "obj", "punct"],
+        ["ADV", "VERB", "PRON", "PUNCT"],
+        ["", "VerbForm=Fin", "", ""],
+    )
+    result = SyntacticProphet().analyze(doc)
+
+    assert result["negation_patterns"] == {
+        "simple": ["No quiero"],
+        "double": ["No quiero nada"],
+        "lexical": ["nada"],
+    }
+    assert result["subject_positions"]["omitted"] == 1
+
+
+def test_prophet_rejects_invalid_rules(tmp_path):
+    import pytest
+
+    from app.models.analysis import SyntacticProphet
+
+    rules = tmp_path / "rules.json"
+    rules.write_text('{"es": {"negation": [{"name": "mala", "type": "token", "pattern": [{"NOPE": 1}]}]}}')
+    doc = parsed(["no"], [0], ["ROOT"], ["ADV"])
+
+    with pytest.raises(ValueError, match="mala"):
+        SyntacticProphet(rules).analyze(doc)
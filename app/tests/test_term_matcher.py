@@ -0,0 +1,44 @@
+import re
+
+from app.services.term_matcher import TermMatcher
+
+DICTIONARY = {
+    "control": ["control", "control total", "vigilancia", "total"],
+    "colapso": ["colapso", "colapso geopolítico", "Algocracia"],
+    "tecnologia": ["algocracia", "neurocapitalismo", "c++"],
+}
+
+
+def naive_detect(dictionary, text):
+    detected = {}
+    for category, terms in dictionary.items():
+        found_terms = [
+            term for term in terms
+            if re.search(rf"\b{re.escape(term)}\b", text, re.IGNORECASE)
+        ]
+        if found_terms:
+            detected[category] = found_terms
+    return detected
+
+
+def test_matches_per_term_regex():
+    matcher = TermMatcher(DICTIONARY)
+    texts = [
+        "El neurocapitalismo y la ALGOCRACIA aceleran el colapso geopolítico.",
+        "Control total, vigilancia total: el control es totalitario.",
+        "controlar la narrativa no implica colapsos",
+        "c++ y colapso",
+        "",
+    ]
+    for text in texts:
+        assert matcher.detect(text) == naive_detect(DICTIONARY, text)
+
+
+def test_overlapping_terms_are_all_reported():
+    matcher = TermMatcher(DICTIONARY)
+    detected = matcher.detect("Hacia el control total")
+    assert detected == {"control": ["control", "control total", "total"]}
+
+
+def test_empty_dictionary():
+    assert TermMatcher({}).detect("cualquier texto") == {}
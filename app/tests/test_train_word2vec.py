@@ -0,0 +1,123 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.models import train_word2vec
+from app.models.train_word2vec import (
+    CorpusSentences,
+    find_checkpoint,
+    main,
+    train,
+)
+from app.services.semantic import load_keyed_vectors
+
+TEXTS = [
+    "El control total del poder mediático.",
+    "La narrativa del colapso y el orden.",
+    "Tecnología, sociedad y futuro: ¿apocalipsis o utopía?",
+]
+
+
+def write_corpus(tmp_path):
+    ndjson = tmp_path / "posts.ndjson"
+    ndjson.write_text(
+        "\n".join(json.dumps({"text": text}) for text in TEXTS * 5) + "\nno es json\n",
+        encoding="utf-8",
+    )
+    return ndjson
+
+
+def test_corpus_is_restartable_and_tokenized(tmp_path):
+    corpus = CorpusSentences([write_corpus(tmp_path)])
+
+    first = list(corpus)
+    assert first == list(corpus)
+    assert len(first) == 15
+    assert first[0] == ["el", "control", "total", "del", "poder", "mediático"]
+
+
+def test_resume_continues_from_last_checkpoint(tmp_path):
+    corpus = CorpusSentences([write_corpus(tmp_path)])
+    checkpoints = tmp_path / "checkpoints"
+
+    train(corpus, vector_size=8, min_count=1, epochs=3, workers=1, checkpoint_dir=checkpoints)
+    assert find_checkpoint(checkpoints)[0] == 3
+    assert len(list(checkpoints.glob("word2vec-epoch*.model"))) == 2
+
+    # Sin épocas pendientes, reanudar devuelve el checkpoint tal cual
+    resumed = train(corpus, workers=1, checkpoint_dir=checkpoints, resume=True)
+    assert resumed.epochs == 3
+    assert "control" in resumed.wv
+
+
+class Crash(Exception):
+    pass
+
+
+def crash_after(monkeypatch, epoch):
+    """Corta el entrenamiento tras guardar el checkpoint de `epoch`."""
+    original = train_word2vec._checkpoint_callback
+
+    def crashing(directory, completed):
+        callback = original(directory, completed)
+        on_epoch_end = callback.on_epoch_end
+
+        def end(model):
+            on_epoch_end(model)
+            if callback.epoch == epoch:
+                raise Crash()
+
+        callback.on_epoch_end = end
+        return callback
+
+    monkeypatch.setattr(train_word2vec, "_checkpoint_callback", crashing)
+
+
+def test_resume_twice_trains_every_epoch(tmp_path, monkeypatch):
+    corpus = CorpusSentences([write_corpus(tmp_path)])
+    checkpoints = tmp_path / "checkpoints"
+
+    crash_after(monkeypatch, 2)
+    with pytest.raises(Crash):
+        train(corpus, vector_size=8, min_count=1, epochs=5, workers=1, checkpoint_dir=checkpoints)
+    crash_after(monkeypatch, 4)
+    with pytest.raises(Crash):
+        train(corpus, workers=1, checkpoint_dir=checkpoints, resume=True)
+    assert find_checkpoint(checkpoints)[0] == 4
+
+    monkeypatch.undo()
+    resumed = train(corpus, workers=1, checkpoint_dir=checkpoints, resume=True)
+
+    assert find_checkpoint(checkpoints)[0] == 5
+    assert resumed.target_epochs == 5
+    # El último tramo arranca donde la tasa habría llegado tras 4 de 5 épocas
+    alpha, min_alpha = resumed.initial_alpha, resumed.initial_min_alpha
+    assert resumed.alpha == pytest.approx(alpha - (alpha - min_alpha) * 4 / 5)
+
+
+def test_update_extends_vocabulary(tmp_path):
+    corpus = CorpusSentences([write_corpus(tmp_path)])
+    base = tmp_path / "base.model"
+    train(corpus, vector_size=8, min_count=1, epochs=1, workers=1).save(str(base))
+
+    extra = tmp_path / "extra.txt"
+    extra.write_text("hiperstición algocracia\n" * 3, encoding="utf-8")
+    updated = train(CorpusSentences([extra]), workers=1, update=base)
+
+    assert "algocracia" in updated.wv
+    assert "control" in updated.wv
+
+
+def test_cli_exports_mmap_friendly_vectors(tmp_path):
+    output = tmp_path / "vectors.kv"
+    main([
+        str(write_corpus(tmp_path)), "--output", str(output), "--vector-size", "8",
+        "--min-count", "1", "--epochs", "1", "--workers", "1",
+        "--tokens-cache", str(tmp_path / "tokens.txt"),
+    ])
+
+    vectors = load_keyed_vectors(output)
+    assert isinstance(vectors.vectors, np.memmap)
+    assert vectors.vector_size == 8
+    assert "colapso" in vectors
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.workers import AnalysisPool, PoolSaturatedError
+
+
+@pytest.mark.asyncio
+async def test_runs_off_event_loop():
+    pool = AnalysisPool(mode="thread", workers=1, max_concurrency=1, queue_size=1)
+    try:
+        name = await pool.run(lambda: threading.current_thread().name)
+        assert name.startswith("analysis")
+    finally:
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    pool = AnalysisPool(mode="thread", workers=1, max_concurrency=1, queue_size=1, retry_after=7)
+    release = threading.Event()
+    try:
+        running = asyncio.create_task(pool.run(release.wait))
+        await asyncio.sleep(0.05)
+        queued = asyncio.create_task(pool.run(lambda: "ok"))
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(PoolSaturatedError) as exc_info:
+            await pool.run(lambda: "rechazada")
+        assert exc_info.value.retry_after == 7
+        assert pool.stats()["waiting"] == 1
+
+        release.set()
+        assert await running is True
+        assert await queued == "ok"
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_wait_keeps_slot_until_job_ends():
+    pool = AnalysisPool(mode="thread", workers=2, max_concurrency=1, queue_size=1)
+    release = threading.Event()
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(pool.run(release.wait), 0.05)
+        assert pool.stats()["in_flight"] == 1
+
+        queued = asyncio.create_task(pool.run(lambda: "ok"))
+        await asyncio.sleep(0.05)
+        assert not queued.done()
+
+        release.set()
+        assert await queued == "ok"
+        assert pool.stats()["in_flight"] == 0
+    finally:
+        release.set()
+        pool.shutdown()
@@ -3,43 +3,48 @@ import os
 
 # Directorio de logs
 LOG_DIR = "logs"
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
 
 # Configuración del formato de logs
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(name)s - %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+class LazyFileHandler(logging.FileHandler):
+    """FileHandler que crea el directorio y abre el fichero en el primer registro.
+
+    Importar este módulo no toca el disco: procesos que nunca escriben logs
+    (workers, recogida de tests, CLIs) no pagan el coste de abrir ficheros.
+    """
+
+    def __init__(self, filename: str):
+        super().__init__(filename, delay=True)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+def _build_logger(name: str, filename: str, level: int) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.setLevel(level)
+    handler = LazyFileHandler(os.path.join(LOG_DIR, filename))
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+    logger.addHandler(handler)
+    return logger
+
 # Configuración del logger principal
-app_logger = logging.getLogger("app")
-app_logger.setLevel(logging.INFO)
-app_handler = logging.FileHandler(os.path.join(LOG_DIR, "app.log"))
-app_handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
-app_logger.addHandler(app_handler)
+app_logger = _build_logger("app", "app.log", logging.INFO)
 
 # Logger de seguridad
-security_logger = logging.getLogger("security")
-security_logger.setLevel(logging.WARNING)
-security_handler = logging.FileHandler(os.path.join(LOG_DIR, "security.log"))
-security_handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
-security_logger.addHandler(security_handler)
+security_logger = _build_logger("security", "security.log", logging.WARNING)
 
 # Logger de validación
-validation_logger = logging.getLogger("validation")
-validation_logger.setLevel(logging.ERROR)
-validation_handler = logging.FileHandler(os.path.join(LOG_DIR, "validation.log"))
-validation_handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
-validation_logger.addHandler(validation_handler)
+validation_logger = _build_logger("validation", "validation.log", logging.ERROR)
 
 # Logger de análisis hipersticioso
-analysis_logger = logging.getLogger("analysis")
-analysis_logger.setLevel(logging.INFO)
-analysis_handler = logging.FileHandler(os.path.join(LOG_DIR, "analysis.log"))
-analysis_handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
-analysis_logger.addHandler(analysis_handler)
-
-# Mensajes de inicialización de logs
-app_logger.info("Logger de aplicación inicializado correctamente.")
-security_logger.warning("Logger de seguridad activo.")
-validation_logger.error("Logger de validación activo.")
-analysis_logger.info("Logger de análisis hipersticioso listo para uso.")
+analysis_logger = _build_logger("analysis", "analysis.log", logging.INFO)
+
+def announce_loggers():
+    """Mensajes de inicialización de logs (se emiten al arrancar la aplicación)."""
+    app_logger.info("Logger de aplicación inicializado correctamente.")
+    security_logger.warning("Logger de seguridad activo.")
+    validation_logger.error("Logger de validación activo.")
+    analysis_logger.info("Logger de análisis hipersticioso listo para uso.")
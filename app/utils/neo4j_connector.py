@@ -1,12 +1,17 @@
-from neo4j import GraphDatabase
-import os
+from neo4j import AsyncDriver
+
+from app.services.database import get_driver
 
 class Neo4jConnector:
-    def __init__(self):
-        self.uri = os.getenv("NEO4J_URI", "bolt://neo4j:7687")
-        self.user = os.getenv("NEO4J_USER", "neo4j")
-        self.password = os.getenv("NEO4J_PASSWORD", "hyperstition")
-        self.driver = GraphDatabase.driver(self.uri, auth=(self.user, self.password))
-    
-    def get_db(self):
-        return self.driver
\ No newline at end of file
+    """Acceso al driver compartido de Neo4j (no crea conexiones propias).
+
+    Se mantiene por compatibilidad; los routers deben usar la dependencia
+    `app.services.database.get_session`.
+    """
+
+    @property
+    def driver(self) -> AsyncDriver:
+        return get_driver()
+
+    def get_db(self) -> AsyncDriver:
+        return self.driver
@@ -0,0 +1,50 @@
+"""Benchmarks de las funciones del análisis sobre corpus de distintos tamaños."""
+import pytest
+
+from app.services import pipeline
+from app.services.pipeline import (
+    AnalysisContext,
+    SyntacticAnalyzer,
+    analyze_linguistic_complexity,
+    detect_hyperstition_terms,
+)
+from benchmarks.corpus import DICTIONARY_SIZES, TEXT_LENGTHS
+
+
+@pytest.mark.parametrize("size", DICTIONARY_SIZES)
+@pytest.mark.parametrize("length", TEXT_LENGTHS)
+def bench_detect_hyperstition_terms(benchmark, corpus, dictionaries, use_dictionary, length, size):
+    use_dictionary(dictionaries[size])
+    text = corpus[(length, size)]
+    benchmark.extra_info.update(chars=len(text), terms=size)
+
+    detected = benchmark(detect_hyperstition_terms, text)
+    assert detected
+
+
+@pytest.fixture(scope="module")
+def parsed(corpus):
+    """Docs parseados una vez: los benchmarks miden el análisis, no spaCy."""
+    return {length: pipeline.nlp_pipeline.parse(corpus[(length, DICTIONARY_SIZES[0])]) for length in TEXT_LENGTHS}
+
+
+@pytest.mark.parametrize("length", TEXT_LENGTHS)
+def bench_spacy_parse(benchmark, corpus, length):
+    text = corpus[(length, DICTIONARY_SIZES[0])]
+    benchmark.extra_info.update(chars=len(text))
+    benchmark(pipeline.nlp_pipeline.parse, text)
+
+
+@pytest.mark.parametrize("length", TEXT_LENGTHS)
+def bench_analyze_linguistic_complexity(benchmark, parsed, length):
+    doc = parsed[length]
+    benchmark.extra_info.update(chars=len(doc.text), tokens=len(doc))
+    benchmark(lambda: analyze_linguistic_complexity(AnalysisContext(doc.text, doc=doc)))
+
+
+@pytest.mark.parametrize("length", TEXT_LENGTHS)
+def bench_syntactic_analyze(benchmark, parsed, length):
+    doc = parsed[length]
+    analyzer = SyntacticAnalyzer()
+    benchmark.extra_info.update(chars=len(doc.text), tokens=len(doc))
+    benchmark(lambda: analyzer.analyze(AnalysisContext(doc.text, doc=doc)))
@@ -0,0 +1,36 @@
+"""Benchmarks de extremo a extremo de /hyperstition/analyze vía cliente ASGI."""
+import itertools
+
+import pytest
+
+from app.services.cache import analysis_cache
+from benchmarks.corpus import DICTIONARY_SIZES, TEXT_LENGTHS
+
+SIZE = DICTIONARY_SIZES[1]
+
+
+@pytest.mark.parametrize("length", TEXT_LENGTHS)
+def bench_analyze_endpoint_uncached(benchmark, client, corpus, dictionaries, use_dictionary, length):
+    use_dictionary(dictionaries[SIZE])
+    text = corpus[(length, SIZE)]
+    # Un sufijo distinto en cada ronda evita los aciertos de caché
+    counter = itertools.count()
+    benchmark.extra_info.update(chars=len(text), terms=SIZE)
+
+    def call():
+        response = client.post("/hyperstition/analyze", json={"text": f"{text} ({next(counter)})"})
+        assert response.status_code == 200
+        return response
+
+    benchmark(call)
+
+
+@pytest.mark.parametrize("length", TEXT_LENGTHS)
+def bench_analyze_endpoint_cached(benchmark, client, corpus, dictionaries, use_dictionary, length):
+    use_dictionary(dictionaries[SIZE])
+    text = corpus[(length, SIZE)]
+    assert client.post("/hyperstition/analyze", json={"text": text}).status_code == 200
+    benchmark.extra_info.update(chars=len(text), terms=SIZE)
+
+    benchmark(client.post, "/hyperstition/analyze", json={"text": text})
+    assert analysis_cache.stats()["hits"] > 0
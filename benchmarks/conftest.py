@@ -0,0 +1,94 @@
+"""Fixtures de los benchmarks: corpus sintético y sustitutos locales de Neo4j y Redis.
+
+Ejecutar desde la raíz del repositorio:
+
+    pytest benchmarks
+
+Cada ejecución guarda un JSON en `benchmarks/results/` (con el commit en
+los metadatos); para comparar con la anterior: `pytest benchmarks --benchmark-compare`.
+"""
+import fakeredis.aioredis
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import database, pipeline
+from app.services.cache import analysis_cache, redis_cache
+
+from benchmarks.corpus import DICTIONARY_SIZES, TEXT_LENGTHS, make_dictionary, make_text
+
+
+class FakeResult:
+    async def single(self):
+        return {"message": "Conexión exitosa", "duplicated": 0, "sample": []}
+
+
+class FakeSession:
+    """Sesión Neo4j en memoria: acepta cualquier consulta sin ejecutarla."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def run(self, query, **params):
+        return FakeResult()
+
+    async def execute_write(self, fn, *args):
+        return await fn(self, *args)
+
+    execute_read = execute_write
+
+
+class FakeDriver:
+    def session(self, **kwargs):
+        return FakeSession()
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture(scope="session")
+def dictionaries():
+    return {size: make_dictionary(size) for size in DICTIONARY_SIZES}
+
+
+@pytest.fixture(scope="session")
+def corpus(dictionaries):
+    """Un texto por combinación (longitud, tamaño de diccionario)."""
+    return {
+        (length, size): make_text(length, dictionaries[size])
+        for length in TEXT_LENGTHS
+        for size in DICTIONARY_SIZES
+    }
+
+
+@pytest.fixture
+def use_dictionary(monkeypatch):
+    """Activa un diccionario sintético como si se hubiera cargado del JSON."""
+
+    def install(data):
+        resources = pipeline.HyperstitionResources(
+            data["categorias"], data["metadatos"]["pesos_analiticos"], data["metadatos"]
+        )
+        monkeypatch.setattr(pipeline, "_resources", resources)
+        return resources
+
+    return install
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Aplicación completa vía ASGI con Neo4j y Redis sustituidos en memoria."""
+    monkeypatch.setattr(database, "_driver", FakeDriver())
+    initialize = redis_cache.initialize
+
+    async def initialize_fake():
+        await initialize(client=fakeredis.aioredis.FakeRedis(decode_responses=True))
+
+    monkeypatch.setattr(redis_cache, "initialize", initialize_fake)
+    analysis_cache.clear_local()
+    with TestClient(app, base_url="http://localhost", headers={"User-Agent": "curl/bench"}) as test_client:
+        yield test_client
+    analysis_cache.clear_local()
@@ -0,0 +1,75 @@
+"""Corpus y diccionarios sintéticos en español, deterministas por semilla."""
+import random
+from typing import Dict, List
+
+# Longitudes aproximadas (caracteres) y tamaños de diccionario (términos)
+TEXT_LENGTHS = (200, 2000, 20000)
+DICTIONARY_SIZES = (50, 500, 5000)
+
+PREFIXES = [
+    "neuro", "algo", "tecno", "cripto", "hiper", "bio", "geo", "psico", "info",
+    "ciber", "meta", "necro", "xeno", "datos", "socio", "cogni", "sinto", "proto",
+]
+ROOTS = [
+    "capital", "cracia", "feudal", "política", "mancia", "poder", "control",
+    "ficción", "sfera", "mercado", "colapso", "vigilancia", "futuro", "red",
+]
+SUFFIXES = ["", "ismo", "ista", "ización", "ico", "ante", "idad"]
+ADJECTIVES = ["predictiva", "acelerada", "distribuida", "latente", "sintética", "global"]
+
+SUBJECTS = [
+    "La sociedad", "El mercado", "Nosotros", "Ellos", "Yo", "Según los expertos, el sistema",
+    "Nuestro colectivo", "La plataforma", "El algoritmo", "Su gobierno",
+]
+VERBS = [
+    "acelera", "anticipa", "reproduce", "transforma", "oculta", "amplifica",
+    "predice", "construye", "disuelve", "legitima",
+]
+OBJECTS = [
+    "el colapso institucional", "una narrativa compartida", "los flujos de información",
+    "la percepción del riesgo", "las redes de confianza", "un futuro posible",
+]
+CLAUSES = [
+    "aunque nadie lo advierta", "porque los datos lo confirman", "mientras crece la incertidumbre",
+    "cuando la crisis se vuelve visible", "si la comunidad lo acepta", "",
+]
+
+
+def make_dictionary(size: int, seed: int = 13) -> Dict:
+    """Diccionario con `size` términos repartidos en categorías, con pesos."""
+    rng = random.Random(seed)
+    terms = set()
+    while len(terms) < size:
+        term = rng.choice(PREFIXES) + rng.choice(ROOTS) + rng.choice(SUFFIXES)
+        if rng.random() < 0.3:
+            term = f"{term} {rng.choice(ADJECTIVES)}"
+        terms.add(term)
+
+    categories: Dict[str, List[str]] = {}
+    for i, term in enumerate(sorted(terms)):
+        categories.setdefault(f"categoria_{i % 8}", []).append(term)
+    return {
+        "categorias": categories,
+        "metadatos": {
+            "version": f"bench-{size}",
+            "pesos_analiticos": {name: round(0.2 + 0.1 * i, 2) for i, name in enumerate(categories)},
+        },
+    }
+
+
+def make_text(length: int, dictionary: Dict, seed: int = 7, term_rate: float = 0.3) -> str:
+    """Texto de unos `length` caracteres; ~`term_rate` de las oraciones citan un término."""
+    rng = random.Random(seed)
+    terms = [term for group in dictionary["categorias"].values() for term in group]
+    sentences: List[str] = []
+    size = 0
+    while size < length:
+        obj = rng.choice(OBJECTS)
+        if terms and rng.random() < term_rate:
+            obj = f"{obj} del {rng.choice(terms)}"
+        clause = rng.choice(CLAUSES)
+        sentence = f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {obj}"
+        sentence += f", {clause}." if clause else "."
+        sentences.append(sentence)
+        size += len(sentence) + 1
+    return " ".join(sentences)